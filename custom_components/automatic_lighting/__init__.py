@@ -2,10 +2,14 @@
 #       Imports
 #-----------------------------------------------------------#
 
-from .const import DOMAIN, PLATFORMS, UNDO_UPDATE_LISTENER
+# The utils (and with them the light component and template helpers) are imported on first use in async_setup.
+from .const import CONF_PROFILES, CONF_STARTUP_CONCURRENCY, CONF_STARTUP_INTERVAL, DATA_AUTOMATION_COORDINATOR, DATA_LIGHT_CAPABILITIES, DATA_SETUP_TIMES, DATA_STARTUP_SCHEDULER, DATA_ZONE_STREAM, DEFAULT_STARTUP_CONCURRENCY, DEFAULT_STARTUP_INTERVAL, DOMAIN, ENTITIES, LOADED_PLATFORMS, OWNED_LIGHTS, PLATFORMS, UNDO_UPDATE_LISTENER
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from typing import Any, Dict
+from logging import getLogger
+from time import perf_counter
+from typing import Any, Dict, List
+import voluptuous as vol
 
 
 #-----------------------------------------------------------#
@@ -13,6 +17,19 @@ from typing import Any, Dict
 #-----------------------------------------------------------#
 
 LOGGER_BASE_NAME = __name__
+SETUP_TIME_BUDGET = 0.1
+
+
+#-----------------------------------------------------------#
+#       Schemas
+#-----------------------------------------------------------#
+
+CONFIG_SCHEMA = vol.Schema({
+    vol.Optional(DOMAIN, default={}): vol.Schema({
+        vol.Optional(CONF_STARTUP_CONCURRENCY, default=DEFAULT_STARTUP_CONCURRENCY): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(CONF_STARTUP_INTERVAL, default=DEFAULT_STARTUP_INTERVAL): vol.All(vol.Coerce(float), vol.Range(min=0))
+    })
+}, extra=vol.ALLOW_EXTRA)
 
 
 #-----------------------------------------------------------#
@@ -20,24 +37,43 @@ LOGGER_BASE_NAME = __name__
 #-----------------------------------------------------------#
 
 async def async_setup(hass: HomeAssistant, config: Dict[str, Any]) -> bool:
+    started_at = perf_counter()
+    from .utils import AutomationCoordinator, LightCapabilityCache, StartupScheduler, ZoneStream
+    from .websocket_api import async_register_websocket_commands
+    domain_config = config.get(DOMAIN, {})
+    hass.data[DATA_AUTOMATION_COORDINATOR] = AutomationCoordinator(hass, getLogger(f"{LOGGER_BASE_NAME}.automations"))
+    hass.data[DATA_LIGHT_CAPABILITIES] = LightCapabilityCache(hass)
+    hass.data[DATA_STARTUP_SCHEDULER] = StartupScheduler(hass, getLogger(f"{LOGGER_BASE_NAME}.startup"), domain_config.get(CONF_STARTUP_CONCURRENCY, DEFAULT_STARTUP_CONCURRENCY), domain_config.get(CONF_STARTUP_INTERVAL, DEFAULT_STARTUP_INTERVAL))
+    hass.data[DATA_ZONE_STREAM] = ZoneStream(hass.loop.call_soon)
+    async_register_websocket_commands(hass)
+    record_setup_time(hass, "setup", started_at)
     return True
 
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
+    started_at = perf_counter()
     data = hass.data.setdefault(DOMAIN, {})
-    data[config_entry.entry_id] = { UNDO_UPDATE_LISTENER: config_entry.add_update_listener(async_update_options) }
+    platforms = get_platforms(config_entry)
+    data[config_entry.entry_id] = { ENTITIES: [], LOADED_PLATFORMS: platforms, OWNED_LIGHTS: frozenset(), UNDO_UPDATE_LISTENER: config_entry.add_update_listener(async_update_options) }
 
-    for platform in PLATFORMS:
+    for platform in platforms:
         hass.async_create_task(hass.config_entries.async_forward_entry_setup(config_entry, platform))
 
+    record_setup_time(hass, config_entry.entry_id, started_at)
     return True
 
 async def async_update_options(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    data = hass.data[DOMAIN][config_entry.entry_id]
+    entities = data[ENTITIES]
+
+    if data[LOADED_PLATFORMS] == get_platforms(config_entry) and len(entities) > 0 and all([await entity.async_apply_options(config_entry.options) for entity in entities]):
+        return
+
     await hass.config_entries.async_reload(config_entry.entry_id)
 
 async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
-    unload_ok = all([await hass.config_entries.async_forward_entry_unload(config_entry, platform) for platform in PLATFORMS])
-
     data = hass.data[DOMAIN]
+    unload_ok = all([await hass.config_entries.async_forward_entry_unload(config_entry, platform) for platform in data[config_entry.entry_id][LOADED_PLATFORMS]])
+
     data[config_entry.entry_id][UNDO_UPDATE_LISTENER]()
 
     if unload_ok:
@@ -46,4 +82,26 @@ async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
     if not data:
         hass.data.pop(DOMAIN)
 
-    return unload_ok
\ No newline at end of file
+    return unload_ok
+
+
+#-----------------------------------------------------------#
+#       Platforms
+#-----------------------------------------------------------#
+
+def get_platforms(config_entry: ConfigEntry) -> List[str]:
+    """ Gets the platforms of a zone: the switch is only set up if the options define profiles (it would otherwise only turn off the lights of the sensor). """
+    return [platform for platform in PLATFORMS if platform != "switch" or config_entry.options.get(CONF_PROFILES)]
+
+
+#-----------------------------------------------------------#
+#       Setup Timing
+#-----------------------------------------------------------#
+
+def record_setup_time(hass: HomeAssistant, name: str, started_at: float) -> None:
+    """ Records the duration of a setup step (exposed through diagnostics), warning when it exceeds the setup time budget. """
+    duration = perf_counter() - started_at
+    hass.data.setdefault(DATA_SETUP_TIMES, {})[name] = duration
+
+    if duration > SETUP_TIME_BUDGET:
+        getLogger(LOGGER_BASE_NAME).warning("Setup step '%s' took %.3f seconds (budget: %s seconds).", name, duration, SETUP_TIME_BUDGET)
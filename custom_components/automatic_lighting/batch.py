@@ -0,0 +1,71 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+# Like the engine, the batch evaluator only depends on the standard library.
+from __future__ import annotations
+from datetime import time
+from typing import Any, List, Mapping, Sequence, Union
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+SECONDS_MAX = 86399
+
+
+#-----------------------------------------------------------#
+#       Functions
+#-----------------------------------------------------------#
+
+def get_seconds(value: Union[time, None], default: float = 0.0) -> float:
+    """ Gets the number of whole seconds since midnight of a time (a window ending at 23:59:59 includes the whole last second). """
+    return value.hour * 3600 + value.minute * 60 + value.second if value is not None else default
+
+def is_illuminance_valid(value: Any, threshold: Any) -> bool:
+    """ Determines whether an illuminance value is at or below the threshold (unknown values are treated as dark). """
+    lux = _parse_illuminance(value, threshold)
+    return lux is None or lux[0] <= lux[1]
+
+def is_profile_valid(profile: Any, now: float, illuminance: Mapping[str, Any]) -> bool:
+    """ Determines whether a profile is valid at a time of day (in seconds since midnight), given the states of the illuminance entities. """
+    if profile.is_constrained:
+        return False
+
+    if profile.trigger_entities is not None and not profile.is_triggered:
+        return False
+
+    if not is_time_valid(profile.time_after, profile.time_before, now):
+        return False
+
+    return profile.illuminance_entity is None or is_illuminance_valid(illuminance.get(profile.illuminance_entity), profile.illuminance_threshold)
+
+def is_time_valid(after: Union[time, None], before: Union[time, None], now: float) -> bool:
+    """ Determines whether a time of day (in seconds since midnight) is within a time window (windows may span midnight). """
+    if after is None and before is None:
+        return True
+
+    after = get_seconds(after)
+    before = get_seconds(before, SECONDS_MAX)
+    return (after <= now <= before) if after <= before else (now >= after or now <= before)
+
+def select_first_valid(groups: Sequence[Sequence[Any]], now: time, illuminance: Mapping[str, Any]) -> List[Any]:
+    """ Selects the first valid profile of every group (returns None for groups without a valid profile). The decisions are identical to calling is_profile_valid on each profile, but the clock and the illuminance states are read only once. """
+    now = get_seconds(now)
+    return [next((profile for profile in group if is_profile_valid(profile, now, illuminance)), None) for group in groups]
+
+
+#-----------------------------------------------------------#
+#       Private Functions
+#-----------------------------------------------------------#
+
+def _parse_illuminance(value: Any, threshold: Any) -> Union[tuple, None]:
+    """ Parses an illuminance value and threshold (returns None if either is missing or not a number). """
+    if value is None or threshold is None:
+        return None
+
+    try:
+        return float(value), float(threshold)
+    except (TypeError, ValueError):
+        return None
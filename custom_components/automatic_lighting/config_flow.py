@@ -3,13 +3,15 @@
 #-----------------------------------------------------------#
 
 from __future__ import annotations
-from .const import CONF_BLOCK_DURATION, CONF_LIGHT_GROUPS, DEFAULT_BLOCK_DURATION, DOMAIN
+from .const import CONF_AREA_ID, CONF_BLOCK_DURATION, CONF_COMPACT_ATTRIBUTES, CONF_DEVICE_ID, CONF_DURATION, CONF_EDIT_LIGHT_GROUPS, CONF_ILLUMINANCE_ENTITY, CONF_ILLUMINANCE_THRESHOLD, CONF_LIGHT_GROUPS, CONF_LIGHTS, CONF_NEW_PROFILE, CONF_PROFILES, CONF_RECORD_EVENTS, CONF_STARTUP_PRIORITY, CONF_TIME_AFTER, CONF_TIME_BEFORE, CONF_TRIGGER_OFF_HOLD, CONF_TRIGGER_ON_DEBOUNCE, CONF_TRIGGERS, DEFAULT_BLOCK_DURATION, DEFAULT_COMPACT_ATTRIBUTES, DEFAULT_RECORD_EVENTS, DEFAULT_STARTUP_PRIORITY, DEFAULT_TRIGGER_OFF_HOLD, DEFAULT_TRIGGER_ON_DEBOUNCE, DOMAIN
 from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow
-from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
-from homeassistant.const import CONF_ENTITIES, CONF_ENTITY_ID, CONF_NAME
+from homeassistant.components.binary_sensor import DOMAIN as BINARY_SENSOR_DOMAIN
+from homeassistant.components.light import ATTR_BRIGHTNESS_PCT, ATTR_KELVIN, DOMAIN as LIGHT_DOMAIN, VALID_BRIGHTNESS_PCT
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.const import CONF_NAME
 from homeassistant.core import callback
 from homeassistant.helpers import config_validation as cv
-from typing import Any, Dict, Union
+from typing import Any, Dict, List, Union
 import voluptuous as vol
 
 
@@ -20,8 +22,14 @@ import voluptuous as vol
 # ------ Abort Reasons ---------------
 ABORT_REASON_ALREADY_CONFIGURED = "already_configured"
 
+# ------ Filtered Domains ---------------
+FILTERED_DOMAINS = (BINARY_SENSOR_DOMAIN, LIGHT_DOMAIN, SENSOR_DOMAIN)
+
 # ------ Steps ---------------
 STEP_INIT = "init"
+STEP_LIGHT_GROUP_MEMBERS = "light_group_members"
+STEP_LIGHT_GROUPS = "light_groups"
+STEP_PROFILE = "profile"
 STEP_USER = "user"
 
 
@@ -70,8 +78,13 @@ class AL_OptionsFlow(OptionsFlow):
     #--------------------------------------------#
 
     def __init__(self, config_entry: ConfigEntry):
+        self._areas = None
         self._config_entry = config_entry
         self._data = { **config_entry.options }
+        self._devices = None
+        self._edited_light_groups = []
+        self._entity_filter = (None, None)
+        self._entity_ids = {}
 
 
     #--------------------------------------------#
@@ -82,6 +95,9 @@ class AL_OptionsFlow(OptionsFlow):
         if not CONF_LIGHT_GROUPS in self._data:
             self._data[CONF_LIGHT_GROUPS] = {}
 
+        if not CONF_PROFILES in self._data:
+            self._data[CONF_PROFILES] = {}
+
         if user_input is not None:
             light_groups = {}
 
@@ -89,22 +105,190 @@ class AL_OptionsFlow(OptionsFlow):
                 if key in self._data[CONF_LIGHT_GROUPS]:
                     light_groups[key] = self._data[CONF_LIGHT_GROUPS][key]
 
+            self._data[CONF_BLOCK_DURATION] = user_input[CONF_BLOCK_DURATION]
+            self._data[CONF_COMPACT_ATTRIBUTES] = user_input[CONF_COMPACT_ATTRIBUTES]
             self._data[CONF_LIGHT_GROUPS] = light_groups
+            self._data[CONF_PROFILES] = { key: value for key, value in self._data[CONF_PROFILES].items() if key in user_input[CONF_PROFILES] }
+            self._data[CONF_RECORD_EVENTS] = user_input[CONF_RECORD_EVENTS]
+            self._data[CONF_STARTUP_PRIORITY] = user_input[CONF_STARTUP_PRIORITY]
 
-            if CONF_ENTITY_ID in user_input:
-                self._data[CONF_LIGHT_GROUPS][user_input[CONF_ENTITY_ID]] = user_input[CONF_ENTITIES]
+            self._entity_filter = (user_input.get(CONF_AREA_ID) or None, user_input.get(CONF_DEVICE_ID) or None)
 
-            if not user_input["new"]:
-                return self.async_create_entry(title="", data=self._data)
+            if user_input[CONF_EDIT_LIGHT_GROUPS]:
+                return await self.async_step_light_groups()
+
+            if user_input[CONF_NEW_PROFILE]:
+                return await self.async_step_profile()
 
-        light_entity_ids = sorted(self.hass.states.async_entity_ids(LIGHT_DOMAIN))
+            return self.async_create_entry(title="", data=self._data)
+
+        await self._async_load_registries()
 
         schema = vol.Schema({
             vol.Required(CONF_BLOCK_DURATION, default=self._data.get(CONF_BLOCK_DURATION, DEFAULT_BLOCK_DURATION)): vol.All(int, vol.Range(min=0)),
             vol.Required(CONF_LIGHT_GROUPS, default=list(self._data.get(CONF_LIGHT_GROUPS, {}).keys())): cv.multi_select(sorted(list(self._data.get(CONF_LIGHT_GROUPS, {}).keys()))),
-            vol.Optional(CONF_ENTITY_ID): vol.In(light_entity_ids),
-            vol.Optional(CONF_ENTITIES, default=[]): cv.multi_select(light_entity_ids),
+            vol.Required(CONF_PROFILES, default=list(self._data[CONF_PROFILES].keys())): cv.multi_select(sorted(list(self._data[CONF_PROFILES].keys()))),
+            vol.Required(CONF_COMPACT_ATTRIBUTES, default=self._data.get(CONF_COMPACT_ATTRIBUTES, DEFAULT_COMPACT_ATTRIBUTES)): bool,
+            vol.Required(CONF_RECORD_EVENTS, default=self._data.get(CONF_RECORD_EVENTS, DEFAULT_RECORD_EVENTS)): bool,
+            vol.Required(CONF_STARTUP_PRIORITY, default=self._data.get(CONF_STARTUP_PRIORITY, DEFAULT_STARTUP_PRIORITY)): vol.Coerce(int),
+            vol.Optional(CONF_AREA_ID, default=""): vol.In({ "": "-", **self._areas }),
+            vol.Optional(CONF_DEVICE_ID, default=""): vol.In({ "": "-", **self._devices }),
+            vol.Required(CONF_EDIT_LIGHT_GROUPS, default=False): bool,
+            vol.Required(CONF_NEW_PROFILE, default=False): bool
+        })
+
+        return self.async_show_form(step_id=STEP_INIT, data_schema=schema)
+
+
+    #--------------------------------------------#
+    #       Steps - Light Groups
+    #--------------------------------------------#
+
+    async def async_step_light_groups(self, user_input: Union[Dict[str, Any], None] = None) -> Dict[str, Any]:
+        """ Selects the light groups (within the area/device filter) that are edited in the next step. """
+        if user_input is not None:
+            self._edited_light_groups = user_input[CONF_LIGHT_GROUPS]
+
+            if len(self._edited_light_groups) == 0:
+                return self.async_create_entry(title="", data=self._data)
+
+            return await self.async_step_light_group_members()
+
+        light_entity_ids = await self._async_get_entity_ids(LIGHT_DOMAIN)
+        candidates = sorted(set(light_entity_ids) | set(self._data[CONF_LIGHT_GROUPS].keys()))
+
+        schema = vol.Schema({
+            vol.Required(CONF_LIGHT_GROUPS, default=[]): cv.multi_select(candidates)
+        })
+
+        return self.async_show_form(step_id=STEP_LIGHT_GROUPS, data_schema=schema)
+
+    async def async_step_light_group_members(self, user_input: Union[Dict[str, Any], None] = None) -> Dict[str, Any]:
+        """ Edits the members of all the selected light groups in a single submit. Without an area/device filter, multiple groups share one list of lights to add (instead of listing every light per group) and each group only lists its current members. """
+        if user_input is not None:
+            added = user_input.pop(CONF_LIGHTS, [])
+            light_groups = { **self._data[CONF_LIGHT_GROUPS] }
+
+            for group, members in user_input.items():
+                members = list(dict.fromkeys(members + [entity_id for entity_id in added if entity_id != group]))
+
+                if len(members) > 0:
+                    light_groups[group] = members
+                else:
+                    light_groups.pop(group, None)
+
+            self._data[CONF_LIGHT_GROUPS] = light_groups
+            return self.async_create_entry(title="", data=self._data)
+
+        light_entity_ids = await self._async_get_entity_ids(LIGHT_DOMAIN)
+        is_shared = self._entity_filter == (None, None) and len(self._edited_light_groups) > 1
+        schema = {}
+
+        for group in self._edited_light_groups:
+            members = self._data[CONF_LIGHT_GROUPS].get(group, [])
+            schema[vol.Optional(group, default=members)] = cv.multi_select(sorted(set(members) if is_shared else (set(light_entity_ids) | set(members)) - { group }))
+
+        if is_shared:
+            schema[vol.Optional(CONF_LIGHTS, default=[])] = cv.multi_select(light_entity_ids)
+
+        return self.async_show_form(step_id=STEP_LIGHT_GROUP_MEMBERS, data_schema=vol.Schema(schema))
+
+
+    #--------------------------------------------#
+    #       Steps - Profile
+    #--------------------------------------------#
+
+    async def async_step_profile(self, user_input: Union[Dict[str, Any], None] = None) -> Dict[str, Any]:
+        errors = {}
+
+        if user_input is not None:
+            try:
+                for key in (CONF_TIME_AFTER, CONF_TIME_BEFORE):
+                    user_input.get(key) and cv.time(user_input[key])
+            except vol.Invalid:
+                errors["base"] = "invalid_time"
+
+            if not errors:
+                name = user_input.pop(CONF_NAME)
+                new = user_input.pop("new")
+                self._data[CONF_PROFILES] = { **self._data[CONF_PROFILES], name: { key: value for key, value in user_input.items() if value != "" } }
+
+                if not new:
+                    return self.async_create_entry(title="", data=self._data)
+
+        light_entity_ids = await self._async_get_entity_ids(LIGHT_DOMAIN)
+        trigger_entity_ids = await self._async_get_entity_ids(BINARY_SENSOR_DOMAIN)
+        illuminance_entity_ids = [""] + await self._async_get_entity_ids(SENSOR_DOMAIN)
+
+        schema = vol.Schema({
+            vol.Required(CONF_NAME): str,
+            vol.Required(CONF_LIGHTS, default=[]): cv.multi_select(light_entity_ids),
+            vol.Optional(CONF_TRIGGERS, default=[]): cv.multi_select(trigger_entity_ids),
+            vol.Optional(CONF_DURATION, default=60): vol.All(int, vol.Range(min=0)),
+            vol.Optional(CONF_TRIGGER_ON_DEBOUNCE, default=DEFAULT_TRIGGER_ON_DEBOUNCE): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(CONF_TRIGGER_OFF_HOLD, default=DEFAULT_TRIGGER_OFF_HOLD): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(ATTR_BRIGHTNESS_PCT, default=100): VALID_BRIGHTNESS_PCT,
+            vol.Optional(ATTR_KELVIN, default=3000): vol.All(int, vol.Range(min=1)),
+            vol.Optional(CONF_TIME_AFTER): str,
+            vol.Optional(CONF_TIME_BEFORE): str,
+            vol.Optional(CONF_ILLUMINANCE_ENTITY, default=""): vol.In(illuminance_entity_ids),
+            vol.Optional(CONF_ILLUMINANCE_THRESHOLD, default=100): vol.All(vol.Coerce(float), vol.Range(min=0)),
             vol.Required("new", default=False): bool
         })
 
-        return self.async_show_form(step_id=STEP_INIT, data_schema=schema)
\ No newline at end of file
+        return self.async_show_form(step_id=STEP_PROFILE, data_schema=schema, errors=errors)
+
+
+    #--------------------------------------------#
+    #       Helpers
+    #--------------------------------------------#
+
+    async def _async_get_entity_ids(self, domain: str) -> List[str]:
+        """ Gets the sorted entity ids of a domain matching the area/device filter (cached per domain and filter for the lifetime of the flow). """
+        key = (domain, *self._entity_filter)
+
+        if key in self._entity_ids:
+            return self._entity_ids[key]
+
+        area_id, device_id = self._entity_filter
+
+        if area_id is None and device_id is None:
+            result = sorted(self.hass.states.async_entity_ids(domain))
+        else:
+            entity_registry = await self.hass.helpers.entity_registry.async_get_registry()
+            device_registry = await self.hass.helpers.device_registry.async_get_registry()
+            result = []
+
+            for entity in entity_registry.entities.values():
+                if entity.domain != domain or entity.disabled:
+                    continue
+
+                if device_id is not None and entity.device_id != device_id:
+                    continue
+
+                if area_id is not None:
+                    device = device_registry.async_get(entity.device_id) if entity.device_id else None
+                    entity_area_id = entity.area_id or (device.area_id if device else None)
+
+                    if entity_area_id != area_id:
+                        continue
+
+                result.append(entity.entity_id)
+
+            result.sort()
+
+        self._entity_ids[key] = result
+        return result
+
+    async def _async_load_registries(self) -> None:
+        """ Loads the areas and the devices with lights or sensors (used as filters), once per flow. """
+        if self._areas is not None:
+            return
+
+        area_registry = await self.hass.helpers.area_registry.async_get_registry()
+        device_registry = await self.hass.helpers.device_registry.async_get_registry()
+        entity_registry = await self.hass.helpers.entity_registry.async_get_registry()
+        filtered_device_ids = set(entity.device_id for entity in entity_registry.entities.values() if entity.domain in FILTERED_DOMAINS and entity.device_id)
+
+        self._areas = { area.id: area.name for area in sorted(area_registry.async_list_areas(), key=lambda area: area.name) }
+        self._devices = { device.id: device.name_by_user or device.name or device.id for device in device_registry.devices.values() if device.id in filtered_device_ids }
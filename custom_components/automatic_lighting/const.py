@@ -1,44 +1,102 @@
-#-----------------------------------------------------------#
-#       Imports
-#-----------------------------------------------------------#
-
-from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_BRIGHTNESS_PCT, ATTR_KELVIN, ATTR_RGB_COLOR, VALID_BRIGHTNESS, VALID_BRIGHTNESS_PCT
-from homeassistant.const import CONF_ID, CONF_STATE
-from homeassistant.helpers import config_validation as cv
-import voluptuous as vol
-
-
 #-----------------------------------------------------------#
 #       Constants
 #-----------------------------------------------------------#
 
+# ------ Automations ---------------
+# Defined here so the automation integration does not have to be imported to listen to its events.
+AUTOMATION_DOMAIN = "automation"
+EVENT_AUTOMATION_RELOADED = "automation_reloaded"
+
 # ------ Component ---------------
 DOMAIN = "automatic_lighting"
-PLATFORMS = ["sensor"]
+DATA_AUTOMATION_COORDINATOR = f"{DOMAIN}_automation_coordinator"
+DATA_BATCH_UPDATE = f"{DOMAIN}_batch_update"
+DATA_LIGHT_CAPABILITIES = f"{DOMAIN}_light_capabilities"
+DATA_SETUP_TIMES = f"{DOMAIN}_setup_times"
+DATA_STARTUP_SCHEDULER = f"{DOMAIN}_startup_scheduler"
+DATA_ZONE_STREAM = f"{DOMAIN}_zone_stream"
+PLATFORMS = ["sensor", "switch"]
 NAME = "Automatic Lighting"
+ENTITIES = "entities"
+LOADED_PLATFORMS = "platforms"
+OWNED_LIGHTS = "owned_lights"
 UNDO_UPDATE_LISTENER = "undo_update_listener"
 
 # ------ Configuration ---------------
+CONF_AREA_ID = "area_id"
 CONF_BLOCK_DURATION = "block_duration"
+CONF_COMPACT_ATTRIBUTES = "compact_attributes"
+CONF_CONSTRAIN = "constrain"
+CONF_DEVICE_ID = "device_id"
+CONF_DURATION = "duration"
+CONF_EDIT_LIGHT_GROUPS = "edit_light_groups"
+CONF_HYSTERESIS = "hysteresis"
+CONF_ILLUMINANCE_ENTITY = "illuminance_entity"
+CONF_ILLUMINANCE_THRESHOLD = "illuminance_threshold"
 CONF_LIGHT_GROUPS = "light_groups"
 CONF_LIGHTS = "lights"
+CONF_NEW_PROFILE = "new_profile"
 CONF_NEW_STATE = "new_state"
 CONF_OLD_STATE = "old_state"
+CONF_PROFILES = "profiles"
+CONF_RECORD_EVENTS = "record_events"
+CONF_STARTUP_CONCURRENCY = "startup_concurrency"
+CONF_STARTUP_INTERVAL = "startup_interval"
+CONF_STARTUP_PRIORITY = "startup_priority"
+CONF_TIME_AFTER = "time_after"
+CONF_TIME_BEFORE = "time_before"
+CONF_TRIGGER_OFF_HOLD = "trigger_off_hold"
+CONF_TRIGGER_ON_DEBOUNCE = "trigger_on_debounce"
+CONF_TRIGGER_PREDICATE = "trigger_predicate"
+CONF_TRIGGERS = "triggers"
 
 # --- Attributes ----------
+ATTR_ACTIVE_UNTIL = "active_until"
 ATTR_BLOCKED_UNTIL = "blocked_until"
+ATTR_LAST_TRIGGERED_AT = "last_triggered_at"
+ATTR_LAST_TRIGGERED_BY = "last_triggered_by"
+ATTR_LIGHTS_HASH = "lights_hash"
+ATTR_STATUS = "status"
 
 # ------ Defaults ---------------
 DEFAULT_BLOCK_DURATION = 300
+DEFAULT_COMPACT_ATTRIBUTES = False
+DEFAULT_RECORD_EVENTS = False
+DEFAULT_STARTUP_CONCURRENCY = 5
+DEFAULT_STARTUP_INTERVAL = 0.5
+DEFAULT_STARTUP_PRIORITY = 0
+DEFAULT_TRIGGER_OFF_HOLD = 0
+DEFAULT_TRIGGER_ON_DEBOUNCE = 0
 
 # ------ Events ---------------
 EVENT_DATA_TYPE_REQUEST = "request"
 EVENT_DATA_TYPE_RESET = "reset"
 EVENT_TYPE_AUTOMATIC_LIGHTING = "automatic_lighting_event"
+EVENT_TYPE_REFRESH = "refresh"
+EVENT_AUTOMATIC_LIGHTING = EVENT_TYPE_AUTOMATIC_LIGHTING
+
+# ------ Records ---------------
+RECORD_TYPE_AUTOMATIONS_CHANGED = "automations_changed"
+RECORD_TYPE_COMMAND = "command"
+RECORD_TYPE_CONDITION = "condition"
+RECORD_TYPE_CONSTRAIN = "constrain"
+RECORD_TYPE_DECISION = "decision"
+RECORD_TYPE_EVENT = "event"
+RECORD_TYPE_MANUAL_CONTROL = "manual_control"
+RECORD_TYPE_REGISTER = "register"
+RECORD_TYPE_SESSION = "session"
+RECORD_TYPE_START = "start"
+RECORD_TYPE_TIMER = "timer"
+RECORD_TYPE_TRACK_LIGHTS = "track_lights"
+RECORD_TYPE_TRIGGER = "trigger"
+RECORD_TYPE_TURN_OFF = "turn_off"
+RECORD_TYPE_TURN_ON = "turn_on"
 
 # ------ Services ---------------
 SERVICE_BLOCK = "block"
 SERVICE_CONSTRAIN = "constrain"
+SERVICE_REGISTER = "register"
+SERVICE_REGISTER_MANY = "register_many"
 SERVICE_TRACK_LIGHTS = "track_lights"
 
 # ------ States ---------------
@@ -46,30 +104,7 @@ STATE_ACTIVE = "active"
 STATE_BLOCKED = "blocked"
 STATE_IDLE = "idle"
 
-# ------ Validators ---------------
-VALID_COLOR_NAME = cv.string
-VALID_COLOR_TEMP = vol.All(vol.Coerce(int), vol.Range(min=1))
-VALID_HS_COLOR = vol.All(vol.ExactSequence((vol.All(vol.Coerce(float), vol.Range(min=0, max=360)), vol.All(vol.Coerce(float), vol.Range(min=0, max=100)))),vol.Coerce(tuple))
-VALID_KELVIN = cv.positive_int
-VALID_RGB_COLOR = vol.All(vol.ExactSequence((cv.byte, cv.byte, cv.byte)), vol.Coerce(tuple))
-VALID_XY_COLOR = vol.All(vol.ExactSequence((cv.small_float, cv.small_float)), vol.Coerce(tuple))
-VALID_WHITE_VALUE = vol.All(vol.Coerce(int), vol.Range(min=0, max=255))
-
-
-#-----------------------------------------------------------#
-#       Schemas
-#-----------------------------------------------------------#
-
-SERVICE_SCHEMA_TRACK_LIGHTS = {
-    vol.Required(CONF_LIGHTS): vol.Any(dict, list, str)
-}
-
-SERVICE_SCHEMA_TURN_ON = {
-    vol.Required(CONF_ID): vol.Any(str, int),
-    vol.Required(CONF_STATE): vol.In([STATE_ACTIVE, STATE_IDLE]),
-    vol.Required(CONF_LIGHTS): vol.Any(dict, list, str),
-    vol.Optional(ATTR_BRIGHTNESS): VALID_BRIGHTNESS,
-    vol.Optional(ATTR_BRIGHTNESS_PCT): VALID_BRIGHTNESS_PCT,
-    vol.Optional(ATTR_KELVIN): VALID_KELVIN,
-    vol.Optional(ATTR_RGB_COLOR): VALID_RGB_COLOR,
-}
\ No newline at end of file
+# ------ Status ---------------
+STATUS_ACTIVE = STATE_ACTIVE
+STATUS_BLOCKED = STATE_BLOCKED
+STATUS_IDLE = STATE_IDLE
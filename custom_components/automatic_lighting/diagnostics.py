@@ -0,0 +1,28 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from .const import DATA_AUTOMATION_COORDINATOR, DATA_LIGHT_CAPABILITIES, DATA_SETUP_TIMES, DATA_STARTUP_SCHEDULER, DATA_ZONE_STREAM, DOMAIN, ENTITIES
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from typing import Any, Dict
+
+
+#-----------------------------------------------------------#
+#       Diagnostics
+#-----------------------------------------------------------#
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, config_entry: ConfigEntry) -> Dict[str, Any]:
+    """ Returns the full details of the entities of a config entry. """
+    entities = hass.data.get(DOMAIN, {}).get(config_entry.entry_id, {}).get(ENTITIES, [])
+
+    return {
+        "options": dict(config_entry.options),
+        "automation_coordinator": hass.data[DATA_AUTOMATION_COORDINATOR].stats if DATA_AUTOMATION_COORDINATOR in hass.data else None,
+        "setup_times": hass.data.get(DATA_SETUP_TIMES),
+        "startup": { "ready_times": hass.data[DATA_STARTUP_SCHEDULER].ready_times, "timed_out": hass.data[DATA_STARTUP_SCHEDULER].timed_out } if DATA_STARTUP_SCHEDULER in hass.data else None,
+        "bus_listeners": sum(hass.bus.async_listeners().values()),
+        "light_capabilities": hass.data[DATA_LIGHT_CAPABILITIES].stats if DATA_LIGHT_CAPABILITIES in hass.data else None,
+        "zone_stream": hass.data[DATA_ZONE_STREAM].stats if DATA_ZONE_STREAM in hass.data else None,
+        "entities": { entity.entity_id: { **entity.details, "trace": entity.traces } for entity in entities }
+    }
@@ -0,0 +1,347 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+# The engine only depends on the standard library, so it can be loaded from its file path
+# (e.g. for benchmarks or fuzzing) without Home Assistant being installed.
+from __future__ import annotations
+from typing import Any, Callable, Iterable, List, Mapping, NamedTuple, Sequence, Tuple, Union
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+BLOCK_GRANULARITY = 1.0
+
+DEADLINE_ACTIVE = "active"
+DEADLINE_BLOCK = "block"
+
+SERVICE_TURN_OFF = "turn_off"
+SERVICE_TURN_ON = "turn_on"
+
+STATE_ACTIVE = "active"
+STATE_BLOCKED = "blocked"
+STATE_IDLE = "idle"
+
+
+#-----------------------------------------------------------#
+#       Functions
+#-----------------------------------------------------------#
+
+def get_first(profiles: Iterable[Any]) -> Any:
+    """ Gets the first profile (used when the profiles have already been selected, e.g. by a batch evaluation). """
+    return next(iter(profiles), None)
+
+def get_first_valid(profiles: Iterable[Any]) -> Any:
+    """ Gets the first valid profile. """
+    return next(filter(lambda profile: profile.is_valid(), profiles), None)
+
+def get_unused_entities(old_entity_ids: Iterable[str], new_entity_ids: Iterable[str]) -> List[str]:
+    """ Gets the entity ids that are not used anymore (the default when no light group index is available). """
+    new_entity_ids = set(new_entity_ids)
+    return [entity_id for entity_id in old_entity_ids if entity_id not in new_entity_ids]
+
+
+#-----------------------------------------------------------#
+#       Class - Command
+#-----------------------------------------------------------#
+
+class Command(NamedTuple):
+    """ A light service call issued by the engine. """
+    service: str
+    entity_ids: Tuple[str, ...]
+    attributes: Mapping[str, Any]
+
+
+#-----------------------------------------------------------#
+#       Class - LightingEngine
+#-----------------------------------------------------------#
+
+class LightingEngine():
+    """ The decision core of a zone. Inputs carry an explicit timestamp (in seconds), outputs are lists of commands and deadlines (the adapter calls advance once the next deadline has passed). Profiles are any objects with an id, state, lights and attributes (and an is_valid method when using evaluate). """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, block_duration: Union[int, None], unused_entities: Callable[[Iterable[str], Iterable[str]], List[str]] = get_unused_entities):
+        self._active_profile = None
+        self._active_until = None
+        self._block_config_duration = block_duration
+        self._block_duration = block_duration
+        self._blocked_until = None
+        self._candidate = None
+        self._idle_profile = None
+        self._is_blocked = False
+        self._is_requesting = False
+        self._published_until = None
+        self._unused_entities = unused_entities
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def active_profile(self) -> Any:
+        """ Gets the current active profile (returns None if no trigger has activated a profile). """
+        return self._active_profile
+
+    @property
+    def active_until(self) -> Union[float, None]:
+        """ Gets the time at which the active profile ends (returns None if its triggers are still on). """
+        return self._active_until
+
+    @property
+    def block_duration(self) -> Union[int, None]:
+        """ Gets the duration of the current (or next) block. """
+        return self._block_duration
+
+    @property
+    def blocked_until(self) -> Union[float, None]:
+        """ Gets the time at which the block ends (returns None if the engine is not blocked or blocked indefinitely). """
+        return self._blocked_until
+
+    @property
+    def idle_profile(self) -> Any:
+        """ Gets the current idle profile. """
+        return self._idle_profile
+
+    @property
+    def is_active(self) -> bool:
+        """ Gets a boolean indicating whether a trigger has activated a profile. """
+        return self._active_profile is not None
+
+    @property
+    def is_blocked(self) -> bool:
+        """ Gets a boolean indicating whether the engine is blocked. """
+        return self._is_blocked
+
+    @property
+    def is_requesting(self) -> bool:
+        """ Gets a boolean indicating whether the engine is collecting offered profiles. """
+        return self._is_requesting
+
+    @property
+    def next_deadline(self) -> Union[float, None]:
+        """ Gets the earliest time at which advance has to be called (returns None if nothing is pending). """
+        deadlines = [deadline for deadline in (self._blocked_until, self._active_until) if deadline is not None]
+        return min(deadlines) if deadlines else None
+
+    @property
+    def profile(self) -> Any:
+        """ Gets the profile currently applied to the lights. """
+        return self._active_profile or self._idle_profile
+
+    @property
+    def state(self) -> str:
+        """ Gets the state of the engine. """
+        if self._is_blocked:
+            return STATE_BLOCKED
+
+        return STATE_ACTIVE if self._active_profile is not None else STATE_IDLE
+
+
+    #--------------------------------------------#
+    #       Configuration Methods
+    #--------------------------------------------#
+
+    def set_block_duration(self, duration: Union[int, None]) -> None:
+        """ Sets the configured block duration (a running block keeps its duration). """
+        self._block_config_duration = duration
+
+        if not self._is_blocked:
+            self._block_duration = duration
+
+    def reset(self) -> None:
+        """ Clears the block, the pending request and the active profile. """
+        self._active_profile = None
+        self._active_until = None
+        self._blocked_until = None
+        self._candidate = None
+        self._is_blocked = False
+        self._is_requesting = False
+        self._published_until = None
+
+
+    #--------------------------------------------#
+    #       Time Methods
+    #--------------------------------------------#
+
+    def advance(self, now: float) -> List[str]:
+        """ Expires the deadlines that have passed and returns their names. """
+        expired = []
+
+        if self._is_blocked and self._blocked_until is not None and self._blocked_until <= now:
+            self._blocked_until = None
+            self._is_blocked = False
+            self._published_until = None
+            expired.append(DEADLINE_BLOCK)
+
+        if self._active_until is not None and self._active_until <= now:
+            self._active_profile = None
+            self._active_until = None
+            expired.append(DEADLINE_ACTIVE)
+
+        return expired
+
+
+    #--------------------------------------------#
+    #       Block Methods
+    #--------------------------------------------#
+
+    def block(self, now: float, duration: Union[int, None]) -> bool:
+        """ Blocks the engine for a duration (None blocks it indefinitely). While blocked with the same duration, the deadline is only moved forward; returns whether the block has to be published (it started, its duration changed or its deadline moved by at least the granularity). """
+        blocked_until = now + duration if duration is not None else None
+
+        if self._is_blocked and duration == self._block_duration:
+            if blocked_until is None:
+                return False
+
+            self._blocked_until = max(self._blocked_until, blocked_until)
+
+            if self._blocked_until - self._published_until < BLOCK_GRANULARITY:
+                return False
+
+            self._published_until = self._blocked_until
+            return True
+
+        self._block_duration = duration
+        self._blocked_until = blocked_until
+        self._is_blocked = True
+        self._published_until = blocked_until
+        return True
+
+    def extend_block(self, now: float) -> bool:
+        """ Restarts the current block (used when automatic control is attempted while blocked). """
+        return self.block(now, self._block_duration)
+
+    def manual_control(self, now: float) -> bool:
+        """ Blocks the engine after manual control of the lights was detected. """
+        return self.block(now, self._block_duration if self._is_blocked else self._block_config_duration)
+
+
+    #--------------------------------------------#
+    #       Request Methods
+    #--------------------------------------------#
+
+    def begin_request(self) -> None:
+        """ Starts collecting offered profiles (the current profile is dropped until the request finishes). """
+        self._active_profile = None
+        self._candidate = None
+        self._idle_profile = None
+        self._is_requesting = True
+
+    def offer(self, profile: Any) -> bool:
+        """ Offers a profile while requesting (an idle profile never replaces an offered active profile); returns whether the engine was requesting. """
+        if not self._is_requesting:
+            return False
+
+        if self._candidate is not None and self._candidate.state == STATE_ACTIVE and profile.state == STATE_IDLE:
+            return True
+
+        self._candidate = profile
+        return True
+
+    def finish_request(self, lights: Sequence[str]) -> List[Command]:
+        """ Applies the best offered profile, turning off the lights it does not use (or all lights if no profile was offered). """
+        profile = self._candidate
+        self._candidate = None
+        self._is_requesting = False
+        self._set_profile(profile)
+
+        if self._is_blocked:
+            return []
+
+        if profile is None:
+            return self._get_turn_off_commands(lights)
+
+        return self._get_commands(profile, lights)
+
+    def restore(self, profile: Any, lights: Sequence[str]) -> List[Command]:
+        """ Applies a known profile without a request (e.g. after a block), turning off the lights it does not use. """
+        if self._is_blocked:
+            return []
+
+        self._set_profile(profile)
+        return self._get_commands(profile, lights)
+
+    def turn_on(self, now: float, profile: Any) -> List[Command]:
+        """ Applies a profile outside of a request (the block is extended instead if the engine is blocked). """
+        if self._is_blocked:
+            self.extend_block(now)
+            return []
+
+        current = self.profile
+        previous_lights = current.lights if current is not None and current.id != profile.id else ()
+        self._set_profile(profile)
+        return self._get_commands(profile, previous_lights)
+
+
+    #--------------------------------------------#
+    #       Evaluation Methods
+    #--------------------------------------------#
+
+    def evaluate(self, is_triggered: bool, active_profiles: Iterable[Any], idle_profiles: Iterable[Any], lights: Sequence[str], select: Callable[[Iterable[Any]], Any] = get_first_valid) -> List[Command]:
+        """ Selects the first valid active profile (if triggered) or idle profile, unless blocked or an active profile is still running. """
+        if self._is_blocked:
+            self._active_profile = None
+            self._active_until = None
+            return []
+
+        if self._active_profile is not None:
+            return []
+
+        if is_triggered:
+            profile = select(active_profiles)
+
+            if profile is not None:
+                self._active_profile = profile
+                self._active_until = None
+                return self._get_commands(profile, lights)
+
+        profile = select(idle_profiles)
+        self._idle_profile = profile
+
+        if profile is None:
+            return self._get_turn_off_commands(lights)
+
+        return self._get_commands(profile, lights)
+
+    def hold(self) -> None:
+        """ Keeps the active profile running (its triggers turned on again). """
+        self._active_until = None
+
+    def release(self, now: float, duration: Union[int, None]) -> None:
+        """ Ends the active profile after a duration (its triggers turned off). """
+        if self._active_profile is None or duration is None:
+            return
+
+        self._active_until = now + duration
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _get_commands(self, profile: Any, previous_lights: Iterable[str]) -> List[Command]:
+        """ Gets the commands turning off the unused previous lights and turning on the lights of the profile. """
+        commands = []
+        unused_entities = self._unused_entities(previous_lights, profile.lights)
+
+        if len(unused_entities) > 0:
+            commands.append(Command(SERVICE_TURN_OFF, tuple(unused_entities), {}))
+
+        commands.append(Command(SERVICE_TURN_ON, tuple(profile.lights), profile.attributes))
+        return commands
+
+    def _get_turn_off_commands(self, lights: Sequence[str]) -> List[Command]:
+        """ Gets the command turning off all lights (no command if there are no lights). """
+        return [Command(SERVICE_TURN_OFF, tuple(lights), {})] if len(lights) > 0 else []
+
+    def _set_profile(self, profile: Any) -> None:
+        """ Sets the current profile, based on its state. """
+        is_active = profile is not None and profile.state == STATE_ACTIVE
+        self._active_profile = profile if is_active else None
+        self._active_until = None
+        self._idle_profile = profile if not is_active else None
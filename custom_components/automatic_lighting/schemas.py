@@ -0,0 +1,80 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+# The schemas are kept out of const.py, so importing the integration does not load the light component and the config validation helpers.
+from .const import CONF_CONSTRAIN, CONF_DURATION, CONF_HYSTERESIS, CONF_LIGHTS, CONF_PROFILES, CONF_TRIGGER_OFF_HOLD, CONF_TRIGGER_ON_DEBOUNCE, CONF_TRIGGER_PREDICATE, CONF_TRIGGERS, STATE_ACTIVE, STATE_IDLE
+from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_BRIGHTNESS_PCT, ATTR_KELVIN, ATTR_RGB_COLOR, VALID_BRIGHTNESS, VALID_BRIGHTNESS_PCT
+from homeassistant.const import CONF_ABOVE, CONF_ATTRIBUTE, CONF_BELOW, CONF_ID, CONF_STATE
+from homeassistant.helpers import config_validation as cv
+import voluptuous as vol
+
+
+#-----------------------------------------------------------#
+#       Validators
+#-----------------------------------------------------------#
+
+VALID_COLOR_NAME = cv.string
+VALID_COLOR_TEMP = vol.All(vol.Coerce(int), vol.Range(min=1))
+VALID_HS_COLOR = vol.All(vol.ExactSequence((vol.All(vol.Coerce(float), vol.Range(min=0, max=360)), vol.All(vol.Coerce(float), vol.Range(min=0, max=100)))),vol.Coerce(tuple))
+VALID_KELVIN = cv.positive_int
+VALID_RGB_COLOR = vol.All(vol.ExactSequence((cv.byte, cv.byte, cv.byte)), vol.Coerce(tuple))
+VALID_XY_COLOR = vol.All(vol.ExactSequence((cv.small_float, cv.small_float)), vol.Coerce(tuple))
+VALID_WHITE_VALUE = vol.All(vol.Coerce(int), vol.Range(min=0, max=255))
+
+
+#-----------------------------------------------------------#
+#       Schemas
+#-----------------------------------------------------------#
+
+TRIGGER_PREDICATE_SCHEMA = vol.Any(
+    vol.Schema({
+        vol.Optional(CONF_ATTRIBUTE): cv.string,
+        vol.Required(CONF_STATE): vol.All(cv.ensure_list, [cv.string])
+    }),
+    vol.All(vol.Schema({
+        vol.Optional(CONF_ATTRIBUTE): cv.string,
+        vol.Optional(CONF_ABOVE): vol.Coerce(float),
+        vol.Optional(CONF_BELOW): vol.Coerce(float),
+        vol.Optional(CONF_HYSTERESIS, default=0): vol.All(vol.Coerce(float), vol.Range(min=0))
+    }), cv.has_at_least_one_key(CONF_ABOVE, CONF_BELOW))
+)
+
+PROFILE_SCHEMA = {
+    vol.Optional(CONF_ID): vol.Any(str, int),
+    vol.Required(CONF_LIGHTS): vol.Any(dict, list, str),
+    vol.Optional(CONF_TRIGGERS, default=[]): vol.Any(dict, list, str),
+    vol.Optional(CONF_DURATION): cv.positive_int,
+    vol.Optional(CONF_TRIGGER_ON_DEBOUNCE): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    vol.Optional(CONF_TRIGGER_OFF_HOLD): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    vol.Optional(CONF_TRIGGER_PREDICATE): TRIGGER_PREDICATE_SCHEMA,
+    vol.Optional(ATTR_BRIGHTNESS): VALID_BRIGHTNESS,
+    vol.Optional(ATTR_BRIGHTNESS_PCT): VALID_BRIGHTNESS_PCT,
+    vol.Optional(ATTR_KELVIN): VALID_KELVIN,
+    vol.Optional(ATTR_RGB_COLOR): VALID_RGB_COLOR,
+}
+
+SERVICE_SCHEMA_CONSTRAIN = {
+    vol.Optional(CONF_ID): vol.Any(str, int),
+    vol.Required(CONF_CONSTRAIN): cv.boolean
+}
+
+SERVICE_SCHEMA_REGISTER = PROFILE_SCHEMA
+
+SERVICE_SCHEMA_REGISTER_MANY = {
+    vol.Required(CONF_PROFILES): vol.All(cv.ensure_list, [vol.Schema(PROFILE_SCHEMA)])
+}
+
+SERVICE_SCHEMA_TRACK_LIGHTS = {
+    vol.Required(CONF_LIGHTS): vol.Any(dict, list, str)
+}
+
+SERVICE_SCHEMA_TURN_ON = {
+    vol.Required(CONF_ID): vol.Any(str, int),
+    vol.Required(CONF_STATE): vol.In([STATE_ACTIVE, STATE_IDLE]),
+    vol.Required(CONF_LIGHTS): vol.Any(dict, list, str),
+    vol.Optional(ATTR_BRIGHTNESS): VALID_BRIGHTNESS,
+    vol.Optional(ATTR_BRIGHTNESS_PCT): VALID_BRIGHTNESS_PCT,
+    vol.Optional(ATTR_KELVIN): VALID_KELVIN,
+    vol.Optional(ATTR_RGB_COLOR): VALID_RGB_COLOR,
+}
\ No newline at end of file
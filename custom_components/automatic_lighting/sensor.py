@@ -3,26 +3,26 @@
 #-----------------------------------------------------------#
 
 from __future__ import annotations
-from . import LOGGER_BASE_NAME
-from .const import ATTR_BLOCKED_UNTIL, CONF_BLOCK_DURATION, CONF_LIGHTS, CONF_LIGHT_GROUPS, DEFAULT_BLOCK_DURATION, DOMAIN, EVENT_DATA_TYPE_REQUEST, EVENT_DATA_TYPE_RESET, EVENT_TYPE_AUTOMATIC_LIGHTING, SERVICE_SCHEMA_TRACK_LIGHTS, SERVICE_SCHEMA_TURN_ON, SERVICE_TRACK_LIGHTS, STATE_ACTIVE, STATE_BLOCKED, STATE_IDLE
-from .utils import EntityBase, async_resolve_target, async_track_automations_changed, async_track_manual_control
-from datetime import datetime, timedelta
-from homeassistant.components.automation import EVENT_AUTOMATION_RELOADED
-from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
-from homeassistant.const import ATTR_ID, CONF_ID, CONF_NAME, CONF_STATE, EVENT_HOMEASSISTANT_START, SERVICE_TURN_OFF, SERVICE_TURN_ON
+from . import LOGGER_BASE_NAME, record_setup_time
+from .const import ATTR_ACTIVE_UNTIL, ATTR_BLOCKED_UNTIL, ATTR_LIGHTS_HASH, ATTR_STATUS, ENTITIES, EVENT_AUTOMATION_RELOADED, CONF_BLOCK_DURATION, CONF_COMPACT_ATTRIBUTES, CONF_LIGHTS, CONF_LIGHT_GROUPS, CONF_RECORD_EVENTS, CONF_STARTUP_PRIORITY, DATA_STARTUP_SCHEDULER, DEFAULT_BLOCK_DURATION, DEFAULT_COMPACT_ATTRIBUTES, DEFAULT_RECORD_EVENTS, DEFAULT_STARTUP_PRIORITY, DOMAIN, EVENT_DATA_TYPE_REQUEST, EVENT_DATA_TYPE_RESET, EVENT_TYPE_AUTOMATIC_LIGHTING, RECORD_TYPE_AUTOMATIONS_CHANGED, RECORD_TYPE_DECISION, RECORD_TYPE_MANUAL_CONTROL, RECORD_TYPE_START, RECORD_TYPE_TIMER, RECORD_TYPE_TRACK_LIGHTS, RECORD_TYPE_TURN_OFF, RECORD_TYPE_TURN_ON, SERVICE_TRACK_LIGHTS
+from .engine import DEADLINE_BLOCK, Command, LightingEngine
+from .schemas import SERVICE_SCHEMA_TRACK_LIGHTS, SERVICE_SCHEMA_TURN_ON
+from .utils import EntityBase, EventRecorder, Inbox, LightGroupIndex, ProfileStore, async_expand_light_groups, get_entities_hash, get_owned_lights, intern_attributes, intern_entity_ids, async_resolve_target, async_track_automations_changed, async_track_manual_control
+from datetime import datetime
+from functools import partial
+from homeassistant.const import ATTR_ID, CONF_ID, CONF_NAME, CONF_STATE, SERVICE_TURN_OFF, SERVICE_TURN_ON
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import Context, HomeAssistant
 from homeassistant.helpers import entity_platform
-from homeassistant.helpers.event import async_call_later
 from logging import getLogger
-from typing import Any, Callable, Dict, List
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Mapping, Tuple
 
 
 #-----------------------------------------------------------#
 #       Constants
 #-----------------------------------------------------------#
 
-BLOCK_THROTTLE_TIME = 0.2
 REQUEST_DEBOUNCE_TIME = 0.2
 RESET_DEBOUNCE_TIME = 0.2
 START_DELAY = 0.5
@@ -33,11 +33,15 @@ START_DELAY = 0.5
 #-----------------------------------------------------------#
 
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities: Callable) -> bool:
-    async_add_entities([AL_Entity(config_entry)], update_before_add=True)
+    started_at = perf_counter()
+    entity = AL_Entity(config_entry)
+    hass.data[DOMAIN][config_entry.entry_id][ENTITIES].append(entity)
+    async_add_entities([entity], update_before_add=True)
     platform = entity_platform.current_platform.get()
     platform.async_register_entity_service(SERVICE_TRACK_LIGHTS, SERVICE_SCHEMA_TRACK_LIGHTS, "_async_service_track_lights")
     platform.async_register_entity_service(SERVICE_TURN_OFF, {}, "_async_service_turn_off")
     platform.async_register_entity_service(SERVICE_TURN_ON, SERVICE_SCHEMA_TURN_ON, "_async_service_turn_on")
+    record_setup_time(hass, f"{config_entry.entry_id}.sensor", started_at)
     return True
 
 
@@ -56,30 +60,36 @@ class AL_Entity(EntityBase):
         EntityBase.__init__(self, getLogger(f"{LOGGER_BASE_NAME}.{config_entry.unique_id}"))
 
         # --- Attributes ----------
-        self._blocked_at = None
-        self._blocked_until = None
-
-        # --- Block ----------
-        self._block_config_duration = config_entry.options.get(CONF_BLOCK_DURATION, DEFAULT_BLOCK_DURATION)
-        self._block_duration = self._block_config_duration
-        self._block_enabled = True
+        self._attributes = {}
+        self._attributes_key = None
+        self._compact_attributes = config_entry.options.get(CONF_COMPACT_ATTRIBUTES, DEFAULT_COMPACT_ATTRIBUTES)
 
         # --- Entity ----------
+        self._entry_id = config_entry.entry_id
         self._name = f"{DOMAIN} - {config_entry.data.get(CONF_NAME)}"
-        self._state = STATE_IDLE
+        self._record_events = config_entry.options.get(CONF_RECORD_EVENTS, DEFAULT_RECORD_EVENTS)
+        self._startup_priority = config_entry.options.get(CONF_STARTUP_PRIORITY, DEFAULT_STARTUP_PRIORITY)
 
         # --- Lights ----------
         self._light_groups = config_entry.options.get(CONF_LIGHT_GROUPS, {})
+        self._light_group_index = LightGroupIndex(self._light_groups)
+        self._registered_lights = []
         self._tracked_lights = list(set(sum(self._light_groups.values(), [])))
 
+        # --- Engine ----------
+        self._engine = LightingEngine(config_entry.options.get(CONF_BLOCK_DURATION, DEFAULT_BLOCK_DURATION), lambda old_entity_ids, new_entity_ids: self._light_group_index.unused_entities(old_entity_ids, new_entity_ids))
+
         # --- Listeners ----------
+        self._inbox = Inbox(self.call_soon, self._decide)
         self._listeners = []
+        self._manual_control_listener = None
 
         # --- Profile ----------
-        self._current_profile = None
+        self._block_snapshot = None
+        self._profiles = ProfileStore()
+        self._profiles_version = 0
 
         # --- Timers ----------
-        self._block_timer = None
         self._request_timer = None
         self._reset_timer = None
 
@@ -93,16 +103,42 @@ class AL_Entity(EntityBase):
     #--------------------------------------------#
 
     @property
-    def device_state_attributes(self) -> Dict[str, Any]:
-        """ Gets a dictionary containing the entity attributes. """
+    def details(self) -> Dict[str, Any]:
+        """ Gets a dictionary containing the full details of the entity (exposed through diagnostics). """
+        profile = self._engine.profile
+        return {
+            CONF_STATE: self.state,
+            ATTR_BLOCKED_UNTIL: self.blocked_until,
+            CONF_LIGHT_GROUPS: self._light_groups,
+            "tracked_lights": self._tracked_lights,
+            "delivery": self.delivery.stats,
+            "inbox": self._inbox.stats,
+            "handles": { **self.handles, "inbox": self._inbox.pending, "listeners": len(self._listeners), "manual_control": int(self._manual_control_listener is not None), "request_timer": int(self._request_timer is not None), "reset_timer": int(self._reset_timer is not None), "profiles": self._profiles.size },
+            "profile": { ATTR_ID: profile.id, CONF_STATE: profile.state, CONF_LIGHTS: list(profile.lights), **profile.attributes } if profile else None
+        }
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """ Gets a dictionary containing the entity attributes (cached until the inputs change). """
+        profile = self._engine.profile
+        key = (self.is_blocked, self._engine.blocked_until, profile, self._compact_attributes)
+
+        if key == self._attributes_key:
+            return self._attributes
+
         attributes = {}
 
         if self.is_blocked:
-            attributes.update({ ATTR_BLOCKED_UNTIL: self._blocked_until })
+            attributes.update({ ATTR_BLOCKED_UNTIL: self.blocked_until })
 
-        if not self.is_blocked and self._current_profile:
-            attributes.update({ ATTR_ID: self._current_profile.id, **self._current_profile.attributes })
+        if not self.is_blocked and profile:
+            if self._compact_attributes:
+                attributes.update({ ATTR_ID: profile.id, ATTR_LIGHTS_HASH: get_entities_hash(profile.lights) })
+            else:
+                attributes.update({ ATTR_ID: profile.id, **profile.attributes })
 
+        self._attributes = attributes
+        self._attributes_key = key
         return attributes
 
     @property
@@ -118,7 +154,7 @@ class AL_Entity(EntityBase):
     @property
     def state(self) -> bool:
         """ Gets the state of the entity. """
-        return STATE_BLOCKED if self.is_blocked else self._state
+        return self._engine.state
 
     @property
     def unique_id(self) -> str:
@@ -132,14 +168,19 @@ class AL_Entity(EntityBase):
 
     async def async_added_to_hass(self) -> None:
         """ Triggered when the entity has been added to Home Assistant. """
-        if self.hass.is_running:
-            return self._initialize()
+        if self._record_events:
+            self.set_recorder(EventRecorder(self.hass, self.hass.config.path(f"{DOMAIN}.{self._entry_id}.jsonl")))
 
-        self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_START, self._initialize)
+        self.hass.data[DATA_STARTUP_SCHEDULER].admit(self.entity_id, self._startup_priority, self._initialize)
 
     async def async_will_remove_from_hass(self) -> None:
         """ Triggered when the entity is being removed from Home Assistant. """
+        self.hass.data[DATA_STARTUP_SCHEDULER].cancel(self.entity_id)
         self._remove_listeners()
+        self.remove_zone_state()
+
+        if self.recorder:
+            await self.recorder.async_flush()
 
 
     #-----------------------------------------------------------------------------#
@@ -150,10 +191,21 @@ class AL_Entity(EntityBase):
     #       Properties
     #--------------------------------------------#
 
+    @property
+    def blocked_until(self) -> datetime | None:
+        """ Gets the time at which the block ends (returns None if the entity is not blocked or blocked indefinitely). """
+        return datetime.fromtimestamp(self._engine.blocked_until) if self._engine.blocked_until is not None else None
+
     @property
     def is_blocked(self) -> bool:
         """ Gets a boolean indicating whether the entity is blocked. """
-        return self._block_timer is not None
+        return self._engine.is_blocked
+
+    @property
+    def zone_state(self) -> Dict[str, Any]:
+        """ Gets the compact state of the zone streamed to the websocket subscribers (timestamps are POSIX timestamps). """
+        profile = self._engine.profile
+        return { ATTR_STATUS: self._engine.state, ATTR_ID: profile.id if profile else None, ATTR_ACTIVE_UNTIL: self._engine.active_until, ATTR_BLOCKED_UNTIL: self._engine.blocked_until }
 
 
     #--------------------------------------------#
@@ -162,7 +214,8 @@ class AL_Entity(EntityBase):
 
     def _initialize(self, *args: Any) -> None:
         """ Initializes the entity's internal logic. """
-        self._listeners.append(async_call_later(self.hass, START_DELAY, self._reset))
+        self.record(RECORD_TYPE_START)
+        self._listeners.append(self.call_later(START_DELAY, self._reset))
 
 
     #--------------------------------------------#
@@ -175,29 +228,35 @@ class AL_Entity(EntityBase):
             self._reset_request_timer()
         else:
             self.logger.debug(f"Firing request event.")
-            self._current_profile = None
-            self.fire_event(EVENT_TYPE_AUTOMATIC_LIGHTING, entity_id=self.entity_id, type=EVENT_DATA_TYPE_REQUEST)
+            self._engine.begin_request()
+            self.fire_zone_event(EVENT_TYPE_AUTOMATIC_LIGHTING, type=EVENT_DATA_TYPE_REQUEST)
 
         def _on_request_finished(*args: Any) -> None:
             """ Triggered when the request event has finished. """
+            self.record(RECORD_TYPE_TIMER, name="request")
             self._reset_request_timer()
+            self._inbox.post(self._process_request_finished)
 
-            if self.is_blocked:
-                return
+        self._request_timer = self.call_later(REQUEST_DEBOUNCE_TIME, _on_request_finished)
 
-            if self._current_profile:
-                self.logger.debug(f"A lighting profile was provided: {self._current_profile.id}")
-                self._state = self._current_profile.state
-                self._turn_off_unused_entities(self._tracked_lights, self._current_profile.lights)
-                self.call_service(LIGHT_DOMAIN, SERVICE_TURN_ON, entity_id=self._current_profile.lights, **self._current_profile.attributes)
-            else:
-                self.logger.debug(f"No lighting profile was provided. Turning off all tracked lights.")
-                self._state = STATE_IDLE
-                self.call_service(LIGHT_DOMAIN, SERVICE_TURN_OFF, entity_id=self._tracked_lights)
+    def _process_request_finished(self) -> List[Command] | bool | None:
+        """ Finishes the request with the best offered profile (returns its commands, or True if only the state changed). """
+        self._set_ready()
+        started_at = perf_counter()
+        commands = self._engine.finish_request(self._tracked_lights)
+        profile = self._engine.profile
 
-            self.async_schedule_update_ha_state(True)
+        if self.is_blocked:
+            self._update_block_snapshot(profile)
+            return self.trace(RECORD_TYPE_DECISION, reason="request", profile=profile and profile.id, blocked=True)
 
-        self._request_timer = async_call_later(self.hass, REQUEST_DEBOUNCE_TIME, _on_request_finished)
+        if profile:
+            self.logger.debug("A lighting profile was provided: %s", profile.id)
+        else:
+            self.logger.debug(f"No lighting profile was provided. Turning off all tracked lights.")
+
+        self.trace(RECORD_TYPE_DECISION, reason="request", profile=profile and profile.id, state=self.state, duration=perf_counter() - started_at)
+        return commands or True
 
     def _reset(self, *args: Any) -> None:
         """ Fires the reset event. """
@@ -205,18 +264,42 @@ class AL_Entity(EntityBase):
             self._reset_reset_timer()
         else:
             self.logger.debug(f"Firing reset event.")
+            self._profiles_version += 1
+            self._registered_lights = []
             self._tracked_lights = list(set(sum(self._light_groups.values(), [])))
             self._remove_listeners()
-            self.fire_event(EVENT_TYPE_AUTOMATIC_LIGHTING, entity_id=self.entity_id, type=EVENT_DATA_TYPE_RESET)
+            self.fire_zone_event(EVENT_TYPE_AUTOMATIC_LIGHTING, type=EVENT_DATA_TYPE_RESET)
 
         def _on_reset_finished(*args: Any) -> None:
             """ Triggered when the reset event has finished. """
-            self.logger.debug(f"Tracking {len(self._tracked_lights)} lights for manual control.")
+            self.record(RECORD_TYPE_TIMER, name="reset")
+            self.logger.debug("Tracking %s lights for manual control.", len(self._tracked_lights))
             self._reset_reset_timer()
+            self._light_group_index = LightGroupIndex(async_expand_light_groups(self.hass, self._light_groups, self._tracked_lights))
             self._setup_listeners()
-            self._request()
+            self._inbox.post(self._request)
 
-        self._reset_timer = async_call_later(self.hass, RESET_DEBOUNCE_TIME, _on_reset_finished)
+        self._reset_timer = self.call_later(RESET_DEBOUNCE_TIME, _on_reset_finished)
+
+
+    #--------------------------------------------#
+    #       Decision Methods
+    #--------------------------------------------#
+
+    def _decide(self, requests: List[Any]) -> None:
+        """ Makes the single decision of an inbox step: issues the commands of the processed events under one context (unless a later event of the step blocked the entity) and writes the state once. The lights controlled by the switch of the zone are left out of the commands. """
+        commands = [command for request in requests if request is not True for command in request]
+        owned_lights = get_owned_lights(self.hass, self._entry_id)
+
+        if len(owned_lights) > 0:
+            commands = [command._replace(entity_ids=tuple(id for id in command.entity_ids if id not in owned_lights)) for command in commands]
+            commands = [command for command in commands if len(command.entity_ids) > 0]
+
+        if len(commands) > 0 and not self.is_blocked:
+            with self.decision():
+                self.execute(commands)
+
+        self.write_state(True)
 
 
     #--------------------------------------------#
@@ -228,26 +311,43 @@ class AL_Entity(EntityBase):
         while self._listeners:
             self._listeners.pop()()
 
-        self._reset_block_timer()
+        self._untrack_manual_control()
         self._reset_request_timer()
         self._reset_reset_timer()
+        self._inbox.cancel()
+        self._engine.reset()
+        self._block_snapshot = None
+        self.delivery.cancel()
+        self._schedule_deadline()
 
     def _setup_listeners(self, *args: Any) -> None:
-        """ Sets up the event listeners. """
+        """ Sets up the event listeners (not while replaying, the inputs then come from the event log). """
+        if self.is_replaying:
+            return
+
         self._listeners.append(async_track_automations_changed(self.hass, self._async_on_automations_changed))
-        self._listeners.append(async_track_manual_control(self.hass, self._tracked_lights, self._async_on_manual_control, self.is_context_internal))
+        self._track_manual_control()
+
+    def _track_manual_control(self) -> None:
+        """ (Re)starts tracking the tracked lights for manual control. """
+        self._untrack_manual_control()
+
+        if self.is_replaying:
+            return
+
+        self._manual_control_listener = async_track_manual_control(self.hass, self._tracked_lights, self._async_on_manual_control, self.is_context_internal)
+
+    def _untrack_manual_control(self) -> None:
+        """ Stops tracking the lights for manual control. """
+        if self._manual_control_listener:
+            self._manual_control_listener()
+            self._manual_control_listener = None
 
 
     #--------------------------------------------#
     #       Timer Methods
     #--------------------------------------------#
 
-    def _reset_block_timer(self) -> None:
-        """ Resets the block timer. """
-        if self._block_timer:
-            self._block_timer()
-            self._block_timer = None
-
     def _reset_request_timer(self) -> None:
         """ Resets the request timer. """
         if self._request_timer:
@@ -265,60 +365,52 @@ class AL_Entity(EntityBase):
     #       Block Methods
     #--------------------------------------------#
 
-    def _block(self, duration: int) -> None:
-        """ Blocks the entity. """
-        if self.is_blocked and (datetime.now() - self._blocked_at).total_seconds() < BLOCK_THROTTLE_TIME and duration == self._block_duration:
-            return
-
-        self.logger.debug(f"Blocking entity for {duration} seconds.")
-        self._reset_block_timer()
-        self._block_duration = duration
-        self._blocked_at = datetime.now()
-        self._blocked_until = self._blocked_at + timedelta(seconds=self._block_duration) if self._block_duration is not None else None
-        self._block_timer = async_call_later(self.hass, self._block_duration, self._unblock)
-        self.async_schedule_update_ha_state(True)
-
-    def _unblock(self, *args: Any) -> None:
-        """ Unblocks the entity. """
-        self.logger.debug(f"Unblocking entity for after {self._block_duration} seconds of inactivity.")
-        self._reset_block_timer()
-        self._request()
+    def _on_blocked(self) -> bool:
+        """ Updates the deadline after the engine has been (re)blocked; returns True (the state has to be written). """
+        self._block_snapshot = self._block_snapshot or (self._profiles_version, None if self._engine.is_requesting else self._engine.profile)
+        self.delivery.cancel()
+        self.logger.debug("Blocking entity for %s seconds.", self._engine.block_duration)
+        self.trace(RECORD_TYPE_DECISION, reason="block", duration=self._engine.block_duration)
+        self._schedule_deadline()
+        return True
 
+    def _on_deadline(self, deadline: float) -> None:
+        """ Triggered when the next deadline of the engine has passed. """
+        self._inbox.post(partial(self._process_deadline, deadline))
 
-    #--------------------------------------------#
-    #       Entity Methods
-    #--------------------------------------------#
+    def _process_deadline(self, deadline: float) -> List[Command] | bool | None:
+        """ Expires the deadlines that have passed (the block has ended). """
+        commands = None
 
-    def _turn_off_unused_entities(self, old_entity_ids: List[str], new_entity_ids: List[str]) -> None:
-        """ Turns off entities if they are not used in the current profile. """
-        blacklist = []
-        unused_entities = []
+        if DEADLINE_BLOCK in self._engine.advance(max(deadline, self.timestamp())):
+            self.record(RECORD_TYPE_TIMER, name="block")
+            self.logger.debug("Unblocking entity for after %s seconds of inactivity.", self._engine.block_duration)
+            commands = self._restore()
 
-        for i in old_entity_ids:
-            if i in self._light_groups:
-                blacklist = blacklist + self._light_groups[i]
-                unused_entities.append(i)
-                continue
+        self._schedule_deadline()
+        return commands
 
-        for i in old_entity_ids:
-            if i in self._light_groups:
-                continue
+    def _restore(self) -> List[Command] | bool | None:
+        """ Restores the profile wanted during the block without a request, unless the profiles may have changed since the block started. """
+        version, profile = self._block_snapshot or (None, None)
+        self._block_snapshot = None
 
-            if not i in blacklist:
-                unused_entities.append(i)
+        if profile is None or version != self._profiles_version or self._engine.is_requesting:
+            return self._request()
 
-        for i in new_entity_ids:
-            for x in unused_entities:
-                if x in self._light_groups and i in self._light_groups[x]:
-                    unused_entities.remove(x)
-                    unused_entities = unused_entities + [t for t in self._light_groups[x] if t not in new_entity_ids]
+        started_at = perf_counter()
+        self.logger.debug("Restoring profile %s.", profile.id)
+        commands = self._engine.restore(profile, self._tracked_lights)
+        self.trace(RECORD_TYPE_DECISION, reason="restore", profile=profile.id, state=self.state, duration=perf_counter() - started_at)
+        return commands or True
 
-                if x == i:
-                    unused_entities.remove(x)
+    def _update_block_snapshot(self, profile: Any) -> None:
+        """ Replaces the profile to restore after the block with the latest provided profile. """
+        self._block_snapshot = self._block_snapshot and (self._block_snapshot[0], profile)
 
-        if len(unused_entities) > 0:
-            self.logger.debug(f"Turning off unused entities: {unused_entities}")
-            self.call_service(LIGHT_DOMAIN, SERVICE_TURN_OFF, entity_id=unused_entities)
+    def _schedule_deadline(self) -> None:
+        """ Schedules the next deadline of the engine. """
+        self.schedule_deadline(self._engine.next_deadline, self._on_deadline)
 
 
     #--------------------------------------------#
@@ -327,46 +419,55 @@ class AL_Entity(EntityBase):
 
     async def _async_service_track_lights(self, **service_data: Any) -> None:
         """ Handles a call to the 'automatic_lighting.track_lights' service. """
+        self.record(RECORD_TYPE_TRACK_LIGHTS, **service_data)
         lights = await async_resolve_target(self.hass, service_data.get(CONF_LIGHTS))
         for light in lights:
+            if not light in self._registered_lights:
+                self._registered_lights.append(light)
+
             if not light in self._tracked_lights:
                 self._tracked_lights.append(light)
 
     async def _async_service_turn_off(self, **service_data: Any) -> None:
         """ Handles a call to the 'automatic_lighting.turn_off' service. """
-        if self.is_blocked:
-            return
-
-        if not self._current_profile:
-            return
-
-        self._request()
+        self.record(RECORD_TYPE_TURN_OFF)
+        self._inbox.post(self._process_turn_off)
 
     async def _async_service_turn_on(self, **service_data: Any) -> None:
         """ Handles a call to the 'automatic_lighting.turn_on' service. """
+        self.record(RECORD_TYPE_TURN_ON, **service_data)
         id = service_data.pop(CONF_ID)
         state = service_data.pop(CONF_STATE)
-        lights = await async_resolve_target(self.hass, service_data.pop(CONF_LIGHTS))
-        attributes = service_data
+        lights = intern_entity_ids(await async_resolve_target(self.hass, service_data.pop(CONF_LIGHTS)))
+        attributes = intern_attributes(service_data)
+        self._inbox.post(partial(self._process_turn_on, self._profiles.get(AL_Lighting_Profile, id, state, lights, attributes)))
 
-        if self._request_timer:
-            if self._current_profile and self._current_profile.state == STATE_ACTIVE and state == STATE_IDLE:
-                return
+    def _process_turn_off(self) -> None:
+        """ Requests new lighting settings after the current profile was turned off (only the profile version changes while blocked). """
+        if self.is_blocked:
+            self._profiles_version += 1
+            return
 
-            self._current_profile = AL_Lighting_Profile(id, state, lights, attributes)
+        if not self._engine.profile:
             return
 
-        if self.is_blocked:
-            return self._block(self._block_duration)
+        self._request()
 
-        if self._current_profile and self._current_profile.id != id:
-            self._turn_off_unused_entities(self._current_profile.lights, lights)
+    def _process_turn_on(self, profile: AL_Lighting_Profile) -> List[Command] | bool | None:
+        """ Offers a profile to the running request or applies it (the block is extended instead if the entity is blocked). """
+        if self._engine.offer(profile):
+            return
 
-        self.logger.debug(f"Turning on profile {id} with following values: {attributes}")
-        self._current_profile = AL_Lighting_Profile(id, state, lights, attributes)
-        self._state = state
-        self.call_service(LIGHT_DOMAIN, SERVICE_TURN_ON, entity_id=lights, **attributes)
-        self.async_schedule_update_ha_state(True)
+        if self.is_blocked:
+            self.trace(RECORD_TYPE_DECISION, reason="turn_on", profile=profile.id, blocked=True)
+            self._update_block_snapshot(profile)
+            return self._engine.extend_block(self.timestamp()) and self._on_blocked()
+
+        started_at = perf_counter()
+        self.logger.debug("Turning on profile %s with following values: %s", profile.id, profile.attributes)
+        commands = self._engine.turn_on(self.timestamp(), profile)
+        self.trace(RECORD_TYPE_DECISION, reason="turn_on", profile=profile.id, state=profile.state, duration=perf_counter() - started_at)
+        return commands or True
 
 
     #--------------------------------------------#
@@ -375,17 +476,87 @@ class AL_Entity(EntityBase):
 
     async def _async_on_automations_changed(self, event_type: str, entity_id: str) -> None:
         """ Triggered when an automation_reloaded event or automation state change event is detected. """
+        self.record(RECORD_TYPE_AUTOMATIONS_CHANGED, event_type=event_type, entity_id=entity_id)
+
         if event_type == EVENT_AUTOMATION_RELOADED:
             self.logger.debug(f"Detected an automation_reloaded event.")
         else:
-            self.logger.debug(f"Detected a state change to {entity_id}.")
+            self.logger.debug("Detected a state change to %s.", entity_id)
 
         self._reset()
 
     async def _async_on_manual_control(self, entity_ids: List[str], context: Context) -> None:
-        """ Triggered when manual control of the lights are detected. """
-        self.logger.debug(f"Manual control was detected for the following entities: {entity_ids}")
-        self._block(self._block_duration if self.is_blocked else self._block_config_duration)
+        """ Triggered when manual control of the lights are detected (the lights controlled by the switch of the zone are ignored). """
+        owned_lights = get_owned_lights(self.hass, self._entry_id)
+        entity_ids = [id for id in entity_ids if id not in owned_lights]
+
+        if len(entity_ids) == 0:
+            return
+
+        self.record(RECORD_TYPE_MANUAL_CONTROL, entity_ids=entity_ids)
+        self.logger.debug("Manual control was detected for the following entities: %s", entity_ids)
+        self._inbox.post(self._process_manual_control)
+
+    def _process_manual_control(self) -> bool:
+        """ Blocks the engine after manual control of the lights. """
+        return self._engine.manual_control(self.timestamp()) and self._on_blocked()
+
+
+    #--------------------------------------------#
+    #       Option Methods
+    #--------------------------------------------#
+
+    async def async_apply_options(self, options: Dict[str, Any]) -> bool:
+        """ Applies changed options to the running entity without reloading it (the current profile and unaffected listeners are kept). """
+        self._engine.set_block_duration(options.get(CONF_BLOCK_DURATION, DEFAULT_BLOCK_DURATION))
+        light_groups = options.get(CONF_LIGHT_GROUPS, {})
+
+        if light_groups != self._light_groups:
+            self.logger.debug(f"Applying changed light groups.")
+            self._light_groups = light_groups
+            self._tracked_lights = list(set(sum(self._light_groups.values(), [])) | set(self._registered_lights))
+            self._light_group_index = LightGroupIndex(async_expand_light_groups(self.hass, self._light_groups, self._tracked_lights))
+            self._manual_control_listener and self._track_manual_control()
+
+        self._compact_attributes = options.get(CONF_COMPACT_ATTRIBUTES, DEFAULT_COMPACT_ATTRIBUTES)
+        self.write_state()
+
+        record_events = options.get(CONF_RECORD_EVENTS, DEFAULT_RECORD_EVENTS)
+
+        if record_events != self._record_events:
+            self._record_events = record_events
+
+            if not record_events and self.recorder:
+                await self.recorder.async_flush()
+
+            self.set_recorder(EventRecorder(self.hass, self.hass.config.path(f"{DOMAIN}.{self._entry_id}.jsonl")) if record_events else None)
+
+        return True
+
+
+    #--------------------------------------------#
+    #       Replay Methods
+    #--------------------------------------------#
+
+    async def async_dispatch_record(self, record_type: str, data: Dict[str, Any]) -> None:
+        """ Feeds a recorded input back into the entity (used when replaying an event log). """
+        if record_type == RECORD_TYPE_START:
+            return self._initialize()
+
+        if record_type == RECORD_TYPE_AUTOMATIONS_CHANGED:
+            return await self._async_on_automations_changed(data.get("event_type"), data.get("entity_id"))
+
+        if record_type == RECORD_TYPE_MANUAL_CONTROL:
+            return await self._async_on_manual_control(data.get("entity_ids", []), self.create_context())
+
+        if record_type == RECORD_TYPE_TRACK_LIGHTS:
+            return await self._async_service_track_lights(**data)
+
+        if record_type == RECORD_TYPE_TURN_OFF:
+            return await self._async_service_turn_off(**data)
+
+        if record_type == RECORD_TYPE_TURN_ON:
+            return await self._async_service_turn_on(**data)
 
 
 #-----------------------------------------------------------#
@@ -393,12 +564,14 @@ class AL_Entity(EntityBase):
 #-----------------------------------------------------------#
 
 class AL_Lighting_Profile:
-    """ A class that contains lighting properties. """
+    """ A class that contains lighting properties (instances are immutable and shared through a ProfileStore). """
+    __slots__ = ("_attributes", "_id", "_lights", "_state")
+
     #--------------------------------------------#
     #       Constructor
     #--------------------------------------------#
 
-    def __init__(self, id: str, state: str, lights: List[str], attributes: Dict[str, Any]):
+    def __init__(self, id: str, state: str, lights: Tuple[str, ...], attributes: Mapping[str, Any]):
         self._id = id
         self._state = state
         self._lights = lights
@@ -410,7 +583,7 @@ class AL_Lighting_Profile:
     #--------------------------------------------#
 
     @property
-    def attributes(self) -> Dict[str, Any]:
+    def attributes(self) -> Mapping[str, Any]:
         """ Returns the attributes. """
         return self._attributes
 
@@ -420,7 +593,7 @@ class AL_Lighting_Profile:
         return self._id
 
     @property
-    def lights(self) -> List[str]:
+    def lights(self) -> Tuple[str, ...]:
         """ Returns the list of lights """
         return self._lights
 
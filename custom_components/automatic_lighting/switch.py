@@ -3,22 +3,25 @@
 #-----------------------------------------------------------#
 
 from __future__ import annotations
-from . import LOGGER_BASE_NAME
-from .const import ATTR_ACTIVE_UNTIL, ATTR_BLOCKED_UNTIL, ATTR_LAST_TRIGGERED_AT, ATTR_LAST_TRIGGERED_BY, ATTR_STATUS, CONF_BLOCK_DURATION, CONF_CONSTRAIN, CONF_DURATION, CONF_TRIGGERS, DOMAIN, EVENT_AUTOMATIC_LIGHTING, EVENT_TYPE_REFRESH, SERVICE_CONSTRAIN, SERVICE_REGISTER, SERVICE_SCHEMA_CONSTRAIN, SERVICE_SCHEMA_REGISTER, STATUS_ACTIVE, STATUS_BLOCKED, STATUS_IDLE
-from .utils import async_resolve_target, async_track_automations_changed, async_track_manual_control, EntityBase, Timer
-from datetime import datetime, timedelta
-from homeassistant.components.automation import DOMAIN as AUTOMATION_DOMAIN, EVENT_AUTOMATION_RELOADED
-from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
+from . import LOGGER_BASE_NAME, record_setup_time
+from .const import ATTR_ACTIVE_UNTIL, AUTOMATION_DOMAIN, EVENT_AUTOMATION_RELOADED, ATTR_BLOCKED_UNTIL, ATTR_LAST_TRIGGERED_AT, ATTR_LAST_TRIGGERED_BY, ATTR_LIGHTS_HASH, ATTR_STATUS, CONF_BLOCK_DURATION, CONF_COMPACT_ATTRIBUTES, CONF_CONSTRAIN, CONF_DURATION, CONF_ILLUMINANCE_ENTITY, CONF_ILLUMINANCE_THRESHOLD, CONF_PROFILES, CONF_RECORD_EVENTS, CONF_STARTUP_PRIORITY, CONF_TIME_AFTER, CONF_TIME_BEFORE, CONF_TRIGGER_OFF_HOLD, CONF_TRIGGER_ON_DEBOUNCE, CONF_TRIGGER_PREDICATE, CONF_TRIGGERS, DATA_BATCH_UPDATE, DATA_STARTUP_SCHEDULER, RECORD_TYPE_AUTOMATIONS_CHANGED, RECORD_TYPE_CONDITION, RECORD_TYPE_CONSTRAIN, RECORD_TYPE_DECISION, RECORD_TYPE_MANUAL_CONTROL, RECORD_TYPE_REGISTER, RECORD_TYPE_TRIGGER, RECORD_TYPE_TURN_OFF, RECORD_TYPE_TURN_ON, DEFAULT_BLOCK_DURATION, DEFAULT_COMPACT_ATTRIBUTES, DEFAULT_RECORD_EVENTS, DEFAULT_STARTUP_PRIORITY, DEFAULT_TRIGGER_OFF_HOLD, DEFAULT_TRIGGER_ON_DEBOUNCE, DOMAIN, ENTITIES, EVENT_AUTOMATIC_LIGHTING, EVENT_TYPE_REFRESH, SERVICE_CONSTRAIN, SERVICE_REGISTER, SERVICE_REGISTER_MANY, STATUS_ACTIVE, STATUS_BLOCKED, STATUS_IDLE
+from .batch import get_seconds, is_profile_valid, select_first_valid
+from .engine import DEADLINE_ACTIVE, DEADLINE_BLOCK, get_first, LightingEngine, STATE_ACTIVE, STATE_IDLE
+from .schemas import SERVICE_SCHEMA_CONSTRAIN, SERVICE_SCHEMA_REGISTER, SERVICE_SCHEMA_REGISTER_MANY
+from .utils import async_resolve_targets, compile_predicate, get_entities_hash, get_signal_entity_id, intern_attributes, intern_entity_ids, set_owned_lights, async_track_automations_changed, async_track_manual_control, EntityBase, EventRecorder, Inbox, Timer, TriggerFilter, TriggerPredicate
+from datetime import datetime, time
+from functools import partial
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.const import CONF_ENTITY_ID, CONF_ID, CONF_LIGHTS, EVENT_HOMEASSISTANT_START, SERVICE_TURN_OFF, SERVICE_TURN_ON, STATE_OFF, STATE_ON
+from homeassistant.const import ATTR_ID, CONF_ENTITY_ID, CONF_ID, CONF_LIGHTS, STATE_OFF, STATE_ON
 from homeassistant.core import Context, HomeAssistant, ServiceCall, State
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers import entity_platform
-from homeassistant.helpers.event import async_call_later, async_track_state_change
+from homeassistant.helpers.event import async_track_state_change, async_track_time_change
 from homeassistant.helpers.restore_state import RestoreEntity
-from homeassistant.util import get_random_string
+from homeassistant.util import dt as dt_util, get_random_string
 from logging import getLogger
-from typing import Any, Callable, Dict, List, Union
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Mapping, Tuple
 
 
 #-----------------------------------------------------------#
@@ -34,13 +37,18 @@ START_DELAY = 0.4
 #-----------------------------------------------------------#
 
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities: Callable) -> bool:
+    started_at = perf_counter()
     #supervisor = AL_Supervisor(config_entry)
-    async_add_entities([AL_Entity(config_entry)], update_before_add=True)
+    entity = AL_Entity(config_entry)
+    hass.data[DOMAIN][config_entry.entry_id][ENTITIES].append(entity)
+    async_add_entities([entity], update_before_add=True)
     platform = entity_platform.current_platform.get()
     platform.async_register_entity_service(SERVICE_CONSTRAIN, SERVICE_SCHEMA_CONSTRAIN, async_service_constrain)
     platform.async_register_entity_service(SERVICE_REGISTER, SERVICE_SCHEMA_REGISTER, async_service_register)
+    platform.async_register_entity_service(SERVICE_REGISTER_MANY, SERVICE_SCHEMA_REGISTER_MANY, async_service_register_many)
     #hass.services.async_register(DOMAIN, SERVICE_BLOCK, supervisor.async_service_block, SERVICE_SCHEMA_BLOCK)
     #hass.services.async_register(DOMAIN, SERVICE_REGISTER, supervisor.async_service_register, SERVICE_SCHEMA_REGISTER)
+    record_setup_time(hass, f"{config_entry.entry_id}.switch", started_at)
     return True
 
 
@@ -56,6 +64,50 @@ async def async_service_register(entity: AL_Entity, service_call: ServiceCall):
     """ Handles a call to the automatic_lighting.register service. """
     entity.is_on and await entity._async_service_register(service_call)
 
+async def async_service_register_many(entity: AL_Entity, service_call: ServiceCall):
+    """ Handles a call to the automatic_lighting.register_many service. """
+    entity.is_on and await entity._async_service_register_many(service_call)
+
+
+#-----------------------------------------------------------#
+#       Batch Update
+#-----------------------------------------------------------#
+
+def async_queue_batch_update(hass: HomeAssistant, entity: AL_Entity) -> None:
+    """ Queues an entity for re-evaluation; all entities queued in the same loop iteration (e.g. at a shared time boundary) are evaluated at once. """
+    pending = hass.data.get(DATA_BATCH_UPDATE)
+
+    if pending is None:
+        pending = hass.data[DATA_BATCH_UPDATE] = []
+        hass.loop.call_soon(async_run_batch_update, hass)
+
+    entity in pending or pending.append(entity)
+
+def async_run_batch_update(hass: HomeAssistant) -> None:
+    """ Selects the profiles of all queued entities in one pass and updates the entities whose idle profile changes. """
+    update_idle_profiles(hass, hass.data.pop(DATA_BATCH_UPDATE, []), dt_util.now().time())
+
+def get_illuminance_states(hass: HomeAssistant, profiles: List[AL_Profile]) -> Dict[str, Any]:
+    """ Gets the states of the illuminance entities used by the profiles (each entity is read once). """
+    illuminance_entities = set(profile.illuminance_entity for profile in profiles if profile.illuminance_entity)
+    return { entity_id: state.state for entity_id in illuminance_entities if (state := hass.states.get(entity_id)) is not None }
+
+def update_idle_profiles(hass: HomeAssistant, entities: List[AL_Entity], now: time) -> None:
+    """ Selects the profiles of the entities at a time of day and updates the entities whose idle profile changes. """
+    entities = [entity for entity in entities if entity.is_on and not (entity.is_active or entity.is_blocked or entity.is_refreshing)]
+    illuminance = get_illuminance_states(hass, [profile for entity in entities for profile in entity._active_profiles + entity._idle_profiles])
+    groups = []
+
+    for entity in entities:
+        groups.append(entity._active_profiles if entity.is_triggered else [])
+        groups.append(entity._idle_profiles)
+
+    profiles = select_first_valid(groups, now, illuminance)
+
+    for index, entity in enumerate(entities):
+        active_profile, idle_profile = profiles[index * 2], profiles[index * 2 + 1]
+        idle_profile is not entity._engine.idle_profile and entity._post_update((active_profile, idle_profile))
+
 
 #-----------------------------------------------------------#
 #       AL_Entity
@@ -73,32 +125,38 @@ class AL_Entity(SwitchEntity, RestoreEntity, EntityBase):
 
         # --- Entity Variables ---------------
         # -------------------------------------------
+        self._entry_id = config_entry.entry_id
         self._is_on = None
         self._name = f"{DOMAIN} - {config_entry.unique_id}"
+        self._record_events = config_entry.options.get(CONF_RECORD_EVENTS, DEFAULT_RECORD_EVENTS)
 
         # --- Logic Variables ---------------
         # -------------------------------------------
+        self._inbox = Inbox(self.call_soon, self._decide)
         self._listeners = []
         self._refresh_timer = None
+        self._startup_priority = config_entry.options.get(CONF_STARTUP_PRIORITY, DEFAULT_STARTUP_PRIORITY)
+        self._trigger_filter = TriggerFilter(self.call_later, self._async_on_trigger_change)
+        self._trigger_outputs = {}
+        self._trigger_predicates = {}
 
         # --- Attributes ----------
-        self._active_until = None
-        self._blocked_until = None
+        self._attributes = {}
+        self._attributes_key = None
+        self._compact_attributes = config_entry.options.get(CONF_COMPACT_ATTRIBUTES, DEFAULT_COMPACT_ATTRIBUTES)
         self._last_triggered_at = None
         self._last_triggered_by = None
-        self._status = None
 
-        # --- Block ----------
-        self._block_config_duration = config_entry.options.get(CONF_BLOCK_DURATION)
-        self._block_duration = self._block_config_duration
-        self._block_enabled = True
-        self._block_timer = None
+        # --- Engine ----------
+        self._engine = LightingEngine(config_entry.options.get(CONF_BLOCK_DURATION, DEFAULT_BLOCK_DURATION))
 
         # --- Profiles ----------
+        self._block_snapshot = None
+        self._profiles_version = 0
+        self._profiles_config = config_entry.options.get(CONF_PROFILES, {})
+        self._previous_profiles = {}
         self._active_profiles = []
         self._idle_profiles = []
-        self._current_active_profile = None
-        self._current_idle_profile = None
 
 
     #-----------------------------------------------------------------------------#
@@ -110,17 +168,43 @@ class AL_Entity(SwitchEntity, RestoreEntity, EntityBase):
     #--------------------------------------------#
 
     @property
-    def device_state_attributes(self) -> Dict[str, Any]:
-        """ Gets a dict containing the entity attributes. """
+    def details(self) -> Dict[str, Any]:
+        """ Gets a dict containing the full details of the entity (exposed through diagnostics). """
+        return {
+            ATTR_STATUS: self._engine.state,
+            ATTR_ACTIVE_UNTIL: self.active_until,
+            ATTR_BLOCKED_UNTIL: self.blocked_until,
+            ATTR_LAST_TRIGGERED_AT: self._last_triggered_at,
+            ATTR_LAST_TRIGGERED_BY: self._last_triggered_by,
+            "active_profile": self._engine.active_profile and self._engine.active_profile.id,
+            "idle_profile": self._engine.idle_profile and self._engine.idle_profile.id,
+            "suppressed_triggers": self._trigger_filter.suppressed,
+            "inbox": self._inbox.stats,
+            "delivery": self.delivery.stats,
+            "handles": { **self.handles, "listeners": len(self._listeners), "refresh_timer": int(self.is_refreshing), "inbox": self._inbox.pending, "trigger_filter": self._trigger_filter.pending, "previous_profiles": len(self._previous_profiles) },
+            "profiles": [{ CONF_ID: profile.id, CONF_ENTITY_ID: list(profile.light_entities), CONF_TRIGGERS: profile.trigger_entities and list(profile.trigger_entities), CONF_DURATION: profile.duration, **profile.attributes } for profile in self._active_profiles + self._idle_profiles]
+        }
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """ Gets a dict containing the entity attributes (cached until the inputs change). """
         if not self.is_on:
             return {}
 
-        attributes = { ATTR_STATUS: self._status }
-        self._status == STATUS_ACTIVE and self._current_active_profile and attributes.update({ ATTR_ACTIVE_UNTIL: self._active_until, CONF_ENTITY_ID: self._current_active_profile.light_entities, **self._current_active_profile.attributes })
-        self._status == STATUS_BLOCKED and attributes.update({ ATTR_BLOCKED_UNTIL: self._blocked_until })
-        self._status == STATUS_IDLE and self._current_idle_profile and attributes.update({ CONF_ENTITY_ID: self._current_idle_profile.light_entities, **self._current_idle_profile.attributes })
+        status = self._engine.state
+        key = (status, self._engine.active_until, self._engine.blocked_until, self._engine.active_profile, self._engine.idle_profile, self._last_triggered_at, self._last_triggered_by, self._compact_attributes)
+
+        if key == self._attributes_key:
+            return self._attributes
+
+        attributes = { ATTR_STATUS: status }
+        status == STATUS_ACTIVE and attributes.update({ ATTR_ACTIVE_UNTIL: self.active_until, **self._get_profile_attributes(self._engine.active_profile) })
+        status == STATUS_BLOCKED and attributes.update({ ATTR_BLOCKED_UNTIL: self.blocked_until })
+        status == STATUS_IDLE and self._engine.idle_profile and attributes.update(self._get_profile_attributes(self._engine.idle_profile))
         attributes.update({ ATTR_LAST_TRIGGERED_AT: self._last_triggered_at, ATTR_LAST_TRIGGERED_BY: self._last_triggered_by })
 
+        self._attributes = attributes
+        self._attributes_key = key
         return attributes
 
     @property
@@ -150,20 +234,25 @@ class AL_Entity(SwitchEntity, RestoreEntity, EntityBase):
 
     async def async_added_to_hass(self) -> None:
         """ Triggered when the entity has been added to HomeAssistant. """
+        if self._record_events:
+            self.set_recorder(EventRecorder(self.hass, self._get_record_path()))
+
         last_state = await self.async_get_last_state()
 
         if not last_state or last_state.state == STATE_ON:
-            if self.hass.is_running:
-                return await self.async_turn_on()
-            else:
-                return self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_START, self.async_turn_on)
+            return self.hass.data[DATA_STARTUP_SCHEDULER].admit(self.entity_id, self._startup_priority, self.async_turn_on)
 
         await self.async_turn_off()
 
     async def async_will_remove_from_hass(self) -> None:
         """ Triggered when the entity is being removed from Home Assistant. """
+        self.hass.data[DATA_STARTUP_SCHEDULER].cancel(self.entity_id)
         await self._async_turn_off()
 
+        if self.recorder:
+            await self.recorder.async_flush()
+        self.remove_zone_state()
+
 
     #--------------------------------------------#
     #       Methods
@@ -175,6 +264,7 @@ class AL_Entity(SwitchEntity, RestoreEntity, EntityBase):
             return
 
         self._is_on = False
+        self.record(RECORD_TYPE_TURN_OFF)
         await self._async_turn_off()
 
     async def async_turn_on(self, *args: Any) -> None:
@@ -183,6 +273,7 @@ class AL_Entity(SwitchEntity, RestoreEntity, EntityBase):
             return
 
         self._is_on = True
+        self.record(RECORD_TYPE_TURN_ON)
         await self._async_turn_on()
 
 
@@ -194,15 +285,25 @@ class AL_Entity(SwitchEntity, RestoreEntity, EntityBase):
     #       Properties
     #--------------------------------------------#
 
+    @property
+    def active_until(self) -> datetime | None:
+        """ Gets the time at which the active profile ends (returns None if its triggers are still on). """
+        return datetime.fromtimestamp(self._engine.active_until) if self._engine.active_until is not None else None
+
+    @property
+    def blocked_until(self) -> datetime | None:
+        """ Gets the time at which the block ends (returns None if the entity is not blocked or blocked indefinitely). """
+        return datetime.fromtimestamp(self._engine.blocked_until) if self._engine.blocked_until is not None else None
+
     @property
     def is_active(self) -> bool:
         """ Gets a boolean indicating whether a trigger has activated a profile. """
-        return self._current_active_profile is not None
+        return self._engine.is_active
 
     @property
     def is_blocked(self) -> bool:
         """ Gets a boolean indicating whether the entity is blocked. """
-        return self._block_timer is not None
+        return self._engine.is_blocked
 
     @property
     def is_refreshing(self) -> bool:
@@ -211,18 +312,24 @@ class AL_Entity(SwitchEntity, RestoreEntity, EntityBase):
 
     @property
     def is_triggered(self) -> bool:
-        """ Gets a boolean indicating whether any of the triggers have been triggered. """
-        return any((state := self.hass.states.get(entity)) is not None and state.state == STATE_ON for entity in self.trigger_entities)
+        """ Gets a boolean indicating whether any of the trigger signals have been triggered (a trigger evaluated by a predicate is filtered under its signal). """
+        return any(self._trigger_filter.is_on(signal) for signal in self._trigger_outputs)
 
     @property
     def light_entities(self) -> List[str]:
         """ Gets a list of the registered light entities. """
-        return list(set(sum([profile.light_entities for profile in self._active_profiles + self._idle_profiles], [])))
+        return list(set().union(*[profile.light_entities for profile in self._active_profiles + self._idle_profiles]))
 
     @property
     def trigger_entities(self) -> List[str]:
         """ Gets a list of the registered trigger entities. """
-        return list(set(sum([profile.trigger_entities if profile.trigger_entities is not None else [] for profile in self._active_profiles], [])))
+        return list(set().union(*[profile.trigger_entities for profile in self._active_profiles if profile.trigger_entities is not None]))
+
+    @property
+    def zone_state(self) -> Dict[str, Any]:
+        """ Gets the compact state of the zone streamed to the websocket subscribers (timestamps are POSIX timestamps). """
+        profile = self._engine.profile
+        return { ATTR_STATUS: self._engine.state if self.is_on else STATE_OFF, ATTR_ID: profile.id if profile and self.is_on else None, ATTR_ACTIVE_UNTIL: self._engine.active_until, ATTR_BLOCKED_UNTIL: self._engine.blocked_until }
 
 
     #--------------------------------------------#
@@ -230,13 +337,14 @@ class AL_Entity(SwitchEntity, RestoreEntity, EntityBase):
     #--------------------------------------------#
 
     async def _async_turn_off(self) -> None:
-        """ Resets the internal entity logic. """
+        """ Resets the internal entity logic (the lights are handed back to the sensor of the zone). """
         self._remove_listeners()
-        self.async_schedule_update_ha_state(True)
+        set_owned_lights(self.hass, self._entry_id, [])
+        self.write_state(True)
 
     async def _async_turn_on(self) -> None:
         """ Turns on the internal entity logic. """
-        self._listeners.append(async_call_later(self.hass, START_DELAY, self._refresh_profiles))
+        self._listeners.append(self.call_later(START_DELAY, self._refresh_profiles))
 
 
     #--------------------------------------------#
@@ -248,34 +356,92 @@ class AL_Entity(SwitchEntity, RestoreEntity, EntityBase):
         while self._listeners:
             self._listeners.pop()()
 
-        self._reset_block_timer()
-        self._reset_current_active_profile()
+        self._engine.reset()
+        self._block_snapshot = None
+        self._refresh_timer and self._refresh_timer.cancel()
+        self.delivery.cancel()
+        self._inbox.cancel()
+        self._schedule_deadline()
+        self._trigger_filter.cancel()
 
     def _setup_listeners(self) -> None:
-        """ Sets up the event listeners. """
+        """ Sets up the trigger filter and the event listeners (the listeners are not set up while replaying, the inputs then come from the event log). """
+        self._setup_trigger_filter()
+        set_owned_lights(self.hass, self._entry_id, self.light_entities)
+
+        if self.is_replaying:
+            return
+
         self._listeners.append(async_track_automations_changed(self.hass, self._async_on_automations_changed))
         self._listeners.append(async_track_manual_control(self.hass, self.light_entities, self._async_on_manual_control, self.is_context_internal))
         self._listeners.append(async_track_state_change(self.hass, self.trigger_entities, self._async_on_trigger_state_change))
 
+        illuminance_entities = list(set(profile.illuminance_entity for profile in self._active_profiles + self._idle_profiles if profile.illuminance_entity))
+        illuminance_entities and self._listeners.append(async_track_state_change(self.hass, illuminance_entities, self._async_on_condition_change))
+
+        for boundary in set(boundary for profile in self._active_profiles + self._idle_profiles for boundary in profile.time_boundaries):
+            self._listeners.append(async_track_time_change(self.hass, self._async_on_condition_change, hour=boundary.hour, minute=boundary.minute, second=boundary.second))
+
+    def _setup_trigger_filter(self) -> None:
+        """ Sets up the predicates and debounce windows of the trigger signals (the largest window wins when a signal is shared by several profiles). """
+        windows = {}
+        self._trigger_outputs = {}
+        self._trigger_predicates = {}
+
+        for profile in self._active_profiles:
+            for entity_id, signal in zip(profile.trigger_entities, profile.trigger_signals):
+                on_debounce, off_hold = windows.get(signal, (0, 0))
+                windows[signal] = (max(on_debounce, profile.trigger_on_debounce), max(off_hold, profile.trigger_off_hold))
+                self._trigger_predicates.setdefault(entity_id, {})[signal] = profile.trigger_predicate
+
+        for entity_id, predicates in self._trigger_predicates.items():
+            state = self.hass.states.get(entity_id)
+
+            for signal, predicate in predicates.items():
+                self._trigger_outputs[signal] = predicate(state, False)
+
+        self._trigger_filter.setup(windows, { signal: STATE_ON if is_on else STATE_OFF for signal, is_on in self._trigger_outputs.items() })
+
 
     #--------------------------------------------#
     #       Block Methods
     #--------------------------------------------#
 
-    async def _block(self, duration: Union[int, None] = None) -> None:
-        """ Blocks the entity. """
-        self.logger.debug(f"Blocking entity for {duration} seconds.")
-        self._reset_block_timer()
-        self._block_duration = duration
-        self._blocked_until = datetime.now() + timedelta(seconds=self._block_duration) if self._block_duration is not None else None
-        self._block_timer = Timer(self.hass, self._block_duration, self._unblock)
-        self._update()
+    def _on_blocked(self) -> bool:
+        """ Updates the deadline after the engine has been (re)blocked and requests a decision. """
+        self._block_snapshot = self._block_snapshot or (self._profiles_version, self._engine.active_profile, self._engine.idle_profile)
+        self.delivery.cancel()
+        self.logger.debug("Blocking entity for %s seconds.", self._engine.block_duration)
+        self._schedule_deadline()
+        return True
+
+
+    #--------------------------------------------#
+    #       Deadline Methods
+    #--------------------------------------------#
+
+    def _on_deadline(self, deadline: float) -> None:
+        """ Triggered when the next deadline of the engine has passed, posting it to the inbox. """
+        self._inbox.post(partial(self._process_deadline, deadline))
 
-    async def _unblock(self, *args: Any) -> None:
-        """ Unblocks the entity. """
-        self.logger.debug(f"Unblocking entity for after {self._block_duration} seconds of inactivity.")
-        self._reset_block_timer()
-        self._update()
+    def _process_deadline(self, deadline: float) -> bool:
+        """ Expires the deadlines that have passed (the block or the active profile has ended). """
+        expired = self._engine.advance(max(deadline, self.timestamp()))
+        DEADLINE_BLOCK in expired and self.logger.debug("Unblocking entity for after %s seconds of inactivity.", self._engine.block_duration)
+        DEADLINE_ACTIVE in expired and self.logger.debug(f"The active profile has finished.")
+        self._schedule_deadline()
+        selection = self._pop_block_snapshot() if DEADLINE_BLOCK in expired else None
+        return selection or len(expired) > 0
+
+    def _pop_block_snapshot(self) -> Tuple[AL_Profile | None, AL_Profile | None] | None:
+        """ Gets the profiles selected before the block, to be restored without a new selection (returns None if the profiles, triggers or conditions have changed since). """
+        version, active_profile, idle_profile = self._block_snapshot or (None, None, None)
+        self._block_snapshot = None
+        return (active_profile, idle_profile) if version == self._profiles_version else None
+
+    def _schedule_deadline(self) -> None:
+        """ Schedules the next deadline of the engine. """
+        self.schedule_deadline(self._engine.next_deadline, self._on_deadline)
 
 
     #--------------------------------------------#
@@ -287,49 +453,50 @@ class AL_Entity(SwitchEntity, RestoreEntity, EntityBase):
         if self.is_refreshing:
             self._refresh_timer.cancel()
         else:
-            self._active_profiles = []
-            self._idle_profiles = []
-            self.fire_event(EVENT_AUTOMATIC_LIGHTING, entity_id=self.entity_id, type=EVENT_TYPE_REFRESH)
+            self._load_profiles()
+
+            if not self.has_zone_event_listeners(EVENT_AUTOMATIC_LIGHTING):
+                self._previous_profiles = {}
+                self._remove_listeners()
+                self._setup_listeners()
+                self._post_update()
+                return self._set_ready()
+
+            self.fire_zone_event(EVENT_AUTOMATIC_LIGHTING, type=EVENT_TYPE_REFRESH)
             self._remove_listeners()
 
         async def async_refresh():
+            self._previous_profiles = {}
             self._setup_listeners()
-            self._update()
-
-        self._refresh_timer = Timer(self.hass, REFRESH_DEBOUNCE_TIME, async_refresh)
-
-    def _set_active_profile(self) -> Union[Dict[str, Any], None]:
-        """ Attempts to match and activate an active profile. """
-        new_profile = next(filter(lambda profile: profile.is_valid(), self._active_profiles), None)
+            self._post_update()
+            self._set_ready()
 
-        if new_profile is None:
-            if not self.is_active:
-                return
+        self._refresh_timer = Timer(self.hass, REFRESH_DEBOUNCE_TIME, async_refresh, call_later=self.call_later)
 
-            new_profile = self._current_active_profile
-            self._reset_current_active_profile()
-
-        self._active_until = None
-        self._current_active_profile = new_profile
-        self.call_service(LIGHT_DOMAIN, SERVICE_TURN_ON, entity_id=self._current_active_profile.light_entities, **new_profile.attributes)
-        self._turn_off_unused_entities(self.light_entities, new_profile.light_entities)
-
-        return self._current_active_profile
-
-    def _set_idle_profile(self) -> Union[Dict[str, Any], None]:
-        """ Attempts to match and activate an idle profile."""
-        new_profile = next(filter(lambda profile: profile.is_valid(), self._idle_profiles), None)
+    def _load_profiles(self) -> None:
+        """ Replaces the profiles with the profiles defined in the options (profiles registered by automations are added during a refresh). """
+        self._profiles_version += 1
+        self._previous_profiles = { profile.key: profile for profile in self._active_profiles + self._idle_profiles }
+        self._active_profiles = []
+        self._idle_profiles = []
 
-        if new_profile is None:
-            self._current_idle_profile = None
-            return self.call_service(LIGHT_DOMAIN, SERVICE_TURN_OFF, entity_id=self.light_entities)
+        for id, config in self._profiles_config.items():
+            profile = self._get_profile(id, *AL_Profile.parse_config(config))
+            (self._active_profiles if profile.trigger_entities is not None else self._idle_profiles).append(profile)
 
-        self._current_idle_profile = new_profile
-        self.call_service(LIGHT_DOMAIN, SERVICE_TURN_ON, entity_id=self._current_idle_profile.light_entities, **new_profile.attributes)
-        self._turn_off_unused_entities(self.light_entities, new_profile.light_entities)
+    def _get_profile(self, id: str, lights: List[str], attributes: Dict[str, Any], triggers: List[str] | None = None, duration: int | None = None, conditions: Dict[str, Any] | None = None) -> AL_Profile:
+        """ Gets a profile, reusing the profile of the previous refresh if its content is unchanged. """
+        lights = intern_entity_ids(lights)
+        attributes = intern_attributes(attributes)
+        triggers = intern_entity_ids(triggers) if triggers is not None else None
+        conditions = intern_attributes(conditions)
+        profile = self._previous_profiles.pop((id, lights, attributes, triggers, duration, conditions), None)
 
-        return new_profile
+        if profile is None:
+            return AL_Profile(self.hass, id, lights, attributes, triggers, duration, conditions, self._trigger_filter.is_on)
 
+        profile.reset()
+        return profile
 
     #--------------------------------------------#
     #       Service Methods
@@ -344,130 +511,264 @@ class AL_Entity(SwitchEntity, RestoreEntity, EntityBase):
         if id is None:
             return
 
-        profile = next(filter(lambda profile: profile.id == id, self._active_profiles + self._idle_profiles), None)
-        if profile is not None:
-            self.logger.debug(f"Setting constraint mode of profile '{profile.id}' to {constrain}.")
-            profile.set_constrain(constrain)
+        self._constrain(id, constrain)
 
     async def _async_service_register(self, service_call: ServiceCall) -> None:
         """ Handles a call to the automatic_lighting.register service. """
         data = { **service_call.data }
-        id = data.pop(CONF_ID, self._get_profile_id(service_call.context))
+        data.pop(CONF_ENTITY_ID, None)
+        await self.async_register_profiles([data], service_call.context)
 
-        if id is None:
-            id = get_random_string()
-
-        data.pop(CONF_ENTITY_ID)
-        duration = data.pop(CONF_DURATION, None)
-        lights = await async_resolve_target(self.hass, data.pop(CONF_LIGHTS, []))
-        triggers = await async_resolve_target(self.hass, data.pop(CONF_TRIGGERS, None))
-        profile = AL_Profile(self.hass, id, lights, data, triggers, duration)
-
-        if len(triggers) > 0:
-            self._active_profiles.append(profile)
-        else:
-            self._idle_profiles.append(profile)
+    async def _async_service_register_many(self, service_call: ServiceCall) -> None:
+        """ Handles a call to the automatic_lighting.register_many service. """
+        await self.async_register_profiles(service_call.data[CONF_PROFILES], service_call.context)
 
 
     #--------------------------------------------#
-    #       Timer Methods
+    #       Register Methods
     #--------------------------------------------#
 
-    def _reset_block_timer(self) -> None:
-        """ Resets the block timer. """
-        if self._block_timer:
-            self._block_timer.cancel()
-            self._block_timer = None
+    def _constrain(self, id: str, constrain: bool) -> None:
+        """ Sets the constraint mode of a profile. """
+        self.record(RECORD_TYPE_CONSTRAIN, id=id, constrain=constrain)
+        profile = next(filter(lambda profile: profile.id == id, self._active_profiles + self._idle_profiles), None)
+
+        if profile is not None:
+            self.logger.debug("Setting constraint mode of profile '%s' to %s.", profile.id, constrain)
+            profile.set_constrain(constrain)
+            self._profiles_version += 1
 
-    def _reset_current_active_profile(self) -> None:
-        """ Resets the profile timer. """
-        if self._current_active_profile:
-            self._current_active_profile.cancel_timer()
-            self._current_active_profile = None
+    async def async_register_profiles(self, profiles: List[Dict[str, Any]], context: Context) -> List[AL_Profile]:
+        """ Registers a batch of (validated) profiles, resolving all targets at once and inserting them atomically. """
+        return await self._async_register_profiles(profiles, self._get_profile_id(context))
+
+    async def _async_register_profiles(self, profiles: List[Dict[str, Any]], automation_id: str | None) -> List[AL_Profile]:
+        """ Registers a batch of profiles on behalf of an automation (the automation id is the default profile id). """
+        self.record(RECORD_TYPE_REGISTER, profiles=profiles, automation_id=automation_id)
+        targets = []
+
+        for data in profiles:
+            targets.append(data.get(CONF_LIGHTS, []))
+            targets.append(data.get(CONF_TRIGGERS, None))
+
+        resolved_targets = await async_resolve_targets(self.hass, targets)
+        active_profiles = []
+        idle_profiles = []
+
+        for index, data in enumerate(profiles):
+            attributes = { key: value for key, value in data.items() if key not in [CONF_DURATION, CONF_ID, CONF_LIGHTS, CONF_TRIGGER_OFF_HOLD, CONF_TRIGGER_ON_DEBOUNCE, CONF_TRIGGER_PREDICATE, CONF_TRIGGERS] }
+            id = data.get(CONF_ID, automation_id if len(profiles) == 1 else (f"{automation_id}_{index}" if automation_id else None))
+
+            if id is None:
+                id = get_random_string()
+
+            lights = resolved_targets[index * 2]
+            triggers = resolved_targets[index * 2 + 1]
+            conditions = { key: data[key] for key in [CONF_TRIGGER_OFF_HOLD, CONF_TRIGGER_ON_DEBOUNCE, CONF_TRIGGER_PREDICATE] if key in data }
+            profile = self._get_profile(id, lights, attributes, triggers if len(triggers) > 0 else None, data.get(CONF_DURATION, None), conditions)
+
+            if len(triggers) > 0:
+                active_profiles.append(profile)
+            else:
+                idle_profiles.append(profile)
+
+        self._profiles_version += 1
+        self._active_profiles.extend(active_profiles)
+        self._idle_profiles.extend(idle_profiles)
+
+        return active_profiles + idle_profiles
 
 
     #--------------------------------------------#
     #       Update Methods
     #--------------------------------------------#
 
-    def _update(self) -> None:
-        """ Updates the status of the entity. """
-        if not self.is_on:
-            return self.async_schedule_update_ha_state(True)
+    def _decide(self, requests: List[Any]) -> None:
+        """ Makes the single decision of an inbox step (a batch selection is only reused if it was the only request of the step). """
+        self._update(requests[0] if len(requests) == 1 and requests[0] is not True else None)
 
-        if self.is_active and self.is_blocked:
-            self._reset_current_active_profile()
+    def _post_update(self, selection: Tuple[AL_Profile | None, AL_Profile | None] | None = None) -> None:
+        """ Posts a decision request (optionally carrying a batch selection) to the inbox. """
+        self._inbox.post(lambda: selection or True)
 
-        if self.is_blocked:
-            self._status = STATUS_BLOCKED
-            return self.async_schedule_update_ha_state(True)
+    def _update(self, selection: Tuple[AL_Profile | None, AL_Profile | None] | None = None) -> None:
+        """ Updates the status of the entity at the time of its clock (the winning active and idle profiles can be passed in when a batch evaluation already selected them). """
+        started_at = perf_counter()
+
+        if self.is_on:
+            with self.decision():
+                is_triggered = self.is_triggered
+
+                if selection is None:
+                    selection = select_first_valid([self._active_profiles if is_triggered else [], self._idle_profiles], self.now().time(), get_illuminance_states(self.hass, self._active_profiles + self._idle_profiles))
 
-        if self.is_active:
-            return self.async_schedule_update_ha_state(True)
+                self.execute(self._engine.evaluate(is_triggered, [profile for profile in selection[:1] if profile], [profile for profile in selection[1:] if profile], self.light_entities, get_first))
 
-        if self.is_triggered:
-            if self._set_active_profile():
-                self._status = STATUS_ACTIVE
-                return self.async_schedule_update_ha_state(True)
+            self._schedule_deadline()
+            self.trace(RECORD_TYPE_DECISION, status=self._engine.state, active_profile=self._engine.active_profile and self._engine.active_profile.id, idle_profile=self._engine.idle_profile and self._engine.idle_profile.id, duration=perf_counter() - started_at)
 
-        self._status = STATUS_IDLE
-        self._set_idle_profile()
-        return self.async_schedule_update_ha_state(True)
+        self.write_state(True)
 
 
     #--------------------------------------------#
     #       Event Handlers
     #--------------------------------------------#
 
-    async def _async_on_active_profile_finished(self) -> None:
-        """ Triggered when the profile has finished. """
-        self._reset_current_active_profile()
-        self._update()
-
     async def _async_on_automations_changed(self, event_type: str, entity_id: str) -> None:
         """ Triggered when an automation_reloaded event or automation state change event is detected. """
+        self.record(RECORD_TYPE_AUTOMATIONS_CHANGED, event_type=event_type, entity_id=entity_id)
+
         if event_type == EVENT_AUTOMATION_RELOADED:
             self.logger.debug(f"Detected an automation_reloaded event.")
         else:
-            self.logger.debug(f"Detected a state change to {entity_id}.")
+            self.logger.debug("Detected a state change to %s.", entity_id)
+
         self._refresh_profiles()
 
+    async def _async_on_condition_change(self, *args: Any) -> None:
+        """ Triggered when a time boundary is reached or an illuminance sensor changes, queueing the idle profile for a batch re-evaluation (a replayed zone is evaluated on its own, at its virtual time). """
+        self.record(RECORD_TYPE_CONDITION)
+        self._profiles_version += 1
+
+        if self.is_active or self.is_blocked or self.is_refreshing:
+            return
+
+        if self.is_replaying:
+            return update_idle_profiles(self.hass, [self], self.now().time())
+
+        async_queue_batch_update(self.hass, self)
+
     async def _async_on_manual_control(self, entity_ids: List[str], context: Context) -> None:
-        """ Triggered when manual control of the lights are detected. """
-        self.logger.debug(f"Manual control was detected for following entities: {entity_ids}")
-        await self._block(self._block_duration if self.is_blocked else self._block_config_duration)
+        """ Triggered when manual control of the lights are detected, posting it to the inbox. """
+        self.record(RECORD_TYPE_MANUAL_CONTROL, entity_ids=entity_ids)
+        self._inbox.post(partial(self._process_manual_control, entity_ids))
+
+    def _process_manual_control(self, entity_ids: List[str]) -> bool:
+        """ Blocks the engine after manual control of the lights. """
+        self.trace("manual_control", entity_ids=entity_ids)
+        self.logger.debug("Manual control was detected for following entities: %s", entity_ids)
+        return self._engine.manual_control(self.timestamp()) and self._on_blocked()
 
     async def _async_on_trigger_state_change(self, entity_id: str, old: State, new: State) -> None:
-        """ Triggered when the state of a trigger changes. """
-        if old is not None and old.state == new.state:
-            return
+        """ Triggered when the state of a trigger changes, evaluating its predicates and passing the changed signals through the debounce filter. """
+        self.record(RECORD_TYPE_TRIGGER, entity_id=entity_id, state=new.state if new else None, attributes=dict(new.attributes) if new else None)
 
-        if new.state == STATE_OFF:
-            if self.is_active and not self._current_active_profile.is_triggered:
-                self._active_until = datetime.now() + timedelta(seconds=self._current_active_profile.duration)
-                self._current_active_profile.start_timer(self._async_on_active_profile_finished)
-                self._update()
-            return
+        for signal, predicate in self._trigger_predicates.get(entity_id, {}).items():
+            is_on = predicate(new, self._trigger_outputs.get(signal, False))
+
+            if is_on == self._trigger_outputs.get(signal):
+                continue
+
+            self._trigger_outputs[signal] = is_on
+            await self._trigger_filter.async_process(signal, STATE_ON if is_on else STATE_OFF)
+
+    async def _async_on_trigger_change(self, signal: str, state: str) -> None:
+        """ Triggered when the debounced state of a trigger signal changes, posting it to the inbox. """
+        self._inbox.post(partial(self._process_trigger_change, signal, state))
+
+    def _process_trigger_change(self, signal: str, state: str) -> bool:
+        """ Applies a debounced trigger change to the engine. """
+        self.trace("trigger", signal=signal, state=state, suppressed=self._trigger_filter.suppressed)
+        self._profiles_version += 1
+
+        active_profile = self._engine.active_profile
+
+        if state == STATE_OFF:
+            if self.is_active and not active_profile.is_triggered:
+                self._engine.release(self.timestamp(), active_profile.duration)
+                return True
+            return False
 
         if self.is_blocked:
-            return await self._block(duration=self._block_duration)
+            return self._engine.extend_block(self.timestamp()) and self._on_blocked()
 
-        if self._current_active_profile and self._current_active_profile.is_timer_running:
-            if self._current_active_profile.is_triggered:
-                self._active_until = None
-                self._current_active_profile.cancel_timer()
+        if active_profile and self._engine.active_until is not None:
+            if active_profile.is_triggered:
+                self._engine.hold()
             else:
-                self._current_active_profile.start_timer(self._async_on_active_profile_finished)
+                self._engine.release(self.timestamp(), active_profile.duration)
 
         self._last_triggered_at = datetime.now()
-        self._last_triggered_by = entity_id
-        self._update()
+        self._last_triggered_by = get_signal_entity_id(signal)
+        return True
+
+
+    #--------------------------------------------#
+    #       Option Methods
+    #--------------------------------------------#
+
+    async def async_apply_options(self, options: Dict[str, Any]) -> bool:
+        """ Applies changed options to the running entity without reloading it (the current profile is kept unless the profiles changed). """
+        self._engine.set_block_duration(options.get(CONF_BLOCK_DURATION, DEFAULT_BLOCK_DURATION))
+        self._compact_attributes = options.get(CONF_COMPACT_ATTRIBUTES, DEFAULT_COMPACT_ATTRIBUTES)
+        self.write_state()
+
+        profiles_config = options.get(CONF_PROFILES, {})
+
+        if profiles_config != self._profiles_config:
+            self._profiles_config = profiles_config
+            self.is_on and self._refresh_profiles()
+
+        record_events = options.get(CONF_RECORD_EVENTS, DEFAULT_RECORD_EVENTS)
+
+        if record_events != self._record_events:
+            self._record_events = record_events
+
+            if not record_events and self.recorder:
+                await self.recorder.async_flush()
+
+            self.set_recorder(EventRecorder(self.hass, self._get_record_path()) if record_events else None)
+
+        return True
+
+
+    #--------------------------------------------#
+    #       Replay Methods
+    #--------------------------------------------#
+
+    async def async_dispatch_record(self, record_type: str, data: Dict[str, Any]) -> None:
+        """ Feeds a recorded input back into the entity (used when replaying an event log). """
+        if record_type == RECORD_TYPE_TURN_ON:
+            return await self.async_turn_on()
+
+        if record_type == RECORD_TYPE_TURN_OFF:
+            return await self.async_turn_off()
+
+        if record_type == RECORD_TYPE_AUTOMATIONS_CHANGED:
+            return await self._async_on_automations_changed(data.get("event_type"), data.get("entity_id"))
+
+        if record_type == RECORD_TYPE_CONDITION:
+            return await self._async_on_condition_change()
+
+        if record_type == RECORD_TYPE_CONSTRAIN:
+            return self._constrain(data.get(CONF_ID), data.get(CONF_CONSTRAIN))
+
+        if record_type == RECORD_TYPE_MANUAL_CONTROL:
+            return await self._async_on_manual_control(data.get("entity_ids", []), self.create_context())
+
+        if record_type == RECORD_TYPE_REGISTER:
+            return await self._async_register_profiles(data.get(CONF_PROFILES, []), data.get("automation_id"))
+
+        if record_type == RECORD_TYPE_TRIGGER:
+            state = State(data["entity_id"], data["state"], data.get("attributes")) if data.get("state") is not None else None
+            return await self._async_on_trigger_state_change(data["entity_id"], None, state)
 
 
     #--------------------------------------------#
     #       Helper Methods
     #--------------------------------------------#
 
+    def _get_profile_attributes(self, profile: AL_Profile) -> Dict[str, Any]:
+        """ Gets the state attributes describing a profile (the profile id and a hash of its lights in compact mode). """
+        if self._compact_attributes:
+            return { CONF_ID: profile.id, ATTR_LIGHTS_HASH: get_entities_hash(profile.light_entities) }
+
+        return { CONF_ENTITY_ID: list(profile.light_entities), **profile.attributes }
+
+    def _get_record_path(self) -> str:
+        """ Gets the path of the event log of the entity. """
+        return self.hass.config.path(f"{DOMAIN}.{self._entry_id}.switch.jsonl")
+
     def _get_profile_id(self, context: Context) -> str | None:
         """ Gets the profile id based on a context. """
         entity_ids = self.hass.states.async_entity_ids(AUTOMATION_DOMAIN)
@@ -483,31 +784,50 @@ class AL_Entity(SwitchEntity, RestoreEntity, EntityBase):
 
         return None
 
-    def _turn_off_unused_entities(self, old_entity_ids: List[str], new_entity_ids: List[str]) -> None:
-        """ Turns off entities if they are not used in the current profile. """
-        unused_entities = [entity_id for entity_id in old_entity_ids if entity_id not in new_entity_ids]
-        self.logger.debug(f"Turning following unused entities off: {unused_entities}")
-        self.call_service(LIGHT_DOMAIN, SERVICE_TURN_OFF, entity_id=unused_entities)
-
 
 #-----------------------------------------------------------#
 #       AL_Profile
 #-----------------------------------------------------------#
 
 class AL_Profile:
+    __slots__ = ("_attributes", "_conditions", "_duration", "_hass", "_id", "_illuminance_entity", "_illuminance_threshold", "_is_constrained", "_is_trigger_on", "_light_entities", "_time_after", "_time_before", "_trigger_entities", "_trigger_off_hold", "_trigger_on_debounce", "_trigger_predicate", "_trigger_signals")
+
     #--------------------------------------------#
     #       Constructor
     #--------------------------------------------#
 
-    def __init__(self, hass: HomeAssistant, id: str, lights: List[str], attributes: Dict[str, Any], triggers: List[str] | None = None, duration: int | None = None):
+    def __init__(self, hass: HomeAssistant, id: str, lights: Tuple[str, ...], attributes: Mapping[str, Any], triggers: Tuple[str, ...] | None = None, duration: int | None = None, conditions: Mapping[str, Any] | None = None, is_trigger_on: Callable[[str], bool] | None = None):
+        conditions = intern_attributes(conditions)
         self._attributes = attributes
+        self._conditions = conditions
         self._duration = duration
         self._hass = hass
         self._id = id
+        self._illuminance_entity = conditions.get(CONF_ILLUMINANCE_ENTITY, None)
+        self._illuminance_threshold = conditions.get(CONF_ILLUMINANCE_THRESHOLD, None)
         self._is_constrained = False
+        self._is_trigger_on = is_trigger_on or (lambda signal: self._trigger_predicate(hass.states.get(get_signal_entity_id(signal)), False))
         self._light_entities = lights
-        self._timer = None
+        self._time_after = dt_util.parse_time(conditions[CONF_TIME_AFTER]) if conditions.get(CONF_TIME_AFTER) else None
+        self._time_before = dt_util.parse_time(conditions[CONF_TIME_BEFORE]) if conditions.get(CONF_TIME_BEFORE) else None
         self._trigger_entities = triggers
+        self._trigger_off_hold = conditions.get(CONF_TRIGGER_OFF_HOLD, DEFAULT_TRIGGER_OFF_HOLD)
+        self._trigger_on_debounce = conditions.get(CONF_TRIGGER_ON_DEBOUNCE, DEFAULT_TRIGGER_ON_DEBOUNCE)
+        self._trigger_predicate = compile_predicate(conditions.get(CONF_TRIGGER_PREDICATE))
+        self._trigger_signals = tuple(self._trigger_predicate.signal(entity_id) for entity_id in triggers) if triggers is not None else ()
+
+
+    #--------------------------------------------#
+    #       Static Methods
+    #--------------------------------------------#
+
+    @staticmethod
+    def parse_config(config: Dict[str, Any]) -> Tuple[List[str], Dict[str, Any], List[str] | None, int | None, Dict[str, Any]]:
+        """ Splits a profile definition stored in the config entry options into lights, attributes, triggers, duration and conditions. """
+        conditions = { key: config[key] for key in [CONF_ILLUMINANCE_ENTITY, CONF_ILLUMINANCE_THRESHOLD, CONF_TIME_AFTER, CONF_TIME_BEFORE, CONF_TRIGGER_OFF_HOLD, CONF_TRIGGER_ON_DEBOUNCE, CONF_TRIGGER_PREDICATE] if key in config }
+        attributes = { key: value for key, value in config.items() if key not in [CONF_DURATION, CONF_LIGHTS, CONF_TRIGGERS, *conditions.keys()] }
+        triggers = config.get(CONF_TRIGGERS, [])
+        return config.get(CONF_LIGHTS, []), attributes, triggers if len(triggers) > 0 else None, config.get(CONF_DURATION, None) if len(triggers) > 0 else None, conditions
 
 
     #--------------------------------------------#
@@ -515,7 +835,7 @@ class AL_Profile:
     #--------------------------------------------#
 
     @property
-    def attributes(self) -> Dict[str, Any]:
+    def attributes(self) -> Mapping[str, Any]:
         """ Gets a dict containing the attributes used in light service calls. """
         return self._attributes
 
@@ -529,31 +849,86 @@ class AL_Profile:
         """ Gets the profile id. """
         return self._id
 
+    @property
+    def illuminance_entity(self) -> str | None:
+        """ Gets the illuminance entity of the profile's illuminance condition. """
+        return self._illuminance_entity
+
+    @property
+    def illuminance_threshold(self) -> float | None:
+        """ Gets the threshold of the profile's illuminance condition. """
+        return self._illuminance_threshold
+
     @property
     def is_constrained(self) -> bool:
         """ Gets a boolean indicating whether the profile is constrained. """
         return self._is_constrained
 
-    @property
-    def is_timer_running(self) -> bool:
-        """ Gets a boolean indicating wether the timer is running. """
-        return self._timer is not None and self._timer.is_running
-
     @property
     def is_triggered(self) -> bool:
         """ Gets a boolean indicating whether the profile's triggers have been triggered. """
-        return any((state := self._hass.states.get(entity)) is not None and state.state == STATE_ON for entity in (self._trigger_entities if self._trigger_entities is not None else []))
+        return any(self._is_trigger_on(signal) for signal in self._trigger_signals)
 
     @property
-    def light_entities(self) -> List[str]:
+    def key(self) -> Tuple[Any, ...]:
+        """ Gets a hashable key identifying the content of the profile. """
+        return (self._id, self._light_entities, self._attributes, self._trigger_entities, self._duration, self._conditions)
+
+    @property
+    def light_entities(self) -> Tuple[str, ...]:
         """ Gets a list of the light entities in the profile. """
         return self._light_entities
 
     @property
-    def trigger_entities(self) -> List[str] | None:
+    def lights(self) -> Tuple[str, ...]:
+        """ Gets a list of the light entities in the profile (the name used by the lighting engine). """
+        return self._light_entities
+
+    @property
+    def state(self) -> str:
+        """ Gets the state the profile puts the entity in (active if it has triggers, idle otherwise). """
+        return STATE_ACTIVE if self._trigger_entities is not None else STATE_IDLE
+
+    @property
+    def time_after(self) -> time | None:
+        """ Gets the start of the profile's time condition. """
+        return self._time_after
+
+    @property
+    def time_before(self) -> time | None:
+        """ Gets the end of the profile's time condition. """
+        return self._time_before
+
+    @property
+    def time_boundaries(self) -> List[time]:
+        """ Gets the times at which the profile's time condition changes. """
+        return [boundary for boundary in [self._time_after, self._time_before] if boundary is not None]
+
+    @property
+    def trigger_entities(self) -> Tuple[str, ...] | None:
         """ Gets a list of the trigger entities in the profile (returns an empty list if it is not an active profile). """
         return self._trigger_entities
 
+    @property
+    def trigger_predicate(self) -> TriggerPredicate:
+        """ Gets the compiled predicate deciding whether a trigger entity is on. """
+        return self._trigger_predicate
+
+    @property
+    def trigger_signals(self) -> Tuple[str, ...]:
+        """ Gets the signals of the trigger entities (an entity evaluated by a predicate has its own signal). """
+        return self._trigger_signals
+
+    @property
+    def trigger_off_hold(self) -> float:
+        """ Gets the number of seconds a trigger has to stay off before the change is passed on. """
+        return self._trigger_off_hold
+
+    @property
+    def trigger_on_debounce(self) -> float:
+        """ Gets the number of seconds a trigger has to stay on before the change is passed on. """
+        return self._trigger_on_debounce
+
 
     #--------------------------------------------#
     #       Constrain Methods
@@ -563,38 +938,15 @@ class AL_Profile:
         """ Set whether the profile is constrained. """
         self._is_constrained = constrain
 
-
-    #--------------------------------------------#
-    #       Timer Methods
-    #--------------------------------------------#
-
-    def cancel_timer(self) -> None:
-        """ Cancels the timer if it has been started. """
-        if self._timer is None:
-            return
-
-        self._timer.cancel()
-        self._timer = None
-
-    def start_timer(self, action: Callable[[], None]) -> None:
-        """ Starts the timer with the duration of the profile (only works for active profiles). """
-        if self._duration is None:
-            return
-
-        self.cancel_timer()
-        self._timer = Timer(self._hass, self._duration, action)
+    def reset(self) -> None:
+        """ Resets the runtime state of the profile (used when a profile is reused after a refresh). """
+        self._is_constrained = False
 
 
     #--------------------------------------------#
     #       Validation Methods
     #--------------------------------------------#
 
-    def is_valid(self) -> bool:
-        """ Determines whether the profile is valid for use. """
-        if self._is_constrained:
-            return False
-
-        if self._trigger_entities is not None and not self.is_triggered:
-            return False
-
-        return True
\ No newline at end of file
+    def is_valid(self, now: time | None = None) -> bool:
+        """ Determines whether the profile is valid for use at a time of day (the current time if none is given). """
+        return is_profile_valid(self, get_seconds(now or dt_util.now().time()), get_illuminance_states(self._hass, [self]))
@@ -2,113 +2,104 @@
 #       Imports
 #-----------------------------------------------------------#
 
-from ..const import CONF_NEW_STATE, CONF_OLD_STATE
-from .entity_base import EntityBase
+from ..const import DATA_AUTOMATION_COORDINATOR, DOMAIN, OWNED_LIGHTS
+from .automations import AutomationCoordinator
+from .capabilities import LightCapabilities, LightCapabilityCache
+from .delivery import DeliveryTracker
+from .entity_base import EntityBase, get_zone_event_type, has_bus_listeners
+from .inbox import Inbox
+from .light_groups import async_expand_light_groups, LightGroupIndex
+from .predicates import compile_predicate, get_signal_entity_id, TriggerPredicate
+from .profile_store import FrozenAttributes, intern_attributes, intern_entity_ids, ProfileStore
+from .recorder import EventRecorder, load_records
+from .replay import async_replay, async_replay_file, ReplayResult, VirtualClock
+from .startup import StartupScheduler
 from .timer import Timer
-from homeassistant.components.automation import DOMAIN as AUTOMATION_DOMAIN, EVENT_AUTOMATION_RELOADED
-from homeassistant.const import ATTR_DOMAIN, ATTR_SERVICE, ATTR_SERVICE_DATA, CONF_ENTITY_ID, EVENT_CALL_SERVICE, EVENT_STATE_CHANGED, SERVICE_RELOAD
+from .trace import TraceBuffer
+from .trigger_filter import TriggerFilter
+from .zone_stream import ZoneStream
+from homeassistant.const import ATTR_DOMAIN, ATTR_SERVICE_DATA, EVENT_CALL_SERVICE
 from homeassistant.core import Context, Event, HomeAssistant
 from homeassistant.helpers import config_validation as cv
-from typing import Any, Callable, Dict, List, Union
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Union
+import hashlib
 
 
 #-----------------------------------------------------------#
 #       Entity
 #-----------------------------------------------------------#
 
+def get_entities_hash(entity_ids: Iterable[str]) -> str:
+    """ Gets a short, order independent hash of a list of entity ids (used in place of the list in compact attributes). """
+    return hashlib.blake2s(",".join(sorted(set(entity_ids))).encode(), digest_size=4).hexdigest()
+
 async def async_resolve_target(hass: HomeAssistant, target: Union[str, List[str], Dict[str, Any]]) -> List[str]:
     """ Resolves the target argument of a service call and returns a list of entity ids. """
-    if isinstance(target, str):
-        return cv.ensure_list_csv(target)
-
-    if isinstance(target, list):
-        return target
-
-    result = []
+    return (await async_resolve_targets(hass, [target]))[0]
+
+async def async_resolve_targets(hass: HomeAssistant, targets: List[Union[str, List[str], Dict[str, Any], None]]) -> List[List[str]]:
+    """ Resolves a batch of target arguments (reading the entity registry at most once) and returns a list of entity ids per target. """
+    results = []
+    pending = []
+
+    for target in targets:
+        if target is None:
+            results.append([])
+        elif isinstance(target, str):
+            results.append(cv.ensure_list_csv(target))
+        elif isinstance(target, list):
+            results.append(target)
+        else:
+            results.append([])
+            pending.append((len(results) - 1, target.get("area_id", []), target.get("device_id", []), target.get("entity_id", [])))
+
+    if len(pending) == 0:
+        return results
 
     entity_registry = await hass.helpers.entity_registry.async_get_registry()
-    entity_entries = entity_registry.entities.values()
-
-    target_areas = target.get("area_id", [])
-    target_devices = target.get("device_id", [])
-    target_entities = target.get("entity_id", [])
 
-    for entity in entity_entries:
+    for entity in entity_registry.entities.values():
         if entity.disabled:
             continue
 
-        if entity.entity_id in target_entities:
-            result.append(entity.entity_id)
-            continue
+        for index, target_areas, target_devices, target_entities in pending:
+            if entity.entity_id in target_entities:
+                results[index].append(entity.entity_id)
+                continue
 
-        if entity.device_id is not None and entity.device_id in target_devices:
-            result.append(entity.entity_id)
-            continue
+            if entity.device_id is not None and entity.device_id in target_devices:
+                results[index].append(entity.entity_id)
+                continue
 
-        if entity.area_id is not None and entity.area_id in target_areas:
-            result.append(entity.entity_id)
+            if entity.area_id is not None and entity.area_id in target_areas:
+                results[index].append(entity.entity_id)
 
-    return result
+    return results
 
 
 #-----------------------------------------------------------#
-#       Trackers
+#       Zone
 #-----------------------------------------------------------#
 
-def async_track_automations_changed(hass: HomeAssistant, action: Callable[[str, str], None]) -> Callable[[], None]:
-    """ Tracks automation changes (call_service, reloaded event). """
-    reloading = False
-    remove_listeners = []
+def get_owned_lights(hass: HomeAssistant, entry_id: str) -> FrozenSet[str]:
+    """ Gets the lights controlled by the switch of a zone (the sensor of the zone leaves them alone, so the two never undo each other's commands). """
+    return hass.data.get(DOMAIN, {}).get(entry_id, {}).get(OWNED_LIGHTS, frozenset())
 
-    def clear_listeners() -> None:
-        while remove_listeners:
-            remove_listeners.pop()()
+def set_owned_lights(hass: HomeAssistant, entry_id: str, lights: Iterable[str]) -> None:
+    """ Sets the lights controlled by the switch of a zone (ignored if the zone is not set up through a config entry). """
+    data = hass.data.get(DOMAIN, {}).get(entry_id)
 
-    async def on_automation_reloaded(event: Event) -> None:
-        nonlocal reloading
-        reloading = False
-        await action(EVENT_AUTOMATION_RELOADED, [])
+    if data is not None:
+        data[OWNED_LIGHTS] = frozenset(lights)
 
-    async def on_service_call(event: Event) -> None:
-        nonlocal reloading
-
-        domain = event.data.get(ATTR_DOMAIN, None)
-        service = event.data.get(ATTR_SERVICE, None)
-
-        if domain != AUTOMATION_DOMAIN:
-            return
 
-        if service == SERVICE_RELOAD:
-            reloading = True
-
-    async def on_state_changed(event: Event) -> None:
-        nonlocal reloading
-
-        if reloading:
-            return
-
-        entity_id = event.data.get(CONF_ENTITY_ID, "")
-        domain = entity_id.split(".")[0]
-
-        if domain != AUTOMATION_DOMAIN:
-            return
-
-        old_state = event.data.get(CONF_OLD_STATE, None)
-        new_state = event.data.get(CONF_NEW_STATE, None)
-
-        if old_state is None or new_state is None:
-            return
-
-        if old_state.state == new_state.state:
-            return
-
-        await action(EVENT_STATE_CHANGED, entity_id)
-
-    remove_listeners.append(hass.bus.async_listen(EVENT_AUTOMATION_RELOADED, on_automation_reloaded))
-    remove_listeners.append(hass.bus.async_listen(EVENT_CALL_SERVICE, on_service_call))
-    remove_listeners.append(hass.bus.async_listen(EVENT_STATE_CHANGED, on_state_changed))
+#-----------------------------------------------------------#
+#       Trackers
+#-----------------------------------------------------------#
 
-    return clear_listeners
+def async_track_automations_changed(hass: HomeAssistant, action: Callable[[str, str], None]) -> Callable[[], None]:
+    """ Tracks automation changes (call_service, reloaded event) through the shared coordinator, which refreshes all zones once the changes have settled. """
+    return hass.data[DATA_AUTOMATION_COORDINATOR].subscribe(action)
 
 def async_track_manual_control(hass: HomeAssistant, entity_id: Union[str, List[str]], action: Callable[[List[str], Context], None], context_validator: Callable[[Context], bool]) -> Callable[[], None]:
     """ Tracks manual control of specific entities. """
@@ -0,0 +1,173 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from __future__ import annotations
+from ..const import AUTOMATION_DOMAIN, CONF_NEW_STATE, CONF_OLD_STATE, EVENT_AUTOMATION_RELOADED
+from homeassistant.const import ATTR_DOMAIN, ATTR_SERVICE, CONF_ENTITY_ID, EVENT_CALL_SERVICE, EVENT_STATE_CHANGED, SERVICE_RELOAD
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.helpers.event import async_call_later
+from logging import Logger
+from typing import Any, Callable, Dict
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+RELOAD_TIMEOUT = 10
+SETTLE_TIME = 1.0
+
+
+#-----------------------------------------------------------#
+#       Class - AutomationCoordinator
+#-----------------------------------------------------------#
+
+class AutomationCoordinator():
+    """ Coalesces automation reloads and toggles into a single refresh of every subscribed zone, once the changes have settled. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, hass: HomeAssistant, logger: Logger, settle_time: float = SETTLE_TIME):
+        self._avoided = 0
+        self._changes = 0
+        self._entity_id = None
+        self._event_type = None
+        self._hass = hass
+        self._is_reloading = False
+        self._logger = logger
+        self._refreshes = 0
+        self._remove_listeners = []
+        self._settle_time = settle_time
+        self._subscribers = []
+        self._timer = None
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def avoided(self) -> int:
+        """ Gets the number of zone refresh cycles that were avoided by coalescing changes. """
+        return self._avoided
+
+    @property
+    def refreshes(self) -> int:
+        """ Gets the number of coordinated refreshes. """
+        return self._refreshes
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """ Gets a dict containing the coordinator statistics (exposed through diagnostics). """
+        return { "subscribers": len(self._subscribers), "refreshes": self._refreshes, "avoided": self._avoided }
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def subscribe(self, action: Callable[[str, Any], Any]) -> Callable[[], None]:
+        """ Subscribes a zone to the coordinated refreshes and returns a callable that unsubscribes it. """
+        self._subscribers.append(action)
+        len(self._subscribers) == 1 and self._setup_listeners()
+
+        def unsubscribe() -> None:
+            action in self._subscribers and self._subscribers.remove(action)
+            len(self._subscribers) == 0 and self._remove_all()
+
+        return unsubscribe
+
+
+    #--------------------------------------------#
+    #       Listener Methods
+    #--------------------------------------------#
+
+    def _remove_all(self) -> None:
+        """ Removes the event listeners and the pending refresh. """
+        while self._remove_listeners:
+            self._remove_listeners.pop()()
+
+        self._timer and self._timer()
+        self._timer = None
+        self._changes = 0
+        self._event_type = None
+        self._is_reloading = False
+
+    def _setup_listeners(self) -> None:
+        """ Sets up a single set of event listeners shared by all zones. """
+        self._remove_listeners.append(self._hass.bus.async_listen(EVENT_AUTOMATION_RELOADED, self._async_on_automation_reloaded))
+        self._remove_listeners.append(self._hass.bus.async_listen(EVENT_CALL_SERVICE, self._async_on_service_call))
+        self._remove_listeners.append(self._hass.bus.async_listen(EVENT_STATE_CHANGED, self._async_on_state_changed))
+
+
+    #--------------------------------------------#
+    #       Event Handlers
+    #--------------------------------------------#
+
+    async def _async_on_automation_reloaded(self, event: Event) -> None:
+        """ Triggered when the automations have been reloaded. """
+        self._is_reloading = False
+        self._add_change(EVENT_AUTOMATION_RELOADED, [])
+
+    async def _async_on_service_call(self, event: Event) -> None:
+        """ Triggered when a service is called, detecting the start of an automation reload. """
+        if event.data.get(ATTR_DOMAIN, None) != AUTOMATION_DOMAIN or event.data.get(ATTR_SERVICE, None) != SERVICE_RELOAD:
+            return
+
+        self._is_reloading = True
+        self._schedule(RELOAD_TIMEOUT)
+
+    async def _async_on_state_changed(self, event: Event) -> None:
+        """ Triggered when a state changes, detecting automations that are turned on or off. """
+        if self._is_reloading:
+            return
+
+        entity_id = event.data.get(CONF_ENTITY_ID, "")
+
+        if entity_id.split(".")[0] != AUTOMATION_DOMAIN:
+            return
+
+        old_state = event.data.get(CONF_OLD_STATE, None)
+        new_state = event.data.get(CONF_NEW_STATE, None)
+
+        if old_state is None or new_state is None or old_state.state == new_state.state:
+            return
+
+        self._add_change(EVENT_STATE_CHANGED, entity_id)
+
+    async def _async_on_settled(self, *args: Any) -> None:
+        """ Triggered when no automation change has been detected for the settle time, refreshing every zone once. """
+        subscribers = list(self._subscribers)
+        changes = max(self._changes, 1)
+        event_type = self._event_type or EVENT_AUTOMATION_RELOADED
+        entity_id = self._entity_id if event_type == EVENT_STATE_CHANGED else []
+        self._changes = 0
+        self._entity_id = None
+        self._event_type = None
+        self._is_reloading = False
+        self._timer = None
+        self._refreshes += 1
+        self._avoided += (changes - 1) * len(subscribers)
+        self._logger.debug("Refreshing %s zones after %s automation changes (%s refresh cycles avoided in total).", len(subscribers), changes, self._avoided)
+
+        for action in subscribers:
+            await action(event_type, entity_id)
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _add_change(self, event_type: str, entity_id: Any) -> None:
+        """ Adds a change to the pending refresh (a reload takes precedence over toggles) and restarts the settle time. """
+        self._changes += 1
+        self._entity_id = entity_id
+        self._event_type = EVENT_AUTOMATION_RELOADED if EVENT_AUTOMATION_RELOADED in (event_type, self._event_type) else event_type
+        self._schedule(self._settle_time)
+
+    def _schedule(self, delay: float) -> None:
+        """ (Re)starts the timer of the pending refresh. """
+        self._timer and self._timer()
+        self._timer = async_call_later(self._hass, delay, self._async_on_settled)
@@ -0,0 +1,157 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from __future__ import annotations
+from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_BRIGHTNESS_PCT, ATTR_COLOR_NAME, ATTR_COLOR_TEMP, ATTR_HS_COLOR, ATTR_KELVIN, ATTR_MAX_MIREDS, ATTR_MIN_MIREDS, ATTR_RGB_COLOR, ATTR_RGBW_COLOR, ATTR_RGBWW_COLOR, ATTR_SUPPORTED_COLOR_MODES, ATTR_XY_COLOR, SERVICE_TURN_ON, brightness_supported, color_supported, color_temp_supported
+from homeassistant.core import HomeAssistant
+from typing import Any, Dict, List, Mapping, NamedTuple, Tuple, Union
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+BRIGHTNESS_ATTRIBUTES = (ATTR_BRIGHTNESS, ATTR_BRIGHTNESS_PCT)
+COLOR_ATTRIBUTES = (ATTR_COLOR_NAME, ATTR_HS_COLOR, ATTR_RGB_COLOR, ATTR_RGBW_COLOR, ATTR_RGBWW_COLOR, ATTR_XY_COLOR)
+COLOR_TEMP_ATTRIBUTES = (ATTR_COLOR_TEMP, ATTR_KELVIN)
+
+
+#-----------------------------------------------------------#
+#       Class - LightCapabilities
+#-----------------------------------------------------------#
+
+class LightCapabilities(NamedTuple):
+    """ The capabilities of a light, derived from its supported color modes and mired range. """
+    brightness: bool
+    color: bool
+    color_temp: bool
+    min_mireds: Union[float, None]
+    max_mireds: Union[float, None]
+
+    def adapt(self, attributes: Mapping[str, Any]) -> Dict[str, Any]:
+        """ Gets the attributes without the values the light does not support, with the color temperature clamped to its mired range (Home Assistant converts color temperatures for color lights). """
+        result = {}
+
+        for key, value in attributes.items():
+            if key in BRIGHTNESS_ATTRIBUTES and not self.brightness:
+                continue
+
+            if key in COLOR_ATTRIBUTES and not self.color:
+                continue
+
+            if key in COLOR_TEMP_ATTRIBUTES and not (self.color_temp or self.color):
+                continue
+
+            result[key] = self._clamp(key, value) if key in COLOR_TEMP_ATTRIBUTES and self.color_temp else value
+
+        return result
+
+    def _clamp(self, key: str, value: Any) -> Any:
+        """ Clamps a color temperature (mireds or kelvin) to the mired range of the light. """
+        if not isinstance(value, (int, float)) or value <= 0 or self.min_mireds is None or self.max_mireds is None:
+            return value
+
+        mireds = value if key == ATTR_COLOR_TEMP else 1000000 / value
+        clamped = min(max(mireds, self.min_mireds), self.max_mireds)
+
+        if clamped == mireds:
+            return value
+
+        return round(clamped) if key == ATTR_COLOR_TEMP else round(1000000 / clamped)
+
+
+#-----------------------------------------------------------#
+#       Class - LightCapabilityCache
+#-----------------------------------------------------------#
+
+class LightCapabilityCache():
+    """ Caches the capabilities of the lights (refreshed whenever the attributes of a light change) and splits light commands into capability-compatible calls. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, hass: HomeAssistant):
+        self._capabilities = {}
+        self._entries = {}
+        self._hass = hass
+        self._refreshes = 0
+        self._splits = 0
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """ Gets a dict containing the cache statistics (exposed through diagnostics). """
+        return { "lights": len(self._entries), "capabilities": len(self._capabilities), "refreshes": self._refreshes, "splits": self._splits }
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def get(self, entity_id: str) -> Union[LightCapabilities, None]:
+        """ Gets the capabilities of a light (returns None if they are unknown, e.g. the light is unavailable). """
+        state = self._hass.states.get(entity_id)
+
+        if state is None:
+            return None
+
+        entry = self._entries.get(entity_id)
+
+        if entry is not None and entry[0] is state.attributes:
+            return entry[1]
+
+        capabilities = self._get_capabilities(state.attributes)
+        self._entries[entity_id] = (state.attributes, capabilities)
+        self._refreshes += 1
+        return capabilities
+
+    def split(self, command: Any) -> List[Any]:
+        """ Splits a turn_on command into the smallest set of commands whose attributes are supported by all of their lights. """
+        if command.service != SERVICE_TURN_ON or len(command.attributes) == 0:
+            return [command]
+
+        groups = {}
+
+        for entity_id in command.entity_ids:
+            capabilities = self.get(entity_id)
+            attributes = capabilities.adapt(command.attributes) if capabilities is not None else dict(command.attributes)
+            groups.setdefault(_freeze(attributes), (attributes, []))[1].append(entity_id)
+
+        if len(groups) == 1 and next(iter(groups.values()))[0] == dict(command.attributes):
+            return [command]
+
+        self._splits += 1
+        return [command._replace(entity_ids=tuple(entity_ids), attributes=attributes) for attributes, entity_ids in groups.values()]
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _get_capabilities(self, attributes: Mapping[str, Any]) -> Union[LightCapabilities, None]:
+        """ Gets the (shared) capabilities described by the attributes of a light. """
+        modes = attributes.get(ATTR_SUPPORTED_COLOR_MODES)
+
+        if not modes:
+            return None
+
+        key = (tuple(sorted(modes)), attributes.get(ATTR_MIN_MIREDS), attributes.get(ATTR_MAX_MIREDS))
+
+        if key not in self._capabilities:
+            self._capabilities[key] = LightCapabilities(brightness_supported(modes), color_supported(modes), color_temp_supported(modes), key[1], key[2])
+
+        return self._capabilities[key]
+
+
+#-----------------------------------------------------------#
+#       Private Functions
+#-----------------------------------------------------------#
+
+def _freeze(attributes: Mapping[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    """ Converts attributes into a hashable key. """
+    return tuple((key, tuple(value) if isinstance(value, list) else value) for key, value in attributes.items())
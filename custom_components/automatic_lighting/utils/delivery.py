@@ -0,0 +1,131 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from __future__ import annotations
+from functools import partial
+from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_BRIGHTNESS_PCT, ATTR_TRANSITION, SERVICE_TURN_ON
+from homeassistant.const import STATE_OFF, STATE_ON, STATE_UNAVAILABLE
+from homeassistant.core import State
+from itertools import count
+from typing import Any, Callable, Dict, Union
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+BRIGHTNESS_TOLERANCE = 3
+RETRY_BUDGET = 2
+VERIFY_DELAY = 3.0
+
+
+#-----------------------------------------------------------#
+#       Class - DeliveryTracker
+#-----------------------------------------------------------#
+
+class DeliveryTracker():
+    """ Verifies that the lights reached the state requested by the issued commands and re-sends the commands to the lights that diverged, with an exponential backoff and a bounded number of retries. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, call_later: Callable[[float, Callable], Callable[[], None]], get_state: Callable[[str], Union[State, None]], resend: Callable[[Any], None], delay: float = VERIFY_DELAY, budget: int = RETRY_BUDGET):
+        self._budget = budget
+        self._call_later = call_later
+        self._delay = delay
+        self._expected = {}
+        self._get_state = get_state
+        self._ids = count()
+        self._resend = resend
+        self._stats = {}
+        self._timers = {}
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def pending(self) -> int:
+        """ Gets the number of lights waiting for verification. """
+        return len(self._expected)
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """ Gets the delivery statistics of each light (exposed through diagnostics); the success rate only counts verified commands (superseded commands are not verified). """
+        return { light: { **stats, "success_rate": round(stats["delivered"] / (stats["delivered"] + stats["failed"]), 3) if stats["delivered"] + stats["failed"] > 0 else None } for light, stats in self._stats.items() }
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def cancel(self) -> None:
+        """ Stops verifying the issued commands (e.g. when the lights are controlled manually). """
+        while self._timers:
+            self._timers.popitem()[1]()
+
+        self._expected = {}
+
+    def expect(self, command: Any, attempt: int = 0) -> None:
+        """ Starts verifying an issued command once its transition has finished (a newer command replaces the expectation of its lights). """
+        for light in command.entity_ids:
+            self._expected[light] = command
+            stats = self._stats.setdefault(light, { "sent": 0, "delivered": 0, "retries": 0, "failed": 0 })
+            stats["sent" if attempt == 0 else "retries"] += 1
+
+        transition = command.attributes.get(ATTR_TRANSITION)
+        id = next(self._ids)
+        self._timers[id] = self._call_later(self._delay * 2 ** attempt + (transition if isinstance(transition, (int, float)) else 0), partial(self._async_on_verify, id, command, attempt))
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    async def _async_on_verify(self, id: int, command: Any, attempt: int, *args: Any) -> None:
+        """ Triggered when the lights of a command should have reached their state, re-sending the command to the lights that diverged. """
+        self._timers.pop(id, None)
+        diverged = []
+
+        for light in [light for light in command.entity_ids if self._expected.get(light) is command]:
+            state = self._get_state(light)
+            stats = self._stats[light]
+
+            if self._matches(command, state):
+                stats["delivered"] += 1
+            elif attempt < self._budget and state is not None and state.state != STATE_UNAVAILABLE:
+                diverged.append(light)
+                continue
+            else:
+                stats["failed"] += 1
+
+            self._expected.pop(light)
+
+        if len(diverged) == 0:
+            return
+
+        retry = command._replace(entity_ids=tuple(diverged))
+        self._resend(retry)
+        self.expect(retry, attempt + 1)
+
+    @staticmethod
+    def _matches(command: Any, state: Union[State, None]) -> bool:
+        """ Determines whether the state of a light matches the command (the on/off state and, if requested, the brightness). A brightness given as a template is only rendered by the service call, so only the availability of the light is checked. """
+        brightness = command.attributes.get(ATTR_BRIGHTNESS)
+        brightness_pct = command.attributes.get(ATTR_BRIGHTNESS_PCT)
+
+        if isinstance(brightness, str) or isinstance(brightness_pct, str):
+            return state is not None and state.state in (STATE_ON, STATE_OFF)
+
+        if isinstance(brightness_pct, (int, float)):
+            brightness = round(brightness_pct * 255 / 100)
+
+        if state is None or state.state != (STATE_ON if command.service == SERVICE_TURN_ON and brightness != 0 else STATE_OFF):
+            return False
+
+        if not isinstance(brightness, (int, float)) or brightness == 0 or state.attributes.get(ATTR_BRIGHTNESS) is None:
+            return True
+
+        return abs(state.attributes[ATTR_BRIGHTNESS] - brightness) <= BRIGHTNESS_TOLERANCE
@@ -2,19 +2,45 @@
 #       Imports
 #-----------------------------------------------------------#
 
-from homeassistant.core import Context
+from __future__ import annotations
+from ..const import DATA_LIGHT_CAPABILITIES, DATA_STARTUP_SCHEDULER, DATA_ZONE_STREAM, RECORD_TYPE_COMMAND, RECORD_TYPE_EVENT
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
+from homeassistant.core import Context, HomeAssistant
 from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.template import is_template_string, Template
-from homeassistant.util import get_random_string
+from .delivery import DeliveryTracker
+from .trace import TraceBuffer
+from homeassistant.util import dt as dt_util, get_random_string
+from inspect import isawaitable
+from itertools import count
 from logging import Logger
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Union
 
 
 #-----------------------------------------------------------#
 #       Constants
 #-----------------------------------------------------------#
 
+CONTEXT_CACHE_SIZE = 64
 CONTEXT_MAX_LENGTH = 36
+CONTEXT_PREFIX_LENGTH = 6
+
+
+#-----------------------------------------------------------#
+#       Functions
+#-----------------------------------------------------------#
+
+def get_zone_event_type(event_type: str, entity_id: str) -> str:
+    """ Gets the event type that is scoped to a single entity. """
+    return f"{event_type}.{entity_id}"
+
+def has_bus_listeners(hass: HomeAssistant, event_type: str) -> bool:
+    """ Determines whether an event type has listeners. """
+    return hass.bus.async_listeners().get(event_type, 0) > 0
 
 
 #-----------------------------------------------------------#
@@ -28,31 +54,161 @@ class EntityBase(Entity):
     #--------------------------------------------#
 
     def __init__(self, logger: Logger):
-        self._context_unique_id = get_random_string(6)
+        self._clock = None
+        self._context_counter = count(1)
+        self._context_unique_id = get_random_string(CONTEXT_PREFIX_LENGTH)
+        self._contexts = OrderedDict()
+        self._deadline = None
+        self._deadline_listener = None
+        self._decision_context = None
+        self._delivery = DeliveryTracker(self.call_later, lambda entity_id: self.hass.states.get(entity_id), self._issue)
+        self._is_ready = False
         self._logger = logger
+        self._recorder = None
+        self._trace = TraceBuffer()
 
 
     #--------------------------------------------#
     #       Properties
     #--------------------------------------------#
 
+    @property
+    def clock(self) -> Any:
+        """ Gets the virtual clock (returns None if the entity runs on the Home Assistant scheduler). """
+        return self._clock
+
+    @property
+    def delivery(self) -> DeliveryTracker:
+        """ Gets the tracker verifying the delivery of the light commands. """
+        return self._delivery
+
+    @property
+    def handles(self) -> Dict[str, int]:
+        """ Gets the number of live timers and cached references held by the entity (exposed through diagnostics to detect leaks). """
+        return { "deadline": int(self._deadline_listener is not None), "delivery": self._delivery.pending, "contexts": len(self._contexts), "trace": self._trace.size }
+
+    @property
+    def is_replaying(self) -> bool:
+        """ Gets a boolean indicating whether the entity runs on a virtual clock (its inputs then come from an event log). """
+        return self._clock is not None
+
     @property
     def logger(self) -> Logger:
         """ Gets the logger. """
         return self._logger
 
+    @property
+    def traces(self) -> List[Dict[str, Any]]:
+        """ Gets the formatted decision records of the trace buffer, oldest first. """
+        return self._trace.as_list()
+
+    @property
+    def recorder(self) -> Any:
+        """ Gets the event recorder (returns None if the entity is not recording). """
+        return self._recorder
+
+    @property
+    def zone_state(self) -> Dict[str, Any]:
+        """ Gets the compact state of the zone streamed to the websocket subscribers (overridden by the zone entities). """
+        return {}
+
+
+    #--------------------------------------------#
+    #       Clock Methods
+    #--------------------------------------------#
+
+    def call_later(self, delay: float, action: Callable) -> Callable[[], None]:
+        """ Schedules an action to be executed after a delay and returns a callable that cancels it. """
+        if self._clock is not None:
+            return self._clock.call_later(delay, action)
+
+        return async_call_later(self.hass, delay, action)
+
+    def call_soon(self, action: Callable) -> Callable[[], None]:
+        """ Schedules an action to be executed in the next loop iteration (or at the current virtual time) and returns a callable that cancels it. """
+        if self._clock is not None:
+            return self._clock.call_later(0, action)
+
+        return self.hass.loop.call_soon(action).cancel
+
+    def now(self) -> datetime:
+        """ Gets the current (time zone aware) time. """
+        return self._clock.now() if self._clock is not None else dt_util.now()
+
+    def timestamp(self) -> float:
+        """ Gets the current time as a POSIX timestamp (the time base of the lighting engine). """
+        return self.now().timestamp()
+
+    def schedule_deadline(self, deadline: Union[float, None], action: Callable[[float], Any]) -> None:
+        """ Schedules the action (called with the deadline) at a timestamp, replacing the previously scheduled deadline (None cancels it). A deadline that only moved later keeps the running timer, the action re-checks and reschedules when it fires. """
+        if self._deadline_listener is not None and deadline is not None and self._deadline is not None and deadline >= self._deadline:
+            return
+
+        self._deadline_listener and self._deadline_listener()
+        self._deadline = deadline
+        self._deadline_listener = None
+
+        if deadline is None:
+            return
+
+        async def on_deadline(*args: Any) -> None:
+            self._deadline = None
+            self._deadline_listener = None
+            result = action(deadline)
+            isawaitable(result) and await result
+
+        self._deadline_listener = self.call_later(max(deadline - self.timestamp(), 0), on_deadline)
+
+    def set_clock(self, clock: Any) -> None:
+        """ Replaces the Home Assistant scheduler with a virtual clock (commands and events are then only recorded and the state is not written); None restores the scheduler. """
+        self._clock = clock
+
+
+    #--------------------------------------------#
+    #       Record Methods
+    #--------------------------------------------#
+
+    def record(self, record_type: str, **data: Any) -> None:
+        """ Records an input or output of the entity in the trace buffer and, if a recorder has been set, in the event log. """
+        data = self._trace.add(record_type, data)
+        self._recorder and self._recorder.record(record_type, **data)
+
+    def set_recorder(self, recorder: Any) -> None:
+        """ Sets the event recorder. """
+        self._recorder = recorder
+
+    def trace(self, event: str, **data: Any) -> None:
+        """ Adds a decision record to the trace buffer (formatting is deferred until the buffer is read). """
+        self._trace.add(event, data)
+
 
     #--------------------------------------------#
     #       Context Methods
     #--------------------------------------------#
 
     def create_context(self) -> Context:
-        """ Creates a new context. """
-        return Context(id=f"{self._context_unique_id}{get_random_string(CONTEXT_MAX_LENGTH)}"[:CONTEXT_MAX_LENGTH])
+        """ Creates a new context (the id is a per-entity prefix followed by a counter) and remembers it as issued. """
+        id = f"{self._context_unique_id}{next(self._context_counter):0{CONTEXT_MAX_LENGTH - CONTEXT_PREFIX_LENGTH}x}"
+        self._contexts[id] = None
+
+        if len(self._contexts) > CONTEXT_CACHE_SIZE:
+            self._contexts.popitem(last=False)
+
+        return Context(id=id)
+
+    @contextmanager
+    def decision(self) -> Iterator[Context]:
+        """ Shares a single context between all the service calls and events issued within the block. """
+        self._decision_context = self.create_context()
+
+        try:
+            yield self._decision_context
+        finally:
+            self._decision_context = None
 
     def is_context_internal(self, context: Context) -> bool:
-        """ Determines whether the context is of internal origin (created by the class instance). """
-        return context.id.startswith(self._context_unique_id)
+        """ Determines whether the context (or its parent) was issued by the class instance. """
+        return context.id in self._contexts or (context.parent_id is not None and context.parent_id in self._contexts)
 
 
     #--------------------------------------------#
@@ -61,23 +217,82 @@ class EntityBase(Entity):
 
     def call_service(self, domain: str, service: str, **service_data: Any) -> None:
         """ Calls a service. """
-        context = self.create_context()
+        context = self._decision_context or self.create_context()
         self.async_set_context(context)
         parsed_service_data = self._parse_service_data(service_data)
+        self.record(RECORD_TYPE_COMMAND, domain=domain, service=service, service_data=parsed_service_data)
+
+        if self._clock is not None:
+            return
+
         self.hass.async_create_task(self.hass.services.async_call(domain, service, { **parsed_service_data }, context=context, blocking=True))
 
 
+    def execute(self, commands: Iterable[Any]) -> None:
+        """ Issues the light commands returned by the lighting engine, split into capability-compatible calls. """
+        capabilities = self.hass.data.get(DATA_LIGHT_CAPABILITIES)
+
+        for command in (split for command in commands for split in (capabilities.split(command) if capabilities is not None else [command])):
+            self._issue(command)
+            self._clock is None and self._delivery.expect(command)
+
     def fire_event(self, event_type: str, **event_data: Any) -> None:
         """ Fires an event using the Home Assistant bus. """
-        context = self.create_context()
+        context = self._decision_context or self.create_context()
         self.async_set_context(context)
+        self.record(RECORD_TYPE_EVENT, event_type=event_type, event_data=event_data)
+
+        if self._clock is not None:
+            return
+
         self.hass.bus.async_fire(event_type, event_data, context=context)
 
+    def fire_zone_event(self, event_type: str, **event_data: Any) -> None:
+        """ Fires an event that only reaches the listeners of this entity ('<event_type>.<entity_id>'). The unscoped event is only fired if it still has listeners (it is not recorded, so a replay does not depend on the listeners). """
+        context = self._decision_context or self.create_context()
+        zone_event_type = get_zone_event_type(event_type, self.entity_id)
+        event_data = { "entity_id": self.entity_id, **event_data }
+        self.async_set_context(context)
+        self.record(RECORD_TYPE_EVENT, event_type=zone_event_type, event_data=event_data)
+
+        if self._clock is not None:
+            return
+
+        self.hass.bus.async_fire(zone_event_type, event_data, context=context)
+        has_bus_listeners(self.hass, event_type) and self.hass.bus.async_fire(event_type, event_data, context=context)
+
+    def publish_zone_state(self) -> None:
+        """ Publishes the compact state of the zone to the zone stream (only the changed keys reach the subscribers). """
+        stream = self.hass.data.get(DATA_ZONE_STREAM)
+        stream is not None and stream.publish(self.entity_id, self.zone_state)
+
+    def write_state(self, force_refresh: bool = False) -> None:
+        """ Schedules a write of the entity state and publishes the zone state (skipped while replaying, a replayed entity is not part of the state machine). """
+        if self._clock is not None:
+            return
+
+        self.async_schedule_update_ha_state(force_refresh)
+        self.publish_zone_state()
+
+    def remove_zone_state(self) -> None:
+        """ Removes the zone from the zone stream. """
+        stream = self.hass.data.get(DATA_ZONE_STREAM)
+        stream is not None and stream.remove(self.entity_id)
+
+    def has_zone_event_listeners(self, event_type: str) -> bool:
+        """ Determines whether any listener would receive an event fired with fire_zone_event. """
+        return has_bus_listeners(self.hass, get_zone_event_type(event_type, self.entity_id)) or has_bus_listeners(self.hass, event_type)
+
 
     #--------------------------------------------#
     #       Private Methods
     #--------------------------------------------#
 
+    def _issue(self, command: Any) -> None:
+        """ Calls the light service of a command. """
+        self._logger.debug("Calling %s for following entities: %s", command.service, command.entity_ids)
+        self.call_service(LIGHT_DOMAIN, command.service, entity_id=list(command.entity_ids), **command.attributes)
+
     def _parse_service_data(self, service_data: Dict[str, Any]) -> Dict[str, Any]:
         """ Parses the service data by rendering possible templates. """
         result = {}
@@ -93,4 +308,12 @@ class EntityBase(Entity):
             else:
                 result[key] = value
 
-        return result
\ No newline at end of file
+        return result
+
+    def _set_ready(self) -> None:
+        """ Reports the entity as ready to the startup scheduler (once, after the first decision of the zone). """
+        if self._is_ready:
+            return
+
+        self._is_ready = True
+        DATA_STARTUP_SCHEDULER in self.hass.data and self.hass.data[DATA_STARTUP_SCHEDULER].ready(self.entity_id)
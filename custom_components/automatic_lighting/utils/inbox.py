@@ -0,0 +1,75 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from typing import Any, Callable, Dict, List
+
+
+#-----------------------------------------------------------#
+#       Class - Inbox
+#-----------------------------------------------------------#
+
+class Inbox():
+    """ Serializes the events of a zone: the events posted before the inbox is drained are applied in order in one step, followed by a single decision if any of them requested one. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, call_soon: Callable[[Callable], Callable[[], None]], decide: Callable[[List[Any]], None]):
+        self._call_soon = call_soon
+        self._decide = decide
+        self._decisions = 0
+        self._drains = 0
+        self._events = []
+        self._handle = None
+        self._processed = 0
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def pending(self) -> int:
+        """ Gets the number of events waiting to be drained. """
+        return len(self._events)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """ Gets a dict containing the inbox statistics (exposed through diagnostics). """
+        return { "processed": self._processed, "drains": self._drains, "decisions": self._decisions }
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def cancel(self) -> None:
+        """ Drops the pending events. """
+        self._handle and self._handle()
+        self._handle = None
+        self._events = []
+
+    def post(self, event: Callable[[], Any]) -> None:
+        """ Posts an event, which returns a (truthy) decision request or a falsy value when no decision is needed. """
+        self._events.append(event)
+
+        if self._handle is None:
+            self._handle = self._call_soon(self._drain)
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _drain(self, *args: Any) -> None:
+        """ Applies all pending events and makes a single decision (events posted by the decision are drained in the next step). """
+        events, self._events = self._events, []
+        self._handle = None
+        requests = [request for request in (event() for event in events) if request]
+        self._drains += 1
+        self._processed += len(events)
+
+        if len(requests) > 0:
+            self._decisions += 1
+            self._decide(requests)
@@ -0,0 +1,142 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from typing import Dict, FrozenSet, Iterable, List, Set
+
+
+#-----------------------------------------------------------#
+#       Functions
+#-----------------------------------------------------------#
+
+def async_expand_light_groups(hass: HomeAssistant, light_groups: Dict[str, List[str]], entity_ids: Iterable[str]) -> Dict[str, List[str]]:
+    """ Returns the configured light groups extended with the Home Assistant light groups found among the entity ids. """
+    result = { group: list(members) for group, members in light_groups.items() }
+    pending = list(entity_ids) + [member for members in light_groups.values() for member in members]
+    visited = set()
+
+    while pending:
+        entity_id = pending.pop()
+
+        if entity_id in visited:
+            continue
+
+        visited.add(entity_id)
+
+        if entity_id in result or entity_id.split(".")[0] != LIGHT_DOMAIN:
+            continue
+
+        state = hass.states.get(entity_id)
+        members = state.attributes.get(ATTR_ENTITY_ID) if state is not None else None
+
+        if not isinstance(members, (list, tuple)) or len(members) == 0:
+            continue
+
+        result[entity_id] = list(members)
+        pending.extend(members)
+
+    return result
+
+
+#-----------------------------------------------------------#
+#       Class - LightGroupIndex
+#-----------------------------------------------------------#
+
+class LightGroupIndex():
+    """ Precomputed group -> members closure and member -> groups reverse index of a set of light groups. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, light_groups: Dict[str, List[str]]):
+        self._members = {}
+        self._groups = {}
+
+        for group in light_groups:
+            self._members[group] = frozenset(self._resolve(light_groups, group, set()))
+
+        for group, members in self._members.items():
+            for member in members:
+                self._groups.setdefault(member, set()).add(group)
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def groups(self) -> List[str]:
+        """ Gets a list of the indexed group entity ids. """
+        return list(self._members.keys())
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def expand(self, entity_ids: Iterable[str]) -> Set[str]:
+        """ Returns the set of individual lights referenced by the entity ids (groups are replaced by their members). """
+        result = set()
+
+        for entity_id in entity_ids:
+            members = self._members.get(entity_id)
+
+            if members is None:
+                result.add(entity_id)
+            else:
+                result |= members
+
+        return result
+
+    def members(self, group: str) -> FrozenSet[str]:
+        """ Gets the individual lights of a group (returns an empty set if the entity is not a group). """
+        return self._members.get(group, frozenset())
+
+    def unused_entities(self, old_entity_ids: Iterable[str], new_entity_ids: Iterable[str]) -> List[str]:
+        """ Returns a minimal list of group or light entity ids covering the lights that are not used anymore. """
+        unused = self.expand(old_entity_ids) - self.expand(new_entity_ids)
+
+        if len(unused) == 0:
+            return []
+
+        candidates = set()
+
+        for light in unused:
+            candidates |= self._groups.get(light, set())
+
+        candidates = sorted((group for group in candidates if self._members[group] <= unused), key=lambda group: (-len(self._members[group]), group))
+        remaining = set(unused)
+        result = []
+
+        for group in candidates:
+            if not self._members[group] <= remaining:
+                continue
+
+            result.append(group)
+            remaining -= self._members[group]
+
+        return result + sorted(remaining)
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _resolve(self, light_groups: Dict[str, List[str]], group: str, visited: Set[str]) -> Set[str]:
+        """ Resolves the individual lights of a group, following nested groups. """
+        if group in visited:
+            return set()
+
+        visited.add(group)
+        result = set()
+
+        for member in light_groups.get(group, []):
+            if member in light_groups:
+                result |= self._resolve(light_groups, member, visited)
+            else:
+                result.add(member)
+
+        return result
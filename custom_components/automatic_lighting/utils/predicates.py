@@ -0,0 +1,124 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from __future__ import annotations
+from ..const import CONF_HYSTERESIS
+from .profile_store import intern_attributes
+from homeassistant.const import CONF_ABOVE, CONF_ATTRIBUTE, CONF_BELOW, CONF_STATE, STATE_ON
+from homeassistant.core import State
+from typing import Any, Callable, Mapping, Union
+import hashlib
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+PREDICATE_CACHE_SIZE = 256
+SIGNAL_SEPARATOR = "|"
+
+
+#-----------------------------------------------------------#
+#       Functions
+#-----------------------------------------------------------#
+
+_compiled_predicates = {}
+
+def compile_predicate(config: Union[Mapping[str, Any], None]) -> TriggerPredicate:
+    """ Compiles a (validated) trigger predicate configuration; identical configurations share one predicate. """
+    if not config:
+        return DEFAULT_PREDICATE
+
+    config = intern_attributes(config)
+    predicate = _compiled_predicates.get(config)
+
+    if predicate is None:
+        len(_compiled_predicates) >= PREDICATE_CACHE_SIZE and _compiled_predicates.clear()
+        predicate = _compiled_predicates[config] = TriggerPredicate(config)
+
+    return predicate
+
+def get_signal_entity_id(signal: str) -> str:
+    """ Gets the entity id of a trigger signal. """
+    return signal.split(SIGNAL_SEPARATOR, 1)[0]
+
+
+#-----------------------------------------------------------#
+#       Class - TriggerPredicate
+#-----------------------------------------------------------#
+
+class TriggerPredicate():
+    """ A trigger condition compiled into a single callable: a state (or attribute) set, above/below thresholds with hysteresis, or the default 'equals on'. """
+    __slots__ = ("_key", "_test")
+
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, config: Union[Mapping[str, Any], None] = None):
+        config = config or {}
+        self._key = hashlib.blake2s(repr(sorted(config.items())).encode(), digest_size=4).hexdigest() if config else None
+        self._test = self._compile(config)
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def key(self) -> Union[str, None]:
+        """ Gets a short hash identifying the configuration (returns None for the default predicate). """
+        return self._key
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def __call__(self, state: Union[State, None], is_on: bool) -> bool:
+        """ Evaluates the predicate for a state (the previous result is used to apply the hysteresis). """
+        return state is not None and self._test(state, is_on)
+
+    def signal(self, entity_id: str) -> str:
+        """ Gets the signal of an entity evaluated by this predicate (the entity id itself for the default predicate). """
+        return entity_id if self._key is None else f"{entity_id}{SIGNAL_SEPARATOR}{self._key}"
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    @staticmethod
+    def _compile(config: Mapping[str, Any]) -> Callable[[State, bool], bool]:
+        """ Builds the test function, resolving the configuration once. """
+        attribute = config.get(CONF_ATTRIBUTE)
+        states = frozenset(str(value) for value in config[CONF_STATE]) if CONF_STATE in config else None
+        above = config.get(CONF_ABOVE)
+        below = config.get(CONF_BELOW)
+        hysteresis = config.get(CONF_HYSTERESIS, 0)
+        get_value = (lambda state: state.attributes.get(attribute)) if attribute else (lambda state: state.state)
+
+        if states is not None:
+            return lambda state, is_on: str(get_value(state)) in states
+
+        if above is None and below is None:
+            return lambda state, is_on: (value := get_value(state)) is True or value == STATE_ON
+
+        def test(state: State, is_on: bool) -> bool:
+            try:
+                value = float(get_value(state))
+            except (TypeError, ValueError):
+                return False
+
+            margin = hysteresis if is_on else 0
+            return (above is None or value > above - margin) and (below is None or value < below + margin)
+
+        return test
+
+
+#-----------------------------------------------------------#
+#       Default Predicate
+#-----------------------------------------------------------#
+
+DEFAULT_PREDICATE = TriggerPredicate()
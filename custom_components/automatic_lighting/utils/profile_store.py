@@ -0,0 +1,156 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from __future__ import annotations
+from collections.abc import Mapping
+from sys import intern
+from typing import Any, Callable, Dict, Iterable, Iterator, Tuple
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+INTERN_CACHE_SIZE = 4096
+PROFILE_STORE_SIZE = 256
+
+
+#-----------------------------------------------------------#
+#       Interning
+#-----------------------------------------------------------#
+
+_interned_attributes = {}
+_interned_entity_ids = {}
+
+def intern_attributes(attributes: Dict[str, Any] | None) -> FrozenAttributes:
+    """ Returns a shared, immutable copy of an attribute mapping (identical mappings share one instance). """
+    if isinstance(attributes, FrozenAttributes):
+        return attributes
+
+    frozen = FrozenAttributes(attributes or {})
+    return _intern(_interned_attributes, frozen)
+
+def intern_entity_ids(entity_ids: Iterable[str] | None) -> Tuple[str, ...]:
+    """ Returns a shared tuple of interned entity ids (identical lists share one instance). """
+    return _intern(_interned_entity_ids, tuple(intern(entity_id) for entity_id in (entity_ids or [])))
+
+def _intern(cache: Dict[Any, Any], value: Any) -> Any:
+    """ Returns the cached instance equal to the value, caching the value if none exists (the cache is bounded). """
+    result = cache.get(value)
+
+    if result is not None:
+        return result
+
+    if len(cache) >= INTERN_CACHE_SIZE:
+        cache.clear()
+
+    cache[value] = value
+    return value
+
+def _freeze(value: Any) -> Any:
+    """ Converts lists, sets and dicts (recursively) into hashable equivalents. """
+    if isinstance(value, list) or isinstance(value, tuple):
+        return tuple(_freeze(item) for item in value)
+
+    if isinstance(value, set) or isinstance(value, frozenset):
+        return frozenset(_freeze(item) for item in value)
+
+    if isinstance(value, dict):
+        return FrozenAttributes(value)
+
+    return value
+
+
+#-----------------------------------------------------------#
+#       Class - FrozenAttributes
+#-----------------------------------------------------------#
+
+class FrozenAttributes(Mapping):
+    """ An immutable, hashable mapping of light attributes. """
+    __slots__ = ("_data", "_hash")
+
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, data: Dict[str, Any]):
+        self._data = { intern(key): _freeze(value) for key, value in data.items() }
+        self._hash = hash(frozenset(self._data.items()))
+
+
+    #--------------------------------------------#
+    #       Mapping Methods
+    #--------------------------------------------#
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+
+        if isinstance(other, FrozenAttributes):
+            return self._hash == other._hash and self._data == other._data
+
+        return Mapping.__eq__(self, other)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return repr(self._data)
+
+
+#-----------------------------------------------------------#
+#       Class - ProfileStore
+#-----------------------------------------------------------#
+
+class ProfileStore():
+    """ A bounded store that returns the existing record when a profile with identical content is created again. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, max_size: int = PROFILE_STORE_SIZE):
+        self._max_size = max_size
+        self._records = {}
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def size(self) -> int:
+        """ Gets the number of stored records. """
+        return len(self._records)
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def clear(self) -> None:
+        """ Removes all records. """
+        self._records.clear()
+
+    def get(self, factory: Callable[..., Any], *fields: Any) -> Any:
+        """ Returns the record created from the (hashable) fields, creating it with the factory if it does not exist. """
+        key = (factory, *fields)
+        record = self._records.get(key)
+
+        if record is not None:
+            return record
+
+        if len(self._records) >= self._max_size:
+            self._records.clear()
+
+        record = self._records[key] = factory(*fields)
+        return record
@@ -0,0 +1,152 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from __future__ import annotations
+from ..const import RECORD_TYPE_SESSION
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Dict, Iterator, List
+import json
+import os
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+FLUSH_SIZE = 100
+MAX_LOG_SIZE = 10 * 1024 * 1024
+RECORD_KEY_DATA = "d"
+RECORD_KEY_TIME = "t"
+RECORD_KEY_TYPE = "e"
+TIME_PRECISION = 3
+
+
+#-----------------------------------------------------------#
+#       Functions
+#-----------------------------------------------------------#
+
+def load_records(path: str) -> Iterator[Dict[str, Any]]:
+    """ Reads the records of a JSONL event log. """
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+#-----------------------------------------------------------#
+#       Class - EventRecorder
+#-----------------------------------------------------------#
+
+class EventRecorder():
+    """ A class that records the inputs and outputs of a zone to a compact JSONL log (or to memory if no path is given). Each session starts a new log (the previous one is kept as '<path>.1') and recording stops once the log reaches its maximum size. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, hass: HomeAssistant | None = None, path: str | None = None, time_source: Callable[[], float] | None = None, max_size: int = MAX_LOG_SIZE):
+        self._buffer = []
+        self._hass = hass
+        self._is_full = False
+        self._lock = Lock()
+        self._max_size = max_size
+        self._path = path
+        self._records = []
+        self._rotated = False
+        self._size = 0
+        self._start = None
+        self._time_source = time_source or monotonic
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def is_full(self) -> bool:
+        """ Gets a boolean indicating whether the log has reached its maximum size (later records are dropped). """
+        return self._is_full
+
+    @property
+    def path(self) -> str | None:
+        """ Gets the path of the log file. """
+        return self._path
+
+    @property
+    def records(self) -> List[Dict[str, Any]]:
+        """ Gets the records kept in memory (only used when no path is given). """
+        return self._records
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def record(self, record_type: str, **data: Any) -> None:
+        """ Records an entry with the time elapsed since the start of the session (the first record of a session holds its wall clock start time). """
+        if self._is_full:
+            return
+
+        now = self._time_source()
+
+        if self._start is None:
+            self._start = now
+            self._add({ RECORD_KEY_TIME: 0.0, RECORD_KEY_TYPE: RECORD_TYPE_SESSION, RECORD_KEY_DATA: { "started_at": dt_util.now().isoformat() } })
+
+        self._add({ RECORD_KEY_TIME: round(now - self._start, TIME_PRECISION), RECORD_KEY_TYPE: record_type, RECORD_KEY_DATA: data })
+
+        if self._path is None:
+            return
+
+        if len(self._buffer) >= FLUSH_SIZE and self._hass is not None:
+            self._hass.async_add_executor_job(self.flush, self._take_buffer())
+
+    async def async_flush(self) -> None:
+        """ Writes the buffered records to the log file. """
+        if self._path is None or len(self._buffer) == 0:
+            return
+
+        if self._hass is None:
+            return self.flush(self._take_buffer())
+
+        await self._hass.async_add_executor_job(self.flush, self._take_buffer())
+
+    def flush(self, lines: List[str]) -> None:
+        """ Appends lines to the log file (blocking); the first flush of a session moves the log of the previous session aside and the lines beyond the maximum size are dropped. """
+        with self._lock:
+            if not self._rotated:
+                self._rotated = True
+                os.path.exists(self._path) and os.replace(self._path, f"{self._path}.1")
+
+            text = []
+
+            for line in lines:
+                if self._size + len(line) + 1 > self._max_size:
+                    self._is_full = True
+                    break
+
+                self._size += len(line) + 1
+                text.append(f"{line}\n")
+
+            with open(self._path, "a", encoding="utf-8") as file:
+                file.write("".join(text))
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _add(self, entry: Dict[str, Any]) -> None:
+        """ Adds an entry to the memory records or to the write buffer. """
+        if self._path is None:
+            return self._records.append(entry)
+
+        self._buffer.append(json.dumps(entry, separators=(",", ":"), default=str))
+
+    def _take_buffer(self) -> List[str]:
+        """ Empties the buffer and returns its lines. """
+        lines, self._buffer = self._buffer, []
+        return lines
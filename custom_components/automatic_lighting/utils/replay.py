@@ -0,0 +1,201 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from __future__ import annotations
+from ..const import RECORD_TYPE_COMMAND, RECORD_TYPE_EVENT, RECORD_TYPE_SESSION, RECORD_TYPE_TIMER
+from .recorder import EventRecorder, load_records, RECORD_KEY_DATA, RECORD_KEY_TIME, RECORD_KEY_TYPE
+from datetime import datetime, timedelta
+from heapq import heappop, heappush
+from itertools import chain
+from inspect import isawaitable
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+import json
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+OUTPUT_RECORD_TYPES = [RECORD_TYPE_COMMAND, RECORD_TYPE_EVENT]
+
+
+#-----------------------------------------------------------#
+#       Class - VirtualClock
+#-----------------------------------------------------------#
+
+class VirtualClock():
+    """ A clock that replaces the Home Assistant scheduler, executing scheduled actions as time is advanced manually. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, start: datetime | None = None):
+        self._queue = []
+        self._sequence = 0
+        self._start = start or datetime.now().astimezone()
+        self._time = 0.0
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def pending(self) -> int:
+        """ Gets the number of scheduled actions that have not been cancelled. """
+        return len([handle for handle in self._queue if not handle[3]])
+
+    @property
+    def time(self) -> float:
+        """ Gets the number of seconds elapsed on the clock. """
+        return self._time
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def call_later(self, delay: float, action: Callable) -> Callable[[], None]:
+        """ Schedules an action to be executed after a delay and returns a callable that cancels it. """
+        handle = [self._time + (delay or 0), self._sequence, action, False]
+        self._sequence += 1
+        heappush(self._queue, handle)
+
+        def cancel() -> None:
+            handle[3] = True
+
+        return cancel
+
+    def now(self) -> datetime:
+        """ Gets the current time of the clock. """
+        return self._start + timedelta(seconds=self._time)
+
+    async def async_advance_to(self, time: float) -> None:
+        """ Advances the clock, executing the actions that are due on the way. """
+        while self._queue and self._queue[0][0] <= time:
+            when, _, action, cancelled = heappop(self._queue)
+
+            if cancelled:
+                continue
+
+            self._time = max(self._time, when)
+            result = action(self.now())
+
+            if isawaitable(result):
+                await result
+
+        self._time = max(self._time, time)
+
+
+#-----------------------------------------------------------#
+#       Class - ReplayResult
+#-----------------------------------------------------------#
+
+class ReplayResult():
+    """ A class containing the outcome of a replay. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, expected: List[Tuple[str, Any]], actual: List[Tuple[str, Any]], latencies: List[float], duration: float):
+        self._actual = actual
+        self._duration = duration
+        self._expected = expected
+        self._latencies = latencies
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def actual(self) -> List[Tuple[str, Any]]:
+        """ Gets the commands and events produced during the replay. """
+        return self._actual
+
+    @property
+    def duration(self) -> float:
+        """ Gets the wall clock time (in seconds) that the replay took. """
+        return self._duration
+
+    @property
+    def expected(self) -> List[Tuple[str, Any]]:
+        """ Gets the commands and events found in the log. """
+        return self._expected
+
+    @property
+    def is_identical(self) -> bool:
+        """ Gets a boolean indicating whether the replay produced the same decisions as the log. """
+        return self._expected == self._actual
+
+    @property
+    def latencies(self) -> List[float]:
+        """ Gets the decision latency (in seconds) of each replayed input. """
+        return self._latencies
+
+    @property
+    def max_latency(self) -> float:
+        """ Gets the highest decision latency (in seconds). """
+        return max(self._latencies, default=0.0)
+
+    @property
+    def mean_latency(self) -> float:
+        """ Gets the mean decision latency (in seconds). """
+        return sum(self._latencies) / len(self._latencies) if self._latencies else 0.0
+
+
+#-----------------------------------------------------------#
+#       Functions
+#-----------------------------------------------------------#
+
+async def async_replay(entity: Any, records: Iterable[Dict[str, Any]]) -> ReplayResult:
+    """ Feeds recorded inputs into an entity running on a virtual clock and compares the decisions with the recorded ones. The entity should be a fresh instance of the zone (its listeners are not set up and its state is not written while replaying); its clock and recorder are restored afterwards. """
+    records = iter(records)
+    first = next(records, None)
+    session = first if first is not None and first[RECORD_KEY_TYPE] == RECORD_TYPE_SESSION else None
+    clock = VirtualClock(datetime.fromisoformat(session[RECORD_KEY_DATA]["started_at"]) if session else None)
+    recorder = EventRecorder(time_source=lambda: clock.time)
+    expected = []
+    latencies = []
+    started_at = perf_counter()
+    previous_clock, previous_recorder = entity.clock, entity.recorder
+
+    entity.set_clock(clock)
+    entity.set_recorder(recorder)
+
+    try:
+        for record in (records if session or first is None else chain([first], records)):
+            await clock.async_advance_to(record[RECORD_KEY_TIME])
+
+            if record[RECORD_KEY_TYPE] in OUTPUT_RECORD_TYPES:
+                expected.append(_normalize(record))
+                continue
+
+            if record[RECORD_KEY_TYPE] in (RECORD_TYPE_SESSION, RECORD_TYPE_TIMER):
+                continue
+
+            start = perf_counter()
+            await entity.async_dispatch_record(record[RECORD_KEY_TYPE], record[RECORD_KEY_DATA])
+            await clock.async_advance_to(clock.time)
+            latencies.append(perf_counter() - start)
+    finally:
+        entity.set_clock(previous_clock)
+        entity.set_recorder(previous_recorder)
+
+    actual = [_normalize(record) for record in recorder.records if record[RECORD_KEY_TYPE] in OUTPUT_RECORD_TYPES]
+    return ReplayResult(expected, actual, latencies, perf_counter() - started_at)
+
+async def async_replay_file(entity: Any, path: str) -> ReplayResult:
+    """ Replays the event log written by a zone with record_events enabled (see async_replay). """
+    return await async_replay(entity, await entity.hass.async_add_executor_job(lambda: list(load_records(path))))
+
+
+#-----------------------------------------------------------#
+#       Helpers
+#-----------------------------------------------------------#
+
+def _normalize(record: Dict[str, Any]) -> Tuple[str, Any]:
+    """ Normalizes a record so that in-memory and deserialized records can be compared. """
+    return (record[RECORD_KEY_TYPE], json.loads(json.dumps(record[RECORD_KEY_DATA], default=str, sort_keys=True)))
@@ -0,0 +1,148 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from __future__ import annotations
+from heapq import heappop, heappush
+from inspect import isawaitable
+from homeassistant.const import EVENT_HOMEASSISTANT_START
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_call_later
+from logging import Logger
+from time import monotonic
+from typing import Any, Callable, Dict
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+READY_TIMEOUT = 10
+
+
+#-----------------------------------------------------------#
+#       Class - StartupScheduler
+#-----------------------------------------------------------#
+
+class StartupScheduler():
+    """ Admits zones at startup in priority order, spaced by an interval and capped to a number of concurrently starting zones. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, hass: HomeAssistant, logger: Logger, concurrency: int, interval: float):
+        self._admit_timer = None
+        self._concurrency = max(1, concurrency)
+        self._hass = hass
+        self._interval = interval
+        self._logger = logger
+        self._pending = []
+        self._queued_at = {}
+        self._ready_times = {}
+        self._remove_start_listener = None
+        self._running = {}
+        self._sequence = 0
+        self._started = False
+        self._timed_out = {}
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def ready_times(self) -> Dict[str, float]:
+        """ Gets the time (in seconds) from being queued to being ready of each zone (zones that timed out are not included). """
+        return self._ready_times
+
+    @property
+    def timed_out(self) -> Dict[str, float]:
+        """ Gets the time (in seconds) from being queued to timing out of each zone that did not report ready in time. """
+        return self._timed_out
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def admit(self, zone_id: str, priority: int, action: Callable[[], Any]) -> None:
+        """ Queues a zone for startup (zones with a lower priority value are started first). """
+        self.cancel(zone_id)
+        self._queued_at[zone_id] = monotonic()
+        heappush(self._pending, (priority, self._sequence, zone_id, action))
+        self._sequence += 1
+
+        if self._started:
+            return self._schedule_next()
+
+        if self._hass.is_running:
+            return self._start()
+
+        if self._remove_start_listener is None:
+            self._remove_start_listener = self._hass.bus.async_listen_once(EVENT_HOMEASSISTANT_START, self._start)
+
+    def cancel(self, zone_id: str) -> None:
+        """ Removes a zone from the queue and releases its slot, if it is starting. """
+        self._pending = [entry for entry in self._pending if entry[2] != zone_id]
+        self._pending.sort()
+        remove_timeout = self._running.pop(zone_id, None)
+
+        if remove_timeout:
+            remove_timeout()
+            self._schedule_next()
+
+    def ready(self, zone_id: str) -> None:
+        """ Marks a zone as ready, releasing its slot for the next zone. """
+        remove_timeout = self._running.pop(zone_id, None)
+
+        if remove_timeout is None:
+            return
+
+        remove_timeout()
+        self._ready_times[zone_id] = monotonic() - self._queued_at.pop(zone_id, monotonic())
+        self._logger.debug("Zone %s was ready after %.2f seconds.", zone_id, self._ready_times[zone_id])
+        self._schedule_next()
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _admit_next(self, *args: Any) -> None:
+        """ Starts the next zone in the queue. """
+        self._admit_timer = None
+
+        if len(self._pending) == 0 or len(self._running) >= self._concurrency:
+            return
+
+        _, _, zone_id, action = heappop(self._pending)
+
+        def on_timeout(*args: Any) -> None:
+            self._logger.debug("Zone %s did not report ready within %s seconds.", zone_id, READY_TIMEOUT)
+            self._running.pop(zone_id, None)
+            self._timed_out[zone_id] = monotonic() - self._queued_at.pop(zone_id, monotonic())
+            self._schedule_next()
+
+        self._running[zone_id] = async_call_later(self._hass, READY_TIMEOUT, on_timeout)
+        result = action()
+
+        if isawaitable(result):
+            self._hass.async_create_task(result)
+
+        self._schedule_next()
+
+    def _schedule_next(self) -> None:
+        """ Schedules the admission of the next zone, if a slot is free. """
+        if not self._started or self._admit_timer is not None:
+            return
+
+        if len(self._pending) == 0 or len(self._running) >= self._concurrency:
+            return
+
+        self._admit_timer = async_call_later(self._hass, self._interval, self._admit_next)
+
+    def _start(self, *args: Any) -> None:
+        """ Starts admitting zones. """
+        self._remove_start_listener = None
+        self._started = True
+        self._schedule_next()
@@ -17,8 +17,9 @@ class Timer():
     #       Constructor
     #--------------------------------------------#
 
-    def __init__(self, hass: HomeAssistant, delay: Union[int, None], action: Callable, start: bool = True):
+    def __init__(self, hass: HomeAssistant, delay: Union[int, None], action: Callable, start: bool = True, call_later: Union[Callable, None] = None):
         self._action = action
+        self._call_later = call_later
         self._delay = delay
         self._hass = hass
         self._remove_listener = None
@@ -53,7 +54,7 @@ class Timer():
         if self.is_running or self._delay is None:
             return
         self._remove_listener and self._remove_listener()
-        self._remove_listener = async_call_later(self._hass, self._delay, self._on_timer_finished)
+        self._remove_listener = self._call_later(self._delay, self._on_timer_finished) if self._call_later else async_call_later(self._hass, self._delay, self._on_timer_finished)
 
     def restart(self) -> None:
         """ Restarts the timer. """
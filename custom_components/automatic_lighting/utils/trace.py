@@ -0,0 +1,91 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from collections import deque
+from datetime import datetime, timedelta
+from time import monotonic
+from typing import Any, Dict, List
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+TRACE_SIZE = 200
+
+
+#-----------------------------------------------------------#
+#       Class - TraceBuffer
+#-----------------------------------------------------------#
+
+class TraceBuffer():
+    """ A fixed-size ring buffer of structured decision records, which are only formatted when read. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, size: int = TRACE_SIZE):
+        self._records = deque(maxlen=size)
+        self._started_at = (datetime.now(), monotonic())
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def size(self) -> int:
+        """ Gets the number of records in the buffer. """
+        return len(self._records)
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def add(self, event: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """ Adds a record and returns its data as a shallow snapshot (top level lists and sets become tuples, dicts are copied one level deep); nested values are only copied when the records are formatted. """
+        data = { key: self._snapshot(value) for key, value in data.items() }
+        self._records.append((monotonic(), event, data))
+        return data
+
+    def as_list(self) -> List[Dict[str, Any]]:
+        """ Formats the records, oldest first. """
+        started_at, started_at_monotonic = self._started_at
+        return [{ "time": (started_at + timedelta(seconds=time - started_at_monotonic)).isoformat(), "event": event, **{ key: self._format(value) for key, value in data.items() } } for time, event, data in self._records]
+
+    def clear(self) -> None:
+        """ Removes all records. """
+        self._records.clear()
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _snapshot(self, value: Any) -> Any:
+        """ Takes a shallow immutable snapshot of a container (lists become tuples, sets become tuples in sorted order, dicts are copied); other values are returned as is. """
+        if isinstance(value, list):
+            return tuple(value)
+
+        if isinstance(value, (set, frozenset)):
+            return tuple(sorted(value, key=str))
+
+        if isinstance(value, dict):
+            return dict(value)
+
+        return value
+
+    def _format(self, value: Any) -> Any:
+        """ Converts a value into a JSON friendly representation. """
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return [self._format(item) for item in value]
+
+        if isinstance(value, dict) or hasattr(value, "items"):
+            return { str(key): self._format(item) for key, item in value.items() }
+
+        if isinstance(value, (bool, int, float, str)) or value is None:
+            return value
+
+        return str(value)
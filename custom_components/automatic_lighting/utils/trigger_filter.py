@@ -0,0 +1,97 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from functools import partial
+from homeassistant.const import STATE_ON
+from typing import Any, Awaitable, Callable, Dict, Tuple, Union
+
+
+#-----------------------------------------------------------#
+#       Class - TriggerFilter
+#-----------------------------------------------------------#
+
+class TriggerFilter():
+    """ Debounces trigger state changes: 'on' is only passed on after holding for the on-debounce window, any other state after holding for the off-hold window. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, call_later: Callable[[float, Callable], Callable[[], None]], action: Callable[[str, str], Awaitable[None]]):
+        self._action = action
+        self._call_later = call_later
+        self._pending = {}
+        self._states = {}
+        self._suppressed = 0
+        self._windows = {}
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def pending(self) -> int:
+        """ Gets the number of triggers waiting for their window to pass. """
+        return len(self._pending)
+
+    @property
+    def suppressed(self) -> int:
+        """ Gets the number of state changes that were dropped because they flapped back within their window. """
+        return self._suppressed
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def cancel(self) -> None:
+        """ Cancels the pending windows and forgets the filtered states. """
+        while self._pending:
+            self._pending.popitem()[1]()
+
+        self._states = {}
+
+    def is_on(self, entity_id: str) -> bool:
+        """ Determines whether the filtered state of the trigger is on. """
+        return self._states.get(entity_id) == STATE_ON
+
+    def setup(self, windows: Dict[str, Tuple[float, float]], states: Dict[str, Union[str, None]]) -> None:
+        """ Sets the (on-debounce, off-hold) windows per trigger and seeds the filtered states with the current states. """
+        self.cancel()
+        self._states = dict(states)
+        self._windows = windows
+
+    async def async_process(self, entity_id: str, state: str) -> None:
+        """ Processes a raw state change of a trigger. """
+        cancel = self._pending.pop(entity_id, None)
+
+        if cancel is not None:
+            cancel()
+            self._suppressed += 1
+
+        if state == self._states.get(entity_id):
+            return
+
+        on_debounce, off_hold = self._windows.get(entity_id, (0, 0))
+        window = on_debounce if state == STATE_ON else off_hold
+
+        if not window:
+            return await self._apply(entity_id, state)
+
+        self._pending[entity_id] = self._call_later(window, partial(self._async_on_window_finished, entity_id, state))
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    async def _apply(self, entity_id: str, state: str) -> None:
+        """ Updates the filtered state and passes the change on. """
+        self._states[entity_id] = state
+        await self._action(entity_id, state)
+
+    async def _async_on_window_finished(self, entity_id: str, state: str, *args: Any) -> None:
+        """ Triggered when a state has held for its whole window. """
+        self._pending.pop(entity_id, None)
+        await self._apply(entity_id, state)
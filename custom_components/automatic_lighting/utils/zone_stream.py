@@ -0,0 +1,105 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterable, Mapping, Union
+
+
+#-----------------------------------------------------------#
+#       Class - ZoneStream
+#-----------------------------------------------------------#
+
+class ZoneStream():
+    """ Keeps the last published state of every zone and streams the changed keys to the subscribers, merging the deltas published within one loop iteration into a single message. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, call_soon: Callable[[Callable], Any]):
+        self._call_soon = call_soon
+        self._handle = None
+        self._messages = 0
+        self._pending = {}
+        self._published = 0
+        self._states = {}
+        self._subscribers = {}
+        self._suppressed = 0
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """ Gets a dict containing the stream statistics (exposed through diagnostics). """
+        return { "zones": len(self._states), "subscribers": len(self._subscribers), "published": self._published, "suppressed": self._suppressed, "messages": self._messages }
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def publish(self, entity_id: str, state: Mapping[str, Any]) -> None:
+        """ Publishes the state of a zone; only the keys that changed since the previous state are streamed. """
+        previous = self._states.get(entity_id, {})
+        delta = { key: value for key, value in state.items() if key not in previous or previous[key] != value }
+
+        if len(delta) == 0:
+            self._suppressed += 1
+            return
+
+        self._states[entity_id] = dict(state)
+        self._published += 1
+        len(self._subscribers) > 0 and self._enqueue(entity_id, delta)
+
+    def remove(self, entity_id: str) -> None:
+        """ Forgets a zone (streamed as None to the subscribers). """
+        self._states.pop(entity_id, None) is not None and len(self._subscribers) > 0 and self._enqueue(entity_id, None)
+
+    def snapshot(self, entity_ids: Union[Iterable[str], None] = None) -> Dict[str, Dict[str, Any]]:
+        """ Gets the full state of the zones (all zones if no entity ids are given). """
+        return { entity_id: dict(state) for entity_id, state in self._states.items() if entity_ids is None or entity_id in entity_ids }
+
+    def subscribe(self, entity_ids: Union[Iterable[str], None], send: Callable[[Dict[str, Any]], None]) -> Callable[[], None]:
+        """ Subscribes to the deltas of the zones (all zones if no entity ids are given) and returns a callable that unsubscribes. """
+        key = object()
+        self._subscribers[key] = (frozenset(entity_ids) if entity_ids is not None else None, send)
+
+        def unsubscribe() -> None:
+            self._subscribers.pop(key, None)
+            len(self._subscribers) == 0 and self._cancel()
+
+        return unsubscribe
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _cancel(self) -> None:
+        """ Drops the pending deltas. """
+        self._handle and self._handle.cancel()
+        self._handle = None
+        self._pending = {}
+
+    def _enqueue(self, entity_id: str, delta: Union[Dict[str, Any], None]) -> None:
+        """ Merges a delta into the pending deltas of the zone and schedules the flush. """
+        pending = self._pending.get(entity_id)
+        self._pending[entity_id] = { **pending, **delta } if pending is not None and delta is not None else delta
+
+        if self._handle is None:
+            self._handle = self._call_soon(self._flush)
+
+    def _flush(self) -> None:
+        """ Sends the pending deltas to the subscribers, each receiving only the zones it subscribed to. """
+        pending, self._pending = self._pending, {}
+        self._handle = None
+
+        for entity_ids, send in list(self._subscribers.values()):
+            zones = pending if entity_ids is None else { entity_id: delta for entity_id, delta in pending.items() if entity_id in entity_ids }
+
+            if len(zones) > 0:
+                self._messages += 1
+                send(zones)
@@ -0,0 +1,51 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from .const import DATA_ZONE_STREAM, DOMAIN
+from homeassistant.components import websocket_api
+from homeassistant.const import CONF_ENTITY_ID
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from typing import Any, Dict
+import voluptuous as vol
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+ATTR_ZONES = "zones"
+WS_TYPE_SUBSCRIBE = f"{DOMAIN}/subscribe"
+
+
+#-----------------------------------------------------------#
+#       Setup
+#-----------------------------------------------------------#
+
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """ Registers the websocket commands. """
+    websocket_api.async_register_command(hass, websocket_subscribe)
+
+
+#-----------------------------------------------------------#
+#       Commands
+#-----------------------------------------------------------#
+
+@websocket_api.websocket_command({
+    vol.Required("type"): WS_TYPE_SUBSCRIBE,
+    vol.Optional(CONF_ENTITY_ID): cv.entity_ids
+})
+@callback
+def websocket_subscribe(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: Dict[str, Any]) -> None:
+    """ Subscribes to the state deltas of the zones (all zones if no entity ids are given); the first event contains the full state of the zones. """
+    stream = hass.data[DATA_ZONE_STREAM]
+    entity_ids = msg.get(CONF_ENTITY_ID)
+
+    @callback
+    def send(zones: Dict[str, Any]) -> None:
+        connection.send_message(websocket_api.event_message(msg["id"], { ATTR_ZONES: zones }))
+
+    connection.subscriptions[msg["id"]] = stream.subscribe(entity_ids, send)
+    connection.send_result(msg["id"])
+    send(stream.snapshot(entity_ids))
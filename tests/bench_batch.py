@@ -0,0 +1,62 @@
+""" Benchmarks selecting the first valid profile per zone: one is_profile_valid call per profile and the batch pass.
+
+Usage: python tests/bench_batch.py [zones ...]
+"""
+from __future__ import annotations
+from datetime import time
+from importlib.util import module_from_spec, spec_from_file_location
+from timeit import repeat
+from typing import Any, NamedTuple, Tuple, Union
+import os
+import random
+import sys
+
+
+def load_batch() -> Any:
+    """ Loads batch.py without importing the integration package (which requires Home Assistant). """
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "custom_components", "automatic_lighting", "batch.py")
+    spec = spec_from_file_location("automatic_lighting_batch", path)
+    module = module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+batch = load_batch()
+
+
+class Profile(NamedTuple):
+    time_after: Union[time, None]
+    time_before: Union[time, None]
+    illuminance_entity: Union[str, None]
+    illuminance_threshold: Union[float, None]
+    is_constrained: bool = False
+    is_triggered: bool = False
+    trigger_entities: Union[Tuple[str, ...], None] = None
+
+def create_groups(zones: int, generator: random.Random) -> list:
+    """ Creates an active and an idle group of profiles per zone (the idle profiles cover the day in time windows). """
+    groups = []
+
+    for zone in range(zones):
+        groups.append([Profile(None, None, f"sensor.lux_{zone}", 50, is_triggered=generator.random() < 0.5, trigger_entities=("binary_sensor.motion",))])
+        groups.append([Profile(time(hour), time((hour + 6) % 24), f"sensor.lux_{zone}" if generator.random() < 0.5 else None, 100) for hour in (6, 12, 18, 0)])
+
+    return groups
+
+def main(zone_counts: list) -> None:
+    generator = random.Random(1)
+    now = time(19, 30)
+    print(f"{'zones':>6} {'is_profile_valid':>17} {'batch':>10}  (ms per evaluation)")
+
+    for zones in zone_counts:
+        groups = create_groups(zones, generator)
+        illuminance = { f"sensor.lux_{zone}": str(generator.randrange(200)) for zone in range(zones) }
+        per_profile = lambda: [next((profile for profile in group if batch.is_profile_valid(profile, batch.get_seconds(now), illuminance)), None) for group in groups]
+        batched = lambda: batch.select_first_valid(groups, now, illuminance)
+        assert per_profile() == batched(), "the batch pass diverged"
+        timings = [min(repeat(action, number=20, repeat=5)) / 20 * 1000 for action in (per_profile, batched)]
+        print(f"{zones:>6} {timings[0]:>17.3f} {timings[1]:>10.3f}")
+
+
+if __name__ == "__main__":
+    main([int(value) for value in sys.argv[1:]] or [10, 100, 1000])
@@ -0,0 +1,93 @@
+""" Helpers shared by the tests that need Home Assistant (an instance that is created but never started). """
+from __future__ import annotations
+from custom_components.automatic_lighting import async_setup
+from custom_components.automatic_lighting.const import CONF_STARTUP_INTERVAL, DOMAIN
+from custom_components.automatic_lighting.switch import START_DELAY
+from custom_components.automatic_lighting.utils import EventRecorder, VirtualClock
+from homeassistant.config_entries import ConfigEntries, ConfigEntry
+from homeassistant.const import EVENT_HOMEASSISTANT_START
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import area_registry, device_registry, entity_registry
+from homeassistant.setup import async_setup_component
+from typing import Any, Dict, List, Tuple
+import asyncio
+import json
+import os
+
+COMPONENT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "custom_components", DOMAIN)
+
+
+async def async_create_hass(config_dir: str) -> HomeAssistant:
+    """ Creates a Home Assistant instance with the integration's shared objects set up. """
+    try:
+        hass = HomeAssistant(config_dir)
+    except TypeError:
+        hass = HomeAssistant()
+        hass.config.config_dir = config_dir
+
+    await async_setup(hass, {})
+    return hass
+
+async def async_load_integration(config_dir: str, config_entry: ConfigEntry) -> HomeAssistant:
+    """ Creates a Home Assistant instance that loads the integration from its custom_components folder and sets up a config entry through both platforms. """
+    os.makedirs(os.path.join(config_dir, "custom_components"), exist_ok=True)
+    os.path.exists(link := os.path.join(config_dir, "custom_components", DOMAIN)) or os.symlink(COMPONENT_PATH, link)
+
+    try:
+        hass = HomeAssistant(config_dir)
+    except TypeError:
+        hass = HomeAssistant()
+        hass.config.config_dir = config_dir
+
+    hass.config.skip_pip = True
+    hass.config.components.update(["automation", "http", "websocket_api"])
+    hass.data["entity_info"] = {}
+    await area_registry.async_load(hass)
+    await device_registry.async_load(hass)
+    await entity_registry.async_load(hass)
+    hass.config_entries = ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    await async_setup_component(hass, DOMAIN, { DOMAIN: { CONF_STARTUP_INTERVAL: 0 } })
+    await hass.config_entries.async_add(config_entry)
+    await hass.async_block_till_done()
+    return hass
+
+async def async_start_zones(hass: HomeAssistant) -> None:
+    """ Fires the start event and waits until the zones have been admitted and have loaded their profiles. """
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_START)
+    await hass.async_block_till_done()
+    await asyncio.sleep(START_DELAY + 0.1)
+    await hass.async_block_till_done()
+
+def create_config_entry(name: str = "Hallway", options: Dict[str, Any] | None = None) -> ConfigEntry:
+    """ Creates a config entry of a zone. """
+    return ConfigEntry(version=1, domain=DOMAIN, title=name, data={ "name": name }, source="user", options=options or {}, unique_id=name)
+
+def create_entity(hass: HomeAssistant, entity_class: type, entity_id: str, config_entry: ConfigEntry) -> Any:
+    """ Creates a zone entity that is attached to Home Assistant without being added to a platform. """
+    entity = entity_class(config_entry)
+    entity.hass = hass
+    entity.entity_id = entity_id
+    return entity
+
+def run(coroutine: Any) -> Any:
+    """ Runs a coroutine in a new event loop. """
+    return asyncio.run(coroutine)
+
+def to_log(recorder: EventRecorder) -> List[Dict[str, Any]]:
+    """ Serializes the in-memory records like the JSONL log does. """
+    return [json.loads(json.dumps(record, default=str)) for record in recorder.records]
+
+async def async_record(entity: Any, session: List[Tuple[float, Any]]) -> List[Dict[str, Any]]:
+    """ Runs a session (a list of times and actions) against an entity on a virtual clock and returns its event log. """
+    clock = VirtualClock()
+    recorder = EventRecorder(time_source=lambda: clock.time)
+    entity.set_clock(clock)
+    entity.set_recorder(recorder)
+
+    for time, action in session:
+        await clock.async_advance_to(time)
+        action is not None and await action()
+        await clock.async_advance_to(time)
+
+    return to_log(recorder)
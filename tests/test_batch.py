@@ -0,0 +1,66 @@
+""" Tests that the batch evaluation selects the same profiles as the profiles themselves. """
+from __future__ import annotations
+from datetime import time
+import random
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from .common import async_create_hass, run
+from custom_components.automatic_lighting.batch import select_first_valid
+from custom_components.automatic_lighting.switch import AL_Profile, get_illuminance_states
+
+ILLUMINANCE_ENTITIES = ["sensor.lux_a", "sensor.lux_b", "sensor.missing"]
+ILLUMINANCE_STATES = ["0", "50", "50.0", "120", "unknown", "unavailable", "dark"]
+TIMES = [None, time(0, 0), time(6, 30), time(12, 0), time(18, 0, 0, 500000), time(22, 0), time(23, 59, 59, 999999)]
+TRIGGERS = ["binary_sensor.a", "binary_sensor.b"]
+
+
+def create_profile(hass, generator: random.Random, index: int, is_trigger_on) -> AL_Profile:
+    """ Creates a profile with random conditions (time windows may span midnight, thresholds may be missing). """
+    conditions = {}
+    after, before = generator.choice(TIMES), generator.choice(TIMES)
+    after and conditions.update(time_after=after.isoformat())
+    before and conditions.update(time_before=before.isoformat())
+
+    if generator.random() < 0.5:
+        conditions.update(illuminance_entity=generator.choice(ILLUMINANCE_ENTITIES), illuminance_threshold=generator.choice([None, 10, 50, "100"]))
+
+    triggers = generator.sample(TRIGGERS, generator.randrange(1, 3)) if generator.random() < 0.3 else None
+    profile = AL_Profile(hass, f"profile_{index}", ("light.a",), {}, triggers, None, conditions, is_trigger_on)
+    profile.set_constrain(generator.random() < 0.1)
+    return profile
+
+def test_batch_selection_matches_profiles(tmp_path):
+    async def test():
+        hass = await async_create_hass(str(tmp_path))
+        generator = random.Random(1)
+        mismatches = []
+
+        for layout in range(200):
+            for entity_id in ILLUMINANCE_ENTITIES[:-1]:
+                hass.states.async_set(entity_id, generator.choice(ILLUMINANCE_STATES))
+
+            triggered = set(generator.sample(TRIGGERS, generator.randrange(3)))
+            groups = [[create_profile(hass, generator, index, triggered.__contains__) for index in range(generator.randrange(5))] for _ in range(generator.randrange(1, 6))]
+            illuminance = get_illuminance_states(hass, [profile for group in groups for profile in group])
+
+            for now in [time(generator.randrange(24), generator.randrange(60), generator.randrange(60)), *(value for value in TIMES if value is not None)]:
+                expected = [next((profile for profile in group if profile.is_valid(now)), None) for group in groups]
+                select_first_valid(groups, now, illuminance) != expected and mismatches.append((layout, now))
+
+        await hass.async_stop(force=True)
+        return mismatches
+
+    assert run(test()) == []
+
+def test_window_ending_at_the_last_second_includes_it(tmp_path):
+    async def test():
+        hass = await async_create_hass(str(tmp_path))
+        profile = AL_Profile(hass, "ambient", ("light.a",), {}, None, None, { "time_after": "00:00:00", "time_before": "23:59:59" }, None)
+        now = time(23, 59, 59, 500000)
+        result = profile.is_valid(now), select_first_valid([[profile]], now, {}) == [profile]
+        await hass.async_stop(force=True)
+        return result
+
+    assert run(test()) == (True, True)
@@ -0,0 +1,77 @@
+""" Tests the options flow. """
+from __future__ import annotations
+import asyncio
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from .common import async_create_hass, create_config_entry
+from custom_components.automatic_lighting.config_flow import AL_OptionsFlow
+from custom_components.automatic_lighting.const import CONF_AREA_ID, CONF_BLOCK_DURATION, CONF_COMPACT_ATTRIBUTES, CONF_DEVICE_ID, CONF_EDIT_LIGHT_GROUPS, CONF_ILLUMINANCE_ENTITY, CONF_LIGHT_GROUPS, CONF_LIGHTS, CONF_NEW_PROFILE, CONF_PROFILES, CONF_RECORD_EVENTS, CONF_STARTUP_PRIORITY, CONF_TIME_AFTER, CONF_TIME_BEFORE, CONF_TRIGGERS
+from homeassistant.const import CONF_NAME
+from homeassistant.helpers import area_registry, device_registry, entity_registry
+import voluptuous as vol
+
+
+def test_unfiltered_light_group_members_share_one_list(tmp_path):
+    async def test():
+        hass = await async_create_hass(str(tmp_path))
+
+        for index in range(50):
+            hass.states.async_set(f"light.l{index}", "off")
+
+        flow = AL_OptionsFlow(create_config_entry(options={ CONF_LIGHT_GROUPS: { "light.g1": ["light.l1"] } }))
+        flow.hass = hass
+        flow._edited_light_groups = ["light.g1", "light.g2"]
+        form = await flow.async_step_light_group_members()
+        fields = { str(key): len(validator.options) for key, validator in form["data_schema"].schema.items() }
+        result = await flow.async_step_light_group_members({ "light.g1": [], "light.g2": [], CONF_LIGHTS: ["light.l2", "light.g2"] })
+        await hass.async_stop(force=True)
+        return fields, result["data"][CONF_LIGHT_GROUPS]
+
+    fields, light_groups = asyncio.run(test())
+
+    assert fields == { "light.g1": 1, "light.g2": 0, CONF_LIGHTS: 50 }
+    assert light_groups == { "light.g1": ["light.l2", "light.g2"], "light.g2": ["light.l2"] }
+
+def test_profile_without_times_has_no_time_window(tmp_path):
+    async def test():
+        hass = await async_create_hass(str(tmp_path))
+        flow = AL_OptionsFlow(create_config_entry())
+        flow.hass = hass
+        flow._data = { CONF_LIGHT_GROUPS: {}, CONF_PROFILES: {} }
+        form = await flow.async_step_profile()
+        defaults = { str(key): key.default() for key in form["data_schema"].schema if str(key) in (CONF_TIME_AFTER, CONF_TIME_BEFORE) and key.default is not vol.UNDEFINED }
+        result = await flow.async_step_profile({ CONF_NAME: "ambient", CONF_LIGHTS: ["light.a"], CONF_ILLUMINANCE_ENTITY: "", "new": False })
+        await hass.async_stop(force=True)
+        return defaults, result["data"][CONF_PROFILES]["ambient"]
+
+    defaults, profile = asyncio.run(test())
+
+    assert defaults == {}
+    assert CONF_TIME_AFTER not in profile and CONF_TIME_BEFORE not in profile
+
+def test_area_filter_applies_to_the_lights_and_the_sensors(tmp_path):
+    async def test():
+        hass = await async_create_hass(str(tmp_path))
+        await area_registry.async_load(hass)
+        await device_registry.async_load(hass)
+        await entity_registry.async_load(hass)
+        area = area_registry.async_get(hass).async_create("Hallway")
+        entities = entity_registry.async_get(hass)
+
+        for domain in ("binary_sensor", "light", "sensor"):
+            entities.async_update_entity(entities.async_get_or_create(domain, "test", f"{domain}.hallway", suggested_object_id="hallway").entity_id, area_id=area.id)
+            entities.async_get_or_create(domain, "test", f"{domain}.kitchen", suggested_object_id="kitchen")
+
+        flow = AL_OptionsFlow(create_config_entry())
+        flow.hass = hass
+        await flow.async_step_init()
+        form = await flow.async_step_init({ CONF_BLOCK_DURATION: 0, CONF_LIGHT_GROUPS: [], CONF_PROFILES: [], CONF_COMPACT_ATTRIBUTES: False, CONF_RECORD_EVENTS: False, CONF_STARTUP_PRIORITY: 0, CONF_AREA_ID: area.id, CONF_DEVICE_ID: "", CONF_EDIT_LIGHT_GROUPS: False, CONF_NEW_PROFILE: True })
+        options = { str(key): sorted(validator.options) if hasattr(validator, "options") else validator.container for key, validator in form["data_schema"].schema.items() if str(key) in (CONF_LIGHTS, CONF_TRIGGERS, CONF_ILLUMINANCE_ENTITY) }
+        await hass.async_stop(force=True)
+        return options
+
+    options = asyncio.run(test())
+
+    assert options == { CONF_LIGHTS: ["light.hallway"], CONF_TRIGGERS: ["binary_sensor.hallway"], CONF_ILLUMINANCE_ENTITY: ["", "sensor.hallway"] }
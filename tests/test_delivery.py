@@ -0,0 +1,50 @@
+""" Tests the verification of the delivered light commands. """
+from __future__ import annotations
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from .common import run
+from custom_components.automatic_lighting.engine import Command
+from custom_components.automatic_lighting.utils.delivery import DeliveryTracker, VERIFY_DELAY
+from homeassistant.core import State
+
+
+class FakeScheduler():
+    """ Collects the scheduled actions instead of running them. """
+
+    def __init__(self):
+        self.calls = []
+
+    def call_later(self, delay: float, action) -> None:
+        self.calls.append((delay, action))
+        return lambda: None
+
+
+def create_tracker(states: dict) -> tuple:
+    scheduler = FakeScheduler()
+    resent = []
+    tracker = DeliveryTracker(scheduler.call_later, states.get, resent.append)
+    return tracker, scheduler, resent
+
+def verify(scheduler: FakeScheduler) -> None:
+    delay, action = scheduler.calls.pop(0)
+    run(action())
+
+def test_verification_waits_for_the_transition():
+    tracker, scheduler, _ = create_tracker({})
+    tracker.expect(Command("turn_on", ("light.a",), { "brightness": 100, "transition": 10 }))
+    tracker.expect(Command("turn_on", ("light.b",), { "brightness": 100 }))
+
+    assert [delay for delay, _ in scheduler.calls] == [VERIFY_DELAY + 10, VERIFY_DELAY]
+
+def test_template_brightness_is_not_compared():
+    states = { "light.a": State("light.a", "off"), "light.b": State("light.b", "on", { "brightness": 30 }) }
+    tracker, scheduler, resent = create_tracker(states)
+    tracker.expect(Command("turn_on", ("light.a",), { "brightness": "{{ 0 if is_state('sun.sun', 'above_horizon') else 200 }}" }))
+    tracker.expect(Command("turn_on", ("light.b",), { "brightness": 200 }))
+    verify(scheduler)
+    verify(scheduler)
+
+    assert tracker.stats["light.a"]["delivered"] == 1
+    assert [command.entity_ids for command in resent] == [("light.b",)]
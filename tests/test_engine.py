@@ -0,0 +1,241 @@
+""" Tests the lighting engine (standard library only, the engine is loaded from its file path). """
+from __future__ import annotations
+from importlib.util import module_from_spec, spec_from_file_location
+from typing import Any, Dict, NamedTuple, Tuple
+import os
+import random
+import sys
+
+
+def load_engine() -> Any:
+    """ Loads engine.py without importing the integration package (which requires Home Assistant). """
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "custom_components", "automatic_lighting", "engine.py")
+    spec = spec_from_file_location("automatic_lighting_engine", path)
+    module = module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+engine = load_engine()
+
+
+class Profile(NamedTuple):
+    id: str
+    state: str
+    lights: Tuple[str, ...]
+    attributes: Dict[str, Any] = {}
+    valid: bool = True
+
+    def is_valid(self) -> bool:
+        return self.valid
+
+AMBIENT = Profile("ambient", engine.STATE_IDLE, ("light.a", "light.b"), { "brightness": 20 })
+EVENING = Profile("evening", engine.STATE_IDLE, ("light.b",), { "brightness": 50 })
+MOTION = Profile("motion", engine.STATE_ACTIVE, ("light.a",), { "brightness": 200 })
+LIGHTS = ("light.a", "light.b", "light.c")
+
+def services(commands: list) -> list:
+    return [(command.service, command.entity_ids) for command in commands]
+
+
+#-----------------------------------------------------------#
+#       Block
+#-----------------------------------------------------------#
+
+def test_block_moves_deadline_by_granularity_and_expires():
+    lighting = engine.LightingEngine(10)
+
+    assert lighting.block(0, 10) and lighting.blocked_until == 10
+    assert not lighting.block(0.5, 10) and lighting.blocked_until == 10.5
+    assert lighting.extend_block(2) and lighting.blocked_until == 12
+    assert lighting.next_deadline == 12
+    assert lighting.advance(11.9) == [] and lighting.is_blocked
+    assert lighting.advance(12) == [engine.DEADLINE_BLOCK] and lighting.state == engine.STATE_IDLE
+    assert lighting.next_deadline is None
+
+def test_indefinite_block_never_expires():
+    lighting = engine.LightingEngine(None)
+
+    assert lighting.manual_control(0) and lighting.blocked_until is None
+    assert not lighting.manual_control(5)
+    assert lighting.advance(1e9) == [] and lighting.is_blocked
+
+def test_running_block_keeps_its_duration():
+    lighting = engine.LightingEngine(10)
+    lighting.manual_control(0)
+    lighting.set_block_duration(100)
+
+    assert lighting.extend_block(5) and lighting.blocked_until == 15
+    lighting.advance(15)
+    assert lighting.manual_control(20) and lighting.blocked_until == 120
+
+
+#-----------------------------------------------------------#
+#       Request
+#-----------------------------------------------------------#
+
+def test_request_prefers_offered_active_profile():
+    lighting = engine.LightingEngine(10)
+
+    assert not lighting.offer(AMBIENT)
+    lighting.begin_request()
+    assert lighting.offer(AMBIENT) and lighting.offer(MOTION) and lighting.offer(EVENING)
+    commands = lighting.finish_request(LIGHTS)
+
+    assert lighting.active_profile is MOTION and lighting.idle_profile is None
+    assert services(commands) == [("turn_off", ("light.b", "light.c")), ("turn_on", ("light.a",))]
+    assert not lighting.is_requesting
+
+def test_request_without_offers_turns_off_all_lights():
+    lighting = engine.LightingEngine(10)
+    lighting.begin_request()
+
+    assert services(lighting.finish_request(LIGHTS)) == [("turn_off", LIGHTS)]
+    assert lighting.profile is None
+
+def test_request_while_blocked_keeps_profile_without_commands():
+    lighting = engine.LightingEngine(10)
+    lighting.block(0, 10)
+    lighting.begin_request()
+    lighting.offer(EVENING)
+
+    assert lighting.finish_request(LIGHTS) == []
+    assert lighting.idle_profile is EVENING
+    assert services(lighting.restore(EVENING, LIGHTS)) == []
+    lighting.advance(10)
+    assert services(lighting.restore(EVENING, LIGHTS)) == [("turn_off", ("light.a", "light.c")), ("turn_on", ("light.b",))]
+
+
+#-----------------------------------------------------------#
+#       Turn On
+#-----------------------------------------------------------#
+
+def test_turn_on_turns_off_unused_lights_of_previous_profile():
+    lighting = engine.LightingEngine(10)
+
+    assert services(lighting.turn_on(0, AMBIENT)) == [("turn_on", AMBIENT.lights)]
+    assert services(lighting.turn_on(1, EVENING)) == [("turn_off", ("light.a",)), ("turn_on", ("light.b",))]
+    assert services(lighting.turn_on(2, EVENING._replace(attributes={ "brightness": 80 }))) == [("turn_on", ("light.b",))]
+
+def test_turn_on_while_blocked_extends_block():
+    lighting = engine.LightingEngine(10)
+    lighting.block(0, 10)
+
+    assert lighting.turn_on(5, AMBIENT) == []
+    assert lighting.blocked_until == 15 and lighting.profile is None
+
+
+#-----------------------------------------------------------#
+#       Evaluate
+#-----------------------------------------------------------#
+
+def test_evaluate_selects_first_valid_profile():
+    lighting = engine.LightingEngine(10)
+
+    assert services(lighting.evaluate(False, [MOTION], [AMBIENT._replace(valid=False), EVENING], LIGHTS)) == [("turn_off", ("light.a", "light.c")), ("turn_on", ("light.b",))]
+    assert lighting.idle_profile.id == "evening"
+    assert services(lighting.evaluate(True, [MOTION], [EVENING], LIGHTS)) == [("turn_off", ("light.b", "light.c")), ("turn_on", ("light.a",))]
+    assert lighting.evaluate(True, [MOTION], [EVENING], LIGHTS) == []
+
+def test_evaluate_releases_active_profile_and_turns_off_without_valid_profile():
+    lighting = engine.LightingEngine(10)
+    lighting.evaluate(True, [MOTION], [], LIGHTS)
+    lighting.release(0, 30)
+
+    assert lighting.next_deadline == 30
+    assert lighting.advance(30) == [engine.DEADLINE_ACTIVE]
+    assert services(lighting.evaluate(False, [MOTION], [AMBIENT._replace(valid=False)], LIGHTS)) == [("turn_off", LIGHTS)]
+
+def test_no_valid_profile_without_lights_issues_no_command():
+    lighting = engine.LightingEngine(10)
+
+    assert lighting.evaluate(False, [], [AMBIENT._replace(valid=False)], ()) == []
+    lighting.begin_request()
+    assert lighting.finish_request(()) == []
+
+def test_evaluate_while_blocked_drops_active_profile():
+    lighting = engine.LightingEngine(10)
+    lighting.evaluate(True, [MOTION], [], LIGHTS)
+    lighting.block(0, 10)
+
+    assert lighting.evaluate(True, [MOTION], [AMBIENT], LIGHTS) == []
+    assert lighting.active_profile is None and lighting.active_until is None
+
+
+#-----------------------------------------------------------#
+#       Fuzz
+#-----------------------------------------------------------#
+
+def check_commands(lighting: Any, commands: list, lights: Tuple[str, ...]) -> None:
+    """ Checks the commands of a single input: at most one turn_off followed by the turn_on of the applied profile, never overlapping. """
+    if len(commands) == 0:
+        return
+
+    *turn_offs, last = commands
+    assert len(turn_offs) <= 1
+    assert all(command.service == engine.SERVICE_TURN_OFF for command in turn_offs)
+
+    if last.service == engine.SERVICE_TURN_OFF:
+        assert len(turn_offs) == 0 and last.entity_ids == lights
+        return
+
+    assert last.entity_ids == lighting.profile.lights and last.attributes is lighting.profile.attributes
+    assert all(set(command.entity_ids).isdisjoint(last.entity_ids) for command in turn_offs)
+
+def check_state(lighting: Any) -> None:
+    """ Checks the invariants of the engine state. """
+    assert (lighting.state == engine.STATE_BLOCKED) == lighting.is_blocked
+    assert lighting.blocked_until is None or lighting.is_blocked
+    assert lighting.active_profile is None or lighting.active_profile.state == engine.STATE_ACTIVE
+    assert lighting.idle_profile is None or lighting.idle_profile.state == engine.STATE_IDLE
+    assert lighting.active_until is None or lighting.active_profile is not None
+    deadlines = [deadline for deadline in (lighting.blocked_until, lighting.active_until) if deadline is not None]
+    assert lighting.next_deadline == (min(deadlines) if deadlines else None)
+
+def test_fuzz_invariants():
+    profiles = [AMBIENT, EVENING, MOTION, AMBIENT._replace(valid=False), Profile("all", engine.STATE_IDLE, LIGHTS), Profile("door", engine.STATE_ACTIVE, ("light.c",))]
+
+    for seed in range(20):
+        generator = random.Random(seed)
+        lighting = engine.LightingEngine(generator.choice([None, 5, 30]))
+        now = 0.0
+
+        for _ in range(500):
+            now += generator.choice([0, 0.3, 1, 7, 40])
+            was_blocked, blocked_until = lighting.is_blocked, lighting.blocked_until
+            operation = generator.randrange(9)
+            commands = []
+
+            if operation == 0:
+                lighting.manual_control(now)
+                assert lighting.is_blocked
+                assert not was_blocked or blocked_until is None or lighting.blocked_until is None or lighting.blocked_until >= blocked_until
+            elif operation == 1:
+                expired = lighting.advance(now)
+                assert all(deadline is None or deadline > now for deadline in (lighting.blocked_until, lighting.active_until))
+                assert (engine.DEADLINE_BLOCK in expired) == (was_blocked and not lighting.is_blocked)
+            elif operation == 2:
+                lighting.begin_request()
+
+                for profile in generator.sample(profiles, generator.randrange(3)):
+                    lighting.offer(profile)
+
+                commands = lighting.finish_request(LIGHTS)
+            elif operation == 3:
+                commands = lighting.turn_on(now, generator.choice(profiles))
+            elif operation == 4:
+                commands = lighting.restore(generator.choice(profiles), LIGHTS)
+            elif operation == 5:
+                commands = lighting.evaluate(generator.random() < 0.5, [profile for profile in profiles if profile.state == engine.STATE_ACTIVE], [profile for profile in profiles if profile.state == engine.STATE_IDLE], LIGHTS)
+            elif operation == 6:
+                lighting.release(now, generator.choice([None, 0, 10]))
+            elif operation == 7:
+                lighting.hold()
+            else:
+                lighting.set_block_duration(generator.choice([None, 5, 30]))
+
+            if was_blocked and lighting.is_blocked:
+                assert commands == []
+
+            check_commands(lighting, commands, LIGHTS)
+            check_state(lighting)
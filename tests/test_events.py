@@ -0,0 +1,35 @@
+""" Tests firing the zone events. """
+from __future__ import annotations
+import asyncio
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from .common import async_create_hass, create_config_entry, create_entity
+from custom_components.automatic_lighting.const import EVENT_TYPE_AUTOMATIC_LIGHTING
+from custom_components.automatic_lighting.sensor import AL_Entity
+from custom_components.automatic_lighting.utils import has_bus_listeners
+
+
+def test_unscoped_event_is_only_fired_while_it_has_listeners(tmp_path):
+    async def test():
+        hass = await async_create_hass(str(tmp_path))
+        entity = create_entity(hass, AL_Entity, "sensor.automatic_lighting_hallway", create_config_entry())
+        scoped, unscoped = [], []
+        hass.bus.async_listen(f"{EVENT_TYPE_AUTOMATIC_LIGHTING}.{entity.entity_id}", scoped.append)
+
+        assert entity.has_zone_event_listeners(EVENT_TYPE_AUTOMATIC_LIGHTING)
+        assert not has_bus_listeners(hass, EVENT_TYPE_AUTOMATIC_LIGHTING)
+        entity.fire_zone_event(EVENT_TYPE_AUTOMATIC_LIGHTING, type="request")
+        remove = hass.bus.async_listen(EVENT_TYPE_AUTOMATIC_LIGHTING, unscoped.append)
+        entity.fire_zone_event(EVENT_TYPE_AUTOMATIC_LIGHTING, type="request")
+        remove()
+        entity.fire_zone_event(EVENT_TYPE_AUTOMATIC_LIGHTING, type="request")
+        await hass.async_block_till_done()
+        await hass.async_stop(force=True)
+        return scoped, unscoped
+
+    scoped, unscoped = asyncio.run(test())
+
+    assert len(scoped) == 3
+    assert len(unscoped) == 1
@@ -0,0 +1,101 @@
+""" Tests recording the inputs of a zone and replaying the event log under a virtual clock. """
+from __future__ import annotations
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from .common import async_create_hass, async_record, create_config_entry, create_entity, run
+from custom_components.automatic_lighting.const import RECORD_TYPE_SESSION
+from custom_components.automatic_lighting.sensor import AL_Entity as SensorEntity
+from custom_components.automatic_lighting.switch import AL_Entity as SwitchEntity
+from custom_components.automatic_lighting.utils import async_replay, EventRecorder, load_records
+from homeassistant.core import Context, State
+
+
+def test_sensor_replay_is_identical(tmp_path):
+    async def test():
+        hass = await async_create_hass(str(tmp_path))
+        entity = create_entity(hass, SensorEntity, "sensor.automatic_lighting_hallway", create_config_entry())
+        turn_on = lambda: entity._async_service_turn_on(id="evening", state="idle", lights=["light.a", "light.b"], brightness=100)
+
+        records = await async_record(entity, [
+            (0, lambda: _async_call(entity._initialize)),
+            (2, turn_on),
+            (3, lambda: entity._async_on_manual_control(["light.a"], Context())),
+            (4, turn_on),
+            (400, None),
+            (401, lambda: entity._async_service_turn_off()),
+            (410, None)
+        ])
+
+        replayed = create_entity(hass, SensorEntity, "sensor.automatic_lighting_hallway", create_config_entry())
+        result = await async_replay(replayed, records)
+        await hass.async_stop(force=True)
+        return records, result, replayed
+
+    records, result, replayed = run(test())
+
+    assert records[0]["e"] == RECORD_TYPE_SESSION
+    assert len(result.expected) > 0
+    assert result.is_identical, (result.expected, result.actual)
+    assert replayed.clock is None and replayed.recorder is None
+
+
+def test_switch_replay_is_identical(tmp_path):
+    options = { "profiles": {
+        "motion": { "lights": ["light.a"], "triggers": ["binary_sensor.motion"], "duration": 30, "brightness": 200 },
+        "ambient": { "lights": ["light.a", "light.b"], "brightness": 20 }
+    } }
+
+    async def test():
+        hass = await async_create_hass(str(tmp_path))
+        hass.states.async_set("binary_sensor.motion", "off")
+        entity = create_entity(hass, SwitchEntity, "switch.automatic_lighting_hallway", create_config_entry(options=options))
+        trigger = lambda state: lambda: entity._async_on_trigger_state_change("binary_sensor.motion", None, State("binary_sensor.motion", state))
+
+        records = await async_record(entity, [
+            (0, entity.async_turn_on),
+            (5, trigger("on")),
+            (10, trigger("off")),
+            (20, lambda: entity._async_register_profiles([{ "lights": ["light.c"], "brightness": 50 }], "automation.extra")),
+            (50, None),
+            (60, lambda: entity._async_on_manual_control(["light.a"], Context())),
+            (61, lambda: _async_call(entity._constrain, "ambient", True)),
+            (400, None)
+        ])
+
+        replayed = create_entity(hass, SwitchEntity, "switch.automatic_lighting_hallway", create_config_entry(options=options))
+        result = await async_replay(replayed, records)
+        await hass.async_stop(force=True)
+        return result
+
+    result = run(test())
+
+    assert len(result.expected) > 0
+    assert result.is_identical, (result.expected, result.actual)
+
+
+def test_recorder_rotates_per_session_and_is_bounded(tmp_path):
+    path = str(tmp_path / "zone.jsonl")
+
+    async def write(count: int, max_size: int) -> EventRecorder:
+        recorder = EventRecorder(path=path, max_size=max_size)
+
+        for index in range(count):
+            recorder.record("turn_off", index=index)
+
+        await recorder.async_flush()
+        return recorder
+
+    run(write(3, 10000))
+    recorder = run(write(1000, 2000))
+
+    assert len(list(load_records(f"{path}.1"))) == 4
+    assert recorder.is_full
+    assert 0 < len(list(load_records(path))) < 1000
+    assert run(write(2, 10000)).is_full is False
+    assert [record["e"] for record in load_records(path)] == [RECORD_TYPE_SESSION, "turn_off", "turn_off"]
+
+
+async def _async_call(action, *args) -> None:
+    action(*args)
@@ -0,0 +1,48 @@
+""" Tests the sensor zone (inputs are serialized through its inbox). """
+from __future__ import annotations
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from .common import async_create_hass, async_record, create_config_entry, create_entity, run
+from custom_components.automatic_lighting.const import RECORD_TYPE_COMMAND
+from custom_components.automatic_lighting.sensor import AL_Entity as SensorEntity
+from homeassistant.core import Context
+
+
+def run_session(tmp_path, session_factory):
+    async def test():
+        hass = await async_create_hass(str(tmp_path))
+        entity = create_entity(hass, SensorEntity, "sensor.automatic_lighting_hallway", create_config_entry())
+        records = await async_record(entity, session_factory(entity))
+        await hass.async_stop(force=True)
+        return records, entity
+
+    return run(test())
+
+def turn_on(entity, id: str, brightness: int):
+    return lambda: entity._async_service_turn_on(id=id, state="idle", lights=["light.a"], brightness=brightness)
+
+async def _async_all(*actions) -> None:
+    for action in actions:
+        await action()
+
+def test_manual_control_in_the_same_step_wins_over_turn_on(tmp_path):
+    records, entity = run_session(tmp_path, lambda entity: [
+        (0, lambda: _async_all(turn_on(entity, "evening", 100), lambda: entity._async_on_manual_control(["light.a"], Context()))),
+        (1, None)
+    ])
+
+    assert [record for record in records if record["e"] == RECORD_TYPE_COMMAND] == []
+    assert entity.is_blocked
+    assert entity.details["inbox"] == { "processed": 2, "drains": 1, "decisions": 1 }
+
+def test_inputs_of_one_step_share_a_single_decision(tmp_path):
+    records, entity = run_session(tmp_path, lambda entity: [
+        (0, lambda: _async_all(turn_on(entity, "evening", 100), turn_on(entity, "night", 20))),
+        (1, None)
+    ])
+    commands = [record for record in records if record["e"] == RECORD_TYPE_COMMAND]
+
+    assert [command["d"]["service_data"]["brightness"] for command in commands] == [100, 20]
+    assert entity.details["inbox"]["decisions"] == 1
@@ -0,0 +1,137 @@
+""" Tests setting up a zone through Home Assistant's config entries. """
+from __future__ import annotations
+import asyncio
+import os
+import pytest
+import subprocess
+import sys
+
+pytest.importorskip("homeassistant")
+
+from .common import async_load_integration, async_start_zones, create_config_entry
+from custom_components.automatic_lighting import SETUP_TIME_BUDGET
+from custom_components.automatic_lighting.const import DATA_SETUP_TIMES, DATA_ZONE_STREAM, DOMAIN, ENTITIES, SERVICE_CONSTRAIN, SERVICE_REGISTER, SERVICE_TRACK_LIGHTS
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import EVENT_CALL_SERVICE
+
+DOMAIN_SENSOR = "sensor"
+DOMAIN_SWITCH = "switch"
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_both_platforms_are_set_up(tmp_path):
+    async def test():
+        config_entry = create_config_entry(options={ "profiles": { "ambient": { "lights": ["light.a"], "brightness": 20 } } })
+        hass = await async_load_integration(str(tmp_path), config_entry)
+        entity_ids = sorted(hass.states.async_entity_ids())
+        entities = [entity.entity_id for entity in hass.data[DOMAIN][config_entry.entry_id][ENTITIES]]
+        services = hass.services.async_services().get(DOMAIN, {})
+        state = config_entry.state
+        unload_ok = await hass.config_entries.async_unload(config_entry.entry_id)
+        await hass.async_stop(force=True)
+        return entity_ids, entities, services, state, unload_ok
+
+    entity_ids, entities, services, state, unload_ok = asyncio.run(test())
+
+    assert state is ConfigEntryState.LOADED
+    assert entity_ids == ["sensor.automatic_lighting_hallway", "switch.automatic_lighting_hallway"]
+    assert sorted(entities) == entity_ids
+    assert all(service in services for service in [SERVICE_CONSTRAIN, SERVICE_REGISTER, SERVICE_TRACK_LIGHTS, "turn_on", "turn_off"])
+    assert unload_ok
+
+
+def test_switch_applies_options_profiles(tmp_path):
+    async def test():
+        config_entry = create_config_entry(options={ "profiles": { "ambient": { "lights": ["light.a"], "brightness": 20 } } })
+        hass = await async_load_integration(str(tmp_path), config_entry)
+        switch = next(entity for entity in hass.data[DOMAIN][config_entry.entry_id][ENTITIES] if entity.entity_id.startswith("switch."))
+        await async_start_zones(hass)
+        before = [profile["id"] for profile in switch.details["profiles"]]
+        hass.config_entries.async_update_entry(config_entry, options={ "profiles": { "evening": { "lights": ["light.b"], "brightness": 50 } } })
+        await hass.async_block_till_done()
+        after = [profile["id"] for profile in switch.details["profiles"]]
+        attributes = dict(hass.states.get(switch.entity_id).attributes)
+        await hass.async_stop(force=True)
+        return before, after, attributes
+
+    before, after, attributes = asyncio.run(test())
+
+    assert before == ["ambient"]
+    assert after == ["evening"]
+    assert attributes["status"] == "idle" and attributes["entity_id"] == ["light.b"]
+
+
+def test_setup_steps_stay_within_budget(tmp_path):
+    async def test():
+        config_entry = create_config_entry(options={ "profiles": { "ambient": { "lights": ["light.a"], "brightness": 20 } } })
+        hass = await async_load_integration(str(tmp_path), config_entry)
+        setup_times = dict(hass.data[DATA_SETUP_TIMES])
+        await hass.async_stop(force=True)
+        return config_entry.entry_id, setup_times
+
+    entry_id, setup_times = asyncio.run(test())
+
+    assert { name: duration for name, duration in setup_times.items() if duration > SETUP_TIME_BUDGET } == {}
+    assert all(name in setup_times for name in ["setup", entry_id, f"{entry_id}.sensor", f"{entry_id}.switch"])
+
+def test_platform_imports_stay_within_budget():
+    # Measured in a fresh interpreter that has already imported what Home Assistant loads before the integration (this test process imports the platforms before their dependencies).
+    script = "\n".join([
+        "from time import perf_counter",
+        "import homeassistant.components.light, homeassistant.components.binary_sensor, homeassistant.components.sensor, homeassistant.components.switch, homeassistant.components.automation",
+        "import homeassistant.config_entries, homeassistant.helpers.config_validation, homeassistant.helpers.entity_platform, homeassistant.helpers.restore_state, homeassistant.helpers.template",
+        "started_at = perf_counter()",
+        "import custom_components.automatic_lighting.sensor, custom_components.automatic_lighting.switch",
+        "print(perf_counter() - started_at)"
+    ])
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, check=True, cwd=REPOSITORY_PATH, text=True).stdout
+
+    assert float(output) < SETUP_TIME_BUDGET
+
+
+def test_zone_state_is_published_on_state_changes(tmp_path):
+    async def test():
+        config_entry = create_config_entry(options={ "profiles": { "ambient": { "lights": ["light.a"], "brightness": 20 } } })
+        hass = await async_load_integration(str(tmp_path), config_entry)
+        stream = hass.data[DATA_ZONE_STREAM]
+        await async_start_zones(hass)
+        await asyncio.sleep(1)
+        started = stream.snapshot()
+        switch = next(entity for entity in hass.data[DOMAIN][config_entry.entry_id][ENTITIES] if entity.entity_id.startswith("switch."))
+        await switch.async_turn_off()
+        await hass.async_block_till_done()
+        stopped = stream.snapshot()
+        await hass.async_stop(force=True)
+        return started, stopped
+
+    started, stopped = asyncio.run(test())
+
+    assert started["switch.automatic_lighting_hallway"]["status"] == "idle" and started["switch.automatic_lighting_hallway"]["id"] == "ambient"
+    assert started["sensor.automatic_lighting_hallway"]["status"] == "idle"
+    assert stopped["switch.automatic_lighting_hallway"]["id"] is None
+
+
+async def async_get_light_calls(tmp_path, options: dict, duration: float = 6) -> tuple:
+    """ Runs a zone for a while and returns its light service calls and the ids of its entities. """
+    config_entry = create_config_entry(options=options)
+    hass = await async_load_integration(str(tmp_path), config_entry)
+    calls = []
+    hass.bus.async_listen(EVENT_CALL_SERVICE, lambda event: event.data["domain"] == "light" and calls.append((event.data["service"], event.data["service_data"].get("entity_id"))))
+    await async_start_zones(hass)
+    await asyncio.sleep(duration)
+    entity_ids = sorted(hass.states.async_entity_ids(DOMAIN_SENSOR) + hass.states.async_entity_ids(DOMAIN_SWITCH))
+    await hass.async_stop(force=True)
+    return calls, entity_ids
+
+def test_sensor_and_switch_do_not_fight_over_lights(tmp_path):
+    options = { "light_groups": { "light.group": ["light.a", "light.b"] }, "profiles": { "ambient": { "lights": ["light.a"], "brightness": 20 } } }
+    calls, _ = asyncio.run(async_get_light_calls(tmp_path, options))
+
+    assert [call for call in calls if "light.a" in call[1]] == [("turn_on", ["light.a"])]
+    assert ("turn_off", ["light.b"]) in calls
+
+def test_sensor_only_zone_does_not_set_up_the_switch(tmp_path):
+    calls, entity_ids = asyncio.run(async_get_light_calls(tmp_path, { "light_groups": { "light.group": ["light.a"] } }, duration=1.5))
+
+    assert entity_ids == ["sensor.automatic_lighting_hallway"]
+    assert calls == [("turn_off", ["light.a"])]
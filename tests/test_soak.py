@@ -0,0 +1,250 @@
+""" Soak test: drives the zone building blocks through long runs of refresh, block and trigger cycles and checks that memory, handles, listeners and timers stay bounded. """
+from __future__ import annotations
+from heapq import heappop, heappush
+from inspect import isawaitable
+from itertools import count
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+import gc
+import random
+import tracemalloc
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from .common import run
+from custom_components.automatic_lighting.engine import DEADLINE_ACTIVE, DEADLINE_BLOCK, LightingEngine, STATE_ACTIVE, STATE_IDLE
+from custom_components.automatic_lighting.utils import Inbox, TriggerFilter
+from custom_components.automatic_lighting.utils.delivery import DeliveryTracker
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import State
+
+CYCLES = 100_000
+LIGHTS = ("light.a", "light.b", "light.c")
+MEMORY_GROWTH_LIMIT = 64 * 1024
+WARMUP_CYCLES = 5_000
+ZONES = 2
+
+
+#-----------------------------------------------------------#
+#       Fakes
+#-----------------------------------------------------------#
+
+class FakeLoop():
+    """ A virtual time loop whose call_later keeps only the live (not cancelled, not yet run) timers. """
+
+    def __init__(self):
+        self.time = 0.0
+        self._ids = count()
+        self._queue = []
+        self._timers = {}
+
+    @property
+    def timers(self) -> int:
+        return len(self._timers)
+
+    def call_later(self, delay: float, action: Callable) -> Callable[[], None]:
+        id = next(self._ids)
+        self._timers[id] = action
+        heappush(self._queue, (self.time + (delay or 0), id))
+        return lambda: self._timers.pop(id, None)
+
+    def call_soon(self, action: Callable) -> Callable[[], None]:
+        return self.call_later(0, action)
+
+    async def async_advance_to(self, time: float) -> None:
+        while self._queue and self._queue[0][0] <= time:
+            when, id = heappop(self._queue)
+            action = self._timers.pop(id, None)
+
+            if action is None:
+                continue
+
+            self.time = max(self.time, when)
+            result = action()
+            isawaitable(result) and await result
+
+        self.time = max(self.time, time)
+
+        # Cancelled timers are dropped from the queue lazily; compact it once they dominate (like the asyncio loop does).
+        if len(self._queue) > 2 * len(self._timers) + 64:
+            self._queue = [entry for entry in self._queue if entry[1] in self._timers]
+            self._queue.sort()
+
+class FakeBus():
+    """ A bus delivering the events synchronously to the listeners of their type. """
+
+    def __init__(self):
+        self._listeners = {}
+
+    @property
+    def listeners(self) -> int:
+        return sum(len(listeners) for listeners in self._listeners.values())
+
+    def listen(self, event_type: str, listener: Callable) -> Callable[[], None]:
+        self._listeners.setdefault(event_type, []).append(listener)
+        return lambda: self._listeners[event_type].remove(listener)
+
+    async def async_fire(self, event_type: str, data: Dict[str, Any]) -> None:
+        for listener in list(self._listeners.get(event_type, ())):
+            result = listener(data)
+            isawaitable(result) and await result
+
+class Profile(NamedTuple):
+    id: str
+    state: str
+    lights: Tuple[str, ...]
+    attributes: Dict[str, Any]
+    duration: int = 0
+
+    def is_valid(self) -> bool:
+        return True
+
+
+#-----------------------------------------------------------#
+#       Zone
+#-----------------------------------------------------------#
+
+class Zone():
+    """ Wires the engine, inbox, trigger filter and delivery tracker the way the switch does, with the lights and triggers on a fake bus. """
+
+    def __init__(self, index: int, loop: FakeLoop, bus: FakeBus, states: Dict[str, State], generator: random.Random):
+        self.trigger = f"binary_sensor.motion_{index}"
+        self.lights = tuple(f"{light}_{index}" for light in LIGHTS)
+        self.active_profiles = [Profile("motion", STATE_ACTIVE, self.lights[:1], { "brightness": 200, "transition": 2 }, 5)]
+        self.idle_profiles = [Profile("ambient", STATE_IDLE, self.lights, { "brightness": 20 })]
+        self._bus = bus
+        self._deadline_listener = None
+        self._generator = generator
+        self._loop = loop
+        self._states = states
+        self.engine = LightingEngine(3)
+        self.inbox = Inbox(loop.call_soon, self._decide)
+        self.trigger_filter = TriggerFilter(loop.call_later, self._async_on_trigger_change)
+        self.delivery = DeliveryTracker(loop.call_later, states.get, self._issue, delay=1)
+        self.trigger_filter.setup({ self.trigger: (0.5, 1) }, { self.trigger: STATE_OFF })
+        self._listeners = [bus.listen("state_changed", self._on_state_changed), bus.listen("manual_control", self._on_manual_control)]
+
+    @property
+    def handles(self) -> Dict[str, int]:
+        return { "deadline": int(self._deadline_listener is not None), "delivery": self.delivery.pending, "inbox": self.inbox.pending, "trigger_filter": self.trigger_filter.pending, "delivery_stats": len(self.delivery.stats) }
+
+    def remove(self) -> None:
+        while self._listeners:
+            self._listeners.pop()()
+
+        self.inbox.cancel()
+        self.trigger_filter.cancel()
+        self.delivery.cancel()
+        self._deadline_listener and self._deadline_listener()
+        self._deadline_listener = None
+
+    def refresh(self) -> None:
+        self.inbox.post(lambda: True)
+
+    def _decide(self, requests: List[Any]) -> None:
+        commands = self.engine.evaluate(self.trigger_filter.is_on(self.trigger), self.active_profiles, self.idle_profiles, self.lights)
+
+        for command in commands:
+            self._issue(command)
+            self.delivery.expect(command)
+
+        self._schedule_deadline()
+
+    def _issue(self, command: Any) -> None:
+        """ Applies a command to the light states, dropping some of them so the delivery tracker has to retry. """
+        if self._generator.random() < 0.2:
+            return
+
+        for light in command.entity_ids:
+            self._states[light] = State(light, STATE_ON if command.service == "turn_on" else STATE_OFF, { "brightness": command.attributes.get("brightness") })
+
+    def _on_deadline(self) -> None:
+        self._deadline_listener = None
+        expired = self.engine.advance(self._loop.time)
+        (DEADLINE_BLOCK in expired or DEADLINE_ACTIVE in expired) and self.inbox.post(lambda: True)
+        self._schedule_deadline()
+
+    async def _async_on_trigger_change(self, signal: str, state: str) -> None:
+        def process() -> bool:
+            if state == STATE_OFF:
+                self.engine.is_active and self.engine.release(self._loop.time, self.active_profiles[0].duration)
+                return True
+
+            self.engine.is_active and self.engine.hold()
+            return True
+
+        self.inbox.post(process)
+
+    async def _on_state_changed(self, data: Dict[str, Any]) -> None:
+        data["entity_id"] == self.trigger and await self.trigger_filter.async_process(self.trigger, data["state"])
+
+    def _on_manual_control(self, data: Dict[str, Any]) -> None:
+        data["entity_id"] in self.lights and self.inbox.post(lambda: self.engine.manual_control(self._loop.time) and self._on_blocked())
+
+    def _on_blocked(self) -> bool:
+        self.delivery.cancel()
+        self._schedule_deadline()
+        return True
+
+    def _schedule_deadline(self) -> None:
+        self._deadline_listener and self._deadline_listener()
+        self._deadline_listener = None
+        deadline = self.engine.next_deadline
+        deadline is not None and setattr(self, "_deadline_listener", self._loop.call_later(max(deadline - self._loop.time, 0), self._on_deadline))
+
+
+#-----------------------------------------------------------#
+#       Tests
+#-----------------------------------------------------------#
+
+async def async_run_cycles(loop: FakeLoop, bus: FakeBus, zones: List[Zone], generator: random.Random, cycles: int) -> None:
+    """ Runs refresh/block/trigger cycles: every cycle changes each trigger and refreshes each zone, one in ten also controls a light manually. """
+    for _ in range(cycles):
+        for zone in zones:
+            await bus.async_fire("state_changed", { "entity_id": zone.trigger, "state": generator.choice([STATE_ON, STATE_OFF]) })
+            zone.refresh()
+            generator.random() < 0.1 and await bus.async_fire("manual_control", { "entity_id": generator.choice(zone.lights) })
+
+        await loop.async_advance_to(loop.time + generator.choice([0.1, 0.4, 0.7, 1.5, 4]))
+
+def test_soak_memory_handles_and_timers_stay_bounded():
+    loop, bus, states, generator = FakeLoop(), FakeBus(), {}, random.Random(7)
+    zones = [Zone(index, loop, bus, states, generator) for index in range(ZONES)]
+    handle_limits = { "deadline": 1, "delivery": len(LIGHTS), "inbox": 4, "trigger_filter": 1, "delivery_stats": len(LIGHTS) }
+
+    async def test() -> Tuple[int, int]:
+        await async_run_cycles(loop, bus, zones, generator, WARMUP_CYCLES)
+        tracemalloc.start()
+
+        try:
+            gc.collect()
+            before = tracemalloc.take_snapshot()
+            peak_timers = 0
+
+            for _ in range(CYCLES // 1000):
+                await async_run_cycles(loop, bus, zones, generator, 1000)
+                peak_timers = max(peak_timers, loop.timers)
+
+                for zone in zones:
+                    assert all(zone.handles[name] <= limit for name, limit in handle_limits.items()), zone.handles
+
+            gc.collect()
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+
+        growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        return growth, peak_timers
+
+    growth, peak_timers = run(test())
+
+    assert growth < MEMORY_GROWTH_LIMIT, growth
+    assert peak_timers <= ZONES * (1 + len(LIGHTS) + 1 + 1)
+    assert bus.listeners == 2 * ZONES
+    assert all(zone.inbox.stats["decisions"] >= CYCLES and zone.delivery.stats[zone.lights[0]]["retries"] > 0 for zone in zones)
+
+    for zone in zones:
+        zone.remove()
+
+    run(loop.async_advance_to(loop.time + 1000))
+    assert bus.listeners == 0 and loop.timers == 0
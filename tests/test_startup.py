@@ -0,0 +1,33 @@
+""" Tests admitting the zones at startup. """
+from __future__ import annotations
+import asyncio
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from .common import async_create_hass
+from custom_components.automatic_lighting.utils import startup, StartupScheduler
+from homeassistant.const import EVENT_HOMEASSISTANT_START
+from logging import getLogger
+
+
+def test_timed_out_zone_is_not_counted_as_ready(tmp_path, monkeypatch):
+    monkeypatch.setattr(startup, "READY_TIMEOUT", 0.05)
+
+    async def test():
+        hass = await async_create_hass(str(tmp_path))
+        scheduler = StartupScheduler(hass, getLogger(__name__), 1, 0)
+        started = []
+        scheduler.admit("sensor.slow", 0, lambda: started.append("sensor.slow"))
+        scheduler.admit("sensor.fast", 1, lambda: started.append("sensor.fast") or scheduler.ready("sensor.fast"))
+        hass.bus.async_fire(EVENT_HOMEASSISTANT_START)
+        await asyncio.sleep(0.2)
+        scheduler.ready("sensor.slow")
+        await hass.async_stop(force=True)
+        return scheduler, started
+
+    scheduler, started = asyncio.run(test())
+
+    assert started == ["sensor.slow", "sensor.fast"]
+    assert list(scheduler.timed_out) == ["sensor.slow"]
+    assert list(scheduler.ready_times) == ["sensor.fast"]
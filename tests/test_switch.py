@@ -0,0 +1,76 @@
+""" Tests the switch zone on a virtual clock. """
+from __future__ import annotations
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from .common import async_create_hass, async_record, create_config_entry, create_entity, run
+from custom_components.automatic_lighting.const import RECORD_TYPE_COMMAND
+from custom_components.automatic_lighting.switch import AL_Entity
+from custom_components.automatic_lighting.utils import intern_attributes
+from homeassistant.core import State
+
+
+def get_commands(records: list, *attributes: str) -> list:
+    """ Gets the time, service and profile lights (and the given attributes) of the recorded light commands. """
+    return [(record["t"], record["d"]["service"], record["d"]["service_data"]["entity_id"], *(record["d"]["service_data"].get(attribute) for attribute in attributes)) for record in records if record["e"] == RECORD_TYPE_COMMAND]
+
+async def async_run_session(tmp_path, options: dict, session: list, *attributes: str) -> list:
+    """ Runs a session against a switch zone with the motion sensor initially off and returns its light commands. """
+    hass = await async_create_hass(str(tmp_path))
+    hass.states.async_set("binary_sensor.motion", "off")
+    entity = create_entity(hass, AL_Entity, "switch.automatic_lighting_hallway", create_config_entry(options=options))
+    trigger = lambda state, **attributes: lambda: entity._async_on_trigger_state_change("binary_sensor.motion", None, State("binary_sensor.motion", state, attributes))
+    records = await async_record(entity, [(0, entity.async_turn_on)] + [(time, action(trigger)) for time, action in session])
+    await hass.async_stop(force=True)
+    return get_commands(records, *attributes)
+
+
+def test_trigger_on_debounce_suppresses_flapping_triggers(tmp_path):
+    options = { "profiles": {
+        "motion": { "lights": ["light.a"], "triggers": ["binary_sensor.motion"], "duration": 30, "brightness": 200, "trigger_on_debounce": 2, "trigger_off_hold": 0 },
+        "ambient": { "lights": ["light.a"], "brightness": 20 }
+    } }
+
+    commands = run(async_run_session(tmp_path, options, [
+        (5, lambda trigger: trigger("on")),
+        (6, lambda trigger: trigger("off")),
+        (10, lambda trigger: trigger("on")),
+        (20, lambda trigger: None)
+    ]))
+
+    assert [(service, entity_ids) for _, service, entity_ids in commands] == [("turn_on", ["light.a"]), ("turn_on", ["light.a"])]
+    assert commands[1][0] == 12
+
+def test_trigger_predicate_applies_thresholds_with_hysteresis(tmp_path):
+    options = { "profiles": {
+        "motion": { "lights": ["light.a"], "triggers": ["binary_sensor.motion"], "duration": 0, "brightness": 200, "trigger_predicate": { "attribute": "level", "above": 30, "hysteresis": 5 } },
+        "ambient": { "lights": ["light.b"], "brightness": 20 }
+    } }
+
+    commands = run(async_run_session(tmp_path, options, [
+        (5, lambda trigger: trigger("on", level=20)),
+        (10, lambda trigger: trigger("on", level=35)),
+        (15, lambda trigger: trigger("on", level=28)),
+        (20, lambda trigger: trigger("on", level=24)),
+        (25, lambda trigger: None)
+    ]))
+
+    assert [command for command in commands if command[0] >= 5] == [
+        (10, "turn_off", ["light.b"]), (10, "turn_on", ["light.a"]),
+        (20, "turn_off", ["light.a"]), (20, "turn_on", ["light.b"])
+    ]
+
+def test_profiles_with_list_and_set_attributes_are_hashable(tmp_path):
+    options = { "profiles": {
+        "motion": { "lights": ["light.a"], "triggers": ["binary_sensor.motion"], "duration": 0, "rgb_color": [255, 0, 0] },
+        "ambient": { "lights": ["light.a"], "xy_color": [0.3, 0.3] }
+    } }
+
+    commands = run(async_run_session(tmp_path, options, [
+        (5, lambda trigger: trigger("on")),
+        (10, lambda trigger: None)
+    ], "rgb_color", "xy_color"))
+
+    assert [command[1:] for command in commands] == [("turn_on", ["light.a"], None, [0.3, 0.3]), ("turn_on", ["light.a"], [255, 0, 0], None)]
+    assert intern_attributes({ "effect": { "colorloop", "random" }, "rgb_color": [255, 0, 0] }) is intern_attributes({ "effect": { "random", "colorloop" }, "rgb_color": (255, 0, 0) })
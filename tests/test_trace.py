@@ -0,0 +1,24 @@
+""" Tests the decision records of the trace buffer. """
+from __future__ import annotations
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.automatic_lighting.utils import TraceBuffer
+
+
+def test_records_do_not_change_with_the_live_state():
+    trace = TraceBuffer(size=2)
+    lights = ["light.a"]
+    groups = { "light.g": ("light.a",) }
+    data = trace.add("track_lights", { "entity_id": lights, "groups": groups, "signals": { "light.b" } })
+    lights.append("light.b")
+    groups["light.h"] = ("light.b",)
+
+    assert data == { "entity_id": ("light.a",), "groups": { "light.g": ("light.a",) }, "signals": ("light.b",) }
+    assert trace.as_list()[0]["groups"] == { "light.g": ["light.a"] }
+
+    trace.add("turn_off", {})
+    trace.add("turn_off", {})
+
+    assert trace.size == 2